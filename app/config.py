@@ -31,10 +31,65 @@ class Settings(BaseSettings):
     jira_default_due_days: int = Field(default=0, alias="JIRA_DEFAULT_DUE_DAYS")  # 0 = don't set due date
     jira_default_components: str = Field(default="", alias="JIRA_DEFAULT_COMPONENTS")  # Comma-separated component names
     jira_default_fix_version: str = Field(default="", alias="JIRA_DEFAULT_FIX_VERSION")  # Single version name
+    # Shared Jira HTTP transport (keep-alive pool reused by every Jira call)
+    jira_timeout_seconds: float = Field(default=30.0, alias="JIRA_TIMEOUT_SECONDS")
+    jira_http2: bool = Field(default=False, alias="JIRA_HTTP2")  # Needs the 'h2' package (pip install "httpx[http2]")
+    jira_pool_max_connections: int = Field(default=20, alias="JIRA_POOL_MAX_CONNECTIONS")
+    jira_pool_max_keepalive: int = Field(default=10, alias="JIRA_POOL_MAX_KEEPALIVE")
+    jira_pool_keepalive_expiry: float = Field(default=30.0, alias="JIRA_POOL_KEEPALIVE_EXPIRY")  # Seconds
+    # Governor for all Jira calls: adaptive in-flight ceiling, retries of 429/503 (honouring Retry-After up to the
+    # max wait), and an optional client-side rate cap (0 = follow Jira's X-RateLimit-* headers)
+    jira_max_concurrency: int = Field(default=10, alias="JIRA_MAX_CONCURRENCY")
+    jira_max_retries: int = Field(default=4, alias="JIRA_MAX_RETRIES")
+    jira_retry_max_wait_seconds: float = Field(default=60.0, alias="JIRA_RETRY_MAX_WAIT_SECONDS")
+    jira_rate_limit_per_second: float = Field(default=0.0, alias="JIRA_RATE_LIMIT_PER_SECOND")
+    # How long the search endpoint that worked for a Jira site is reused before re-negotiating
+    jira_search_capability_ttl_seconds: float = Field(default=3600.0, alias="JIRA_SEARCH_CAPABILITY_TTL_SECONDS")
+    # In-process ticket cache: served as-is within the TTL, then revalidated against Jira's 'updated' (0 entries = off)
+    ticket_cache_max_entries: int = Field(default=512, alias="TICKET_CACHE_MAX_ENTRIES")
+    ticket_cache_ttl_seconds: float = Field(default=30.0, alias="TICKET_CACHE_TTL_SECONDS")
+    # Per-ticket comment threads (Markdown bodies), same TTL + revalidation scheme as the ticket cache (0 entries = off)
+    comment_cache_max_entries: int = Field(default=256, alias="COMMENT_CACHE_MAX_ENTRIES")
+    comment_cache_ttl_seconds: float = Field(default=60.0, alias="COMMENT_CACHE_TTL_SECONDS")
+    # Parallel 'key in (...)' searches for batch ticket fetches (100 keys per search), and one-by-one sub-task creates
+    jira_batch_concurrency: int = Field(default=4, alias="JIRA_BATCH_CONCURRENCY")
+    # Independent stages of post-to-jira / publish (sub-tasks, description, comment) running at once
+    solution_stage_concurrency: int = Field(default=3, alias="SOLUTION_STAGE_CONCURRENCY")
+    # Optional local SQLite mirror of these projects (comma-separated keys; empty = off), kept in sync in the background
+    jira_mirror_projects: str = Field(default="", alias="JIRA_MIRROR_PROJECTS")
+    jira_mirror_db_path: str = Field(default="jira_mirror.db", alias="JIRA_MIRROR_DB_PATH")
+    jira_mirror_sync_interval_seconds: float = Field(default=300.0, alias="JIRA_MIRROR_SYNC_INTERVAL_SECONDS")
+    jira_mirror_resync_hours: float = Field(default=24.0, alias="JIRA_MIRROR_RESYNC_HOURS")  # Full backfill; 0 = never
+    # Default staleness bound for reads served from the mirror (callers can pass max_staleness; 0 = always live)
+    jira_mirror_max_staleness_seconds: float = Field(default=900.0, alias="JIRA_MIRROR_MAX_STALENESS_SECONDS")
+    # Local full-text index (SQLite FTS5) of fetched tickets and comments behind GET /tickets/search ('' = off)
+    ticket_search_db_path: str = Field(default="ticket_search.db", alias="TICKET_SEARCH_DB_PATH")
+    # Shared secret for POST /webhooks/jira (HMAC 'X-Hub-Signature' or ?secret=); empty = webhooks rejected
+    jira_webhook_secret: str = Field(default="", alias="JIRA_WEBHOOK_SECRET")
+    # Response compression: gzip, or brotli when the client accepts it and the 'brotli' package is installed
+    response_compression_min_bytes: int = Field(default=1024, alias="RESPONSE_COMPRESSION_MIN_BYTES")  # -1 = off
+    response_gzip_level: int = Field(default=6, alias="RESPONSE_GZIP_LEVEL")
+    response_brotli_quality: int = Field(default=4, alias="RESPONSE_BROTLI_QUALITY")
 
     # Optional: Groq API key – if set, solution endpoints use Groq instead of MCP. Get key: https://console.groq.com/keys
     groq_api_key: str = Field(default="", alias="GROQ_API_KEY")
     groq_model: str = Field(default="llama-3.3-70b-versatile", alias="GROQ_MODEL")
+    # Shared LLM client: any OpenAI-compatible chat-completions API (a local stand-in accepts any GROQ_API_KEY)
+    llm_base_url: str = Field(default="https://api.groq.com/openai/v1", alias="LLM_BASE_URL")
+    llm_timeout_seconds: float = Field(default=120.0, alias="LLM_TIMEOUT_SECONDS")
+    llm_pool_max_connections: int = Field(default=10, alias="LLM_POOL_MAX_CONNECTIONS")
+    llm_max_retries: int = Field(default=3, alias="LLM_MAX_RETRIES")  # 429, 5xx and connection errors
+    llm_retry_max_wait_seconds: float = Field(default=60.0, alias="LLM_RETRY_MAX_WAIT_SECONDS")
+    # On-disk cache of LLM solutions keyed by model + prompts (ticket revision and question included) ('' = off)
+    solution_cache_db_path: str = Field(default="solution_cache.db", alias="SOLUTION_CACHE_DB_PATH")
+    solution_cache_max_entries: int = Field(default=2000, alias="SOLUTION_CACHE_MAX_ENTRIES")
+    solution_cache_max_mb: float = Field(default=50.0, alias="SOLUTION_CACHE_MAX_MB")
+    solution_cache_ttl_hours: float = Field(default=168.0, alias="SOLUTION_CACHE_TTL_HOURS")
+    # Prompt token budgets per section (tiktoken if installed, else estimated); PROMPT_MAX_TOKENS=0 = no fitting
+    prompt_max_tokens: int = Field(default=6000, alias="PROMPT_MAX_TOKENS")
+    prompt_description_tokens: int = Field(default=3000, alias="PROMPT_DESCRIPTION_TOKENS")
+    prompt_solution_tokens: int = Field(default=2500, alias="PROMPT_SOLUTION_TOKENS")
+    prompt_repo_hints_tokens: int = Field(default=300, alias="PROMPT_REPO_HINTS_TOKENS")
 
     # Optional: default MCP server key for /tickets/{id}/solution (used when GROQ_API_KEY is not set)
     default_mcp_server_key: str = Field(default="", alias="DEFAULT_MCP_SERVER_KEY")
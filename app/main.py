@@ -1,6 +1,7 @@
 """FastAPI app: fetch Jira tickets, ask solution for a ticket, pass ticket to MCP for solution."""
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 import dotenv
 dotenv.load_dotenv()
@@ -16,12 +17,35 @@ import os
 import logging
 
 from app.config import settings
-from app.routers import github_flow, solution, tickets
+from app.responses import CompressionMiddleware, FastJSONResponse
+from app.routers import github_flow, solution, tickets, webhooks
+from app.services.comment_cache import comment_cache
+from app.services.jira_governor import governor_stats
+from app.services.jira_http import close_async_jira_http_client, close_jira_http_client
+from app.services.jira_search import search_capability_stats
+from app.services.jira_webhooks import webhook_stats
+from app.services.llm_client import close_llm_clients, llm_stats
+from app.services.mirror_service import jira_mirror, mirror_enabled
+from app.services.mirror_sync import run_mirror_sync
+from app.services.prompt_builder import prompt_builder_stats
+from app.services.search_index import search_index
+from app.services.single_flight import single_flight_stats
+from app.services.solution_cache import solution_cache
+from app.services.subtask_parser import subtask_format_stats
+from app.services.ticket_cache import ticket_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    mirror_task = asyncio.create_task(run_mirror_sync()) if mirror_enabled() else None
     yield
+    if mirror_task is not None:
+        mirror_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await mirror_task  # the sync thread may still be using the Jira clients
+    close_jira_http_client()
+    await close_async_jira_http_client()
+    await close_llm_clients()
 
 
 app = FastAPI(
@@ -29,18 +53,28 @@ app = FastAPI(
     description="Fetch Jira tickets, ask for solutions, and pass ticket data to any MCP server for solutions.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+if settings.response_compression_min_bytes >= 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.response_compression_min_bytes,
+        gzip_level=settings.response_gzip_level,
+        brotli_quality=settings.response_brotli_quality,
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(tickets.router)
 app.include_router(solution.router)
 app.include_router(github_flow.router)
+app.include_router(webhooks.router)
 
 # Mount static files
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
@@ -114,7 +148,9 @@ def update_settings(body: SettingsRequest):
         updates += 1
         
     if updates > 0:
-        # Re-initialize the internal clients if necessary.
+        # Pooled Jira clients are rebuilt lazily for the new site/credentials; cached tickets belong to the old one.
+        ticket_cache.clear()
+        comment_cache.clear()
         logging.getLogger("app").info(f"Updated {updates} settings in .env")
         
     return SettingsResponse(success=True, message=f"Successfully updated {updates} settings.")
@@ -138,4 +174,19 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "jira_configured": settings.jira_configured}
+    return {
+        "status": "ok",
+        "jira_configured": settings.jira_configured,
+        "jira_search": search_capability_stats(),
+        "jira_governor": governor_stats(),
+        "ticket_cache": ticket_cache.stats(),
+        "comment_cache": comment_cache.stats(),
+        "jira_mirror": jira_mirror.stats() if mirror_enabled() else None,
+        "ticket_search": search_index.stats(),
+        "jira_webhooks": webhook_stats(),
+        "subtask_formats": subtask_format_stats(),
+        "llm": llm_stats(),
+        "solution_cache": solution_cache.stats(),
+        "single_flight": single_flight_stats(),
+        "prompt_builder": prompt_builder_stats(),
+    }
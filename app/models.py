@@ -32,7 +32,52 @@ class TicketDetail(BaseModel):
     created: str | None = None
     updated: str | None = None
     subtasks: list[dict[str, Any]] = Field(default_factory=list)
-    raw: dict[str, Any] = Field(default_factory=dict, description="Raw Jira issue payload")
+    raw: dict[str, Any] | None = Field(default=None, description="Raw Jira issue payload (only with include_raw=true)")
+
+
+class TicketFields(BaseModel):
+    """A ticket as returned by GET /tickets and /tickets/{id}: fields left out by ?fields=... are omitted."""
+    key: str
+    summary: str | None = None
+    description: str | None = None
+    status: str | None = None
+    issue_type: str | None = None
+    assignee: str | None = None
+    project: str | None = None
+    created: str | None = None
+    updated: str | None = None
+    subtasks: list[dict[str, Any]] | None = None
+    raw: dict[str, Any] | None = Field(default=None, description="Raw Jira issue payload (only with include_raw=true)")
+
+
+class TicketBatchRequest(BaseModel):
+    """Request body for fetching many tickets by key in one call."""
+    keys: list[str] = Field(..., min_length=1, max_length=1000, description="Issue keys, e.g. ['PROJ-1', 'PROJ-2']")
+
+
+class TicketBatchResponse(BaseModel):
+    """Tickets found (in request order) and keys that Jira did not return."""
+    tickets: list[TicketDetail] = Field(default_factory=list)
+    missing: list[str] = Field(default_factory=list, description="Keys that do not exist or are not visible")
+
+
+class TicketSearchHit(BaseModel):
+    """One full-text search result; snippet marks matched terms with **."""
+    key: str
+    summary: str = ""
+    status: str | None = None
+    issue_type: str | None = None
+    assignee: str | None = None
+    project: str | None = None
+    updated: str | None = None
+    score: float = Field(default=0.0, description="Relevance (bm25), higher is better")
+    snippet: str = ""
+
+
+class TicketSearchResponse(BaseModel):
+    """Full-text search results, best first."""
+    query: str
+    results: list[TicketSearchHit] = Field(default_factory=list)
 
 
 # --- Solution ---
@@ -60,6 +105,12 @@ class SolutionResponse(BaseModel):
     tool_name: str | None = None
 
 
+class SolutionStreamResult(SolutionResponse):
+    """Data of the final 'done' event of a streamed solution: the full text and the sub-tasks parsed from it."""
+    suggested_subtasks: list[SubtaskItem] = Field(default_factory=list, description="Only for a Story or Epic")
+    subtask_format: str | None = None
+
+
 class SubtaskDefaults(BaseModel):
     """Optional defaults for sub-tasks created under a Story/Epic. Overrides env defaults when set."""
     assignee_account_id: str | None = Field(default=None, description="Jira Cloud accountId for assignee")
@@ -91,6 +142,14 @@ class PublishSolutionRequest(BaseModel):
     )
 
 
+class StageTiming(BaseModel):
+    """One stage of a multi-step endpoint: when it started (ms after the request began) and how long it took."""
+    stage: str
+    status: str = Field(description="ok, failed, or skipped (a stage it depends on failed)")
+    start_ms: float
+    duration_ms: float
+
+
 class PostSolutionToJiraResponse(BaseModel):
     """Response after posting solution to Jira."""
     ticket_id: str
@@ -109,6 +168,14 @@ class PostSolutionToJiraResponse(BaseModel):
         default=False,
         description="True if the issue description was empty and was updated with the solution.",
     )
+    subtask_format: str | None = Field(
+        default=None,
+        description="Which sub-task format was found in the solution: pipe, multiline, approach_plan; null if none.",
+    )
+    stage_timings: list[StageTiming] = Field(
+        default_factory=list, description="Per-stage timings, in start order (stages run concurrently where they can)"
+    )
+    total_ms: float | None = None
     success: bool = True
 
 
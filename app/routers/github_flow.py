@@ -2,6 +2,7 @@
 import shutil
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import settings
 from app.models import GitHubFlowRequest, GitHubFlowResponse
@@ -17,8 +18,8 @@ from app.services.git_service import (
     list_repo_files,
     normalize_branch_name,
 )
-from app.services.groq_service import get_solution_from_groq
-from app.services.jira_service import add_comment_to_ticket, fetch_ticket
+from app.services.groq_service import get_solution_from_groq_async
+from app.services.jira_async_service import add_comment_to_ticket, fetch_ticket
 
 router = APIRouter(tags=["github-flow"])
 
@@ -43,7 +44,7 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
         )
 
     try:
-        ticket = fetch_ticket(ticket_id)
+        ticket = await fetch_ticket(ticket_id)
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
@@ -57,7 +58,7 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
 
     question = (body.question or "").strip() or "Provide an approach plan and implementation solution."
     try:
-        solution = get_solution_from_groq(ticket, question, as_plan_and_solution=True)
+        solution = await get_solution_from_groq_async(ticket, question, as_plan_and_solution=True)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Solution generation failed: {e}")
 
@@ -71,20 +72,21 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
     err_msg = None
 
     try:
-        repo_path = clone_repo(repo_url, settings.github_token)
-        if branch_exists_remote(repo_path, branch_name):
+        repo_path = await run_in_threadpool(clone_repo, repo_url, settings.github_token)
+        if await run_in_threadpool(branch_exists_remote, repo_path, branch_name):
             raise HTTPException(
                 status_code=409,
                 detail=f"Branch {branch_name} already exists on remote. Use a different ticket or delete the branch.",
             )
-        default_branch = body.base_branch or get_default_branch(repo_path)
-        ensure_branch(repo_path, branch_name, default_branch)
+        default_branch = body.base_branch or await run_in_threadpool(get_default_branch, repo_path)
+        await run_in_threadpool(ensure_branch, repo_path, branch_name, default_branch)
 
-        repo_files = list_repo_files(repo_path)
-        code_files = generate_code_changes(ticket, solution, body.language, repo_files)
+        repo_files = await run_in_threadpool(list_repo_files, repo_path)
+        code_files = await run_in_threadpool(generate_code_changes, ticket, solution, body.language, repo_files)
         if code_files:
-            apply_changes(repo_path, code_files)
-            commit_sha = commit_and_push(
+            await run_in_threadpool(apply_changes, repo_path, code_files)
+            commit_sha = await run_in_threadpool(
+                commit_and_push,
                 repo_path,
                 f"Implement {ticket_id}: {ticket.summary[:80]}",
                 branch_name,
@@ -92,7 +94,8 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
                 settings.github_token,
             )
         else:
-            commit_sha = commit_and_push(
+            commit_sha = await run_in_threadpool(
+                commit_and_push,
                 repo_path,
                 f"Implement {ticket_id}: {ticket.summary[:80]}",
                 branch_name,
@@ -121,7 +124,8 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
         jira_link = f"{settings.jira_url.rstrip('/')}/browse/{ticket_id}"
         pr_title = f"[{ticket_id}] {ticket.summary[:100]}"
         pr_body = f"Jira: {jira_link}\n\nImplementation for this ticket."
-        pr_url = create_pull_request(
+        pr_url = await run_in_threadpool(
+            create_pull_request,
             repo_url,
             branch_name,
             default_branch,
@@ -137,7 +141,7 @@ async def ticket_github_flow(ticket_id: str, body: GitHubFlowRequest) -> GitHubF
             f"Please review: {pr_url or '(open PR manually: ' + repo_url + ')'}"
         )
         try:
-            comment = add_comment_to_ticket(ticket_id, comment_body)
+            comment = await add_comment_to_ticket(ticket_id, comment_body)
             jira_comment_id = comment.get("id")
             if jira_comment_id:
                 jira_comment_url = f"{settings.jira_url.rstrip('/')}/browse/{ticket_id}?focusedCommentId={jira_comment_id}"
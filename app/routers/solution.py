@@ -1,7 +1,12 @@
 """Solution API: ask solution for a ticket (Groq or MCP), and optionally post to Jira."""
+import asyncio
+import logging
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from app.config import settings
 from app.models import (
@@ -11,41 +16,236 @@ from app.models import (
     PostSolutionToJiraResponse,
     SolutionRequest,
     SolutionResponse,
+    SolutionStreamResult,
     SubtaskDefaults,
     SubtaskItem,
+    TicketDetail,
 )
-from app.services.groq_service import get_solution_from_groq
-from app.services.jira_service import (
+from app.responses import SSE_MEDIA_TYPE, SSE_PING, sse_event
+from app.services.groq_service import get_solution_from_groq_async, stream_solution_from_groq
+from app.services.jira_async_service import (
     add_comment_to_ticket,
-    create_subtask,
+    create_subtasks,
     fetch_ticket,
-    is_story_or_epic,
-    parse_suggested_subtasks,
     update_issue_description,
 )
-from app.services.mcp_service import call_mcp_solution
+from app.services.jira_common import is_story_or_epic
+from app.services.mcp_service import call_mcp_solution, get_server_config
+from app.services.solution_cache import CacheMode
+from app.services.stage_graph import StageFailed, StageGraph
+from app.services.subtask_parser import extract_subtasks
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["solution"])
 
 
-@router.post("/tickets/{ticket_id}/solution", response_model=SolutionResponse)
-async def ticket_solution(ticket_id: str, body: SolutionRequest | None = None) -> SolutionResponse:
+def _subtask_options(defaults: SubtaskDefaults | None) -> dict[str, Any]:
+    """create_subtasks() keyword arguments: the request's subtask_defaults, else the JIRA_DEFAULT_* settings."""
+    assignee_id = (defaults.assignee_account_id if defaults else None) or (settings.jira_default_assignee_account_id or None)
+    priority_name = (defaults.priority if defaults else None) or (settings.jira_default_priority or None)
+    labels_list: list[str] = []
+    if defaults and defaults.labels:
+        labels_list = list(defaults.labels)
+    elif settings.jira_default_subtask_labels:
+        labels_list = [x.strip() for x in settings.jira_default_subtask_labels.split(",") if x.strip()]
+    due_days = (defaults.due_days if defaults is not None and defaults.due_days is not None else None) or settings.jira_default_due_days
+    duedate_str: str | None = None
+    if due_days and due_days > 0:
+        duedate_str = (datetime.now(timezone.utc) + timedelta(days=due_days)).strftime("%Y-%m-%d")
+    components_list: list[str] = []
+    if defaults and defaults.components:
+        components_list = list(defaults.components)
+    elif settings.jira_default_components:
+        components_list = [x.strip() for x in settings.jira_default_components.split(",") if x.strip()]
+    fix_version_str = (defaults.fix_version if defaults else None) or (settings.jira_default_fix_version or None) or None
+    return {
+        "assignee_account_id": assignee_id,
+        "priority_name": priority_name,
+        "labels": labels_list or None,
+        "duedate": duedate_str,
+        "components": components_list or None,
+        "fix_version": fix_version_str,
+    }
+
+
+async def _create_suggested_subtasks(
+    ticket_id: str, ticket: TicketDetail, solution: str, defaults: SubtaskDefaults | None
+) -> tuple[list[str], list[str], str | None]:
+    """
+    For a Story or Epic, create the sub-tasks suggested in the solution (all in one bulk request where Jira allows).
+    Returns (created sub-task keys, per-sub-task errors, sub-task format found in the solution).
+    """
+    if not (is_story_or_epic(ticket) and ticket.project):
+        return [], [], None
+    subtask_items: list[SubtaskItem]
+    subtask_items, subtask_format = extract_subtasks(solution)
+    if not subtask_items:
+        first_line = (solution.split("\n")[0] or "Implement solution").strip()[:255]
+        subtask_items = [SubtaskItem(summary=first_line or "Implement solution", description=solution[:2000] or None)]
+    # Ensure every sub-task gets a description (parsed description, or full solution, or placeholder)
+    solution_fallback = (solution or "").strip()[:5000] or "See parent story and solution comment for context."
+    subtask_items = [
+        SubtaskItem(summary=item.summary, description=(item.description or "").strip() or solution_fallback)
+        for item in subtask_items
+    ]
+    try:
+        results: list[dict | Exception] = await create_subtasks(
+            ticket_id, ticket.project, subtask_items, **_subtask_options(defaults)
+        )
+    except Exception as e:
+        results = [e] * len(subtask_items)
+    created_subtask_keys: list[str] = []
+    subtask_errors: list[str] = []
+    for item, result in zip(subtask_items, results):
+        if isinstance(result, BaseException):
+            subtask_errors.append(f"{item.summary!r}: {result}")
+        elif result.get("key"):
+            created_subtask_keys.append(result["key"])
+    return created_subtask_keys, subtask_errors, subtask_format
+
+
+_STREAM_HEARTBEAT_SECONDS = 15.0
+_STREAM_DESCRIPTION = (
+    "Stream the answer as server-sent events: 'meta', then 'token' events ({text}) as it is written, "
+    "then 'done' (the full SolutionResponse plus suggested_subtasks), or 'error' ({detail})"
+)
+_CACHE_QUERY = Query(
+    default="use",
+    description="Groq answer cache: 'use' a stored answer for the same ticket revision, question and model, "
+    "'refresh' it (ask the LLM, store the new answer) or 'bypass' it",
+)
+
+
+def _event_stream(events: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events, media_type=SSE_MEDIA_TYPE, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _done_event(ticket: TicketDetail, result: SolutionResponse) -> bytes:
+    """The 'done' event: the complete solution, with its sub-tasks parsed for a Story or Epic."""
+    subtask_items, subtask_format = extract_subtasks(result.solution) if is_story_or_epic(ticket) else ([], None)
+    done = SolutionStreamResult(
+        **result.model_dump(), suggested_subtasks=subtask_items, subtask_format=subtask_format
+    )
+    return sse_event("done", done)
+
+
+async def _stream_groq_solution(ticket: TicketDetail, result: SolutionResponse, cache: CacheMode) -> StreamingResponse:
+    """
+    Relay Groq's answer as it is generated. The first piece is awaited before responding, so a missing key, a
+    failed request or an empty answer still maps to 400/502; later failures arrive as an 'error' event.
+    """
+    pieces = stream_solution_from_groq(
+        ticket, result.question, include_subtasks_for_story_epic=is_story_or_epic(ticket), cache=cache
+    )
+    try:
+        first = await anext(pieces, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Solution call failed: {e}")
+    if first is None:
+        raise HTTPException(status_code=502, detail="Solution call failed: the model returned an empty response")
+
+    async def events() -> AsyncIterator[bytes]:
+        parts = [first]
+        try:
+            yield sse_event("meta", result.model_dump(exclude={"solution"}))
+            yield sse_event("token", {"text": first})
+            async for text in pieces:
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except Exception as e:
+            logger.warning("Streaming solution for %s failed: %s", result.ticket_id, e)
+            yield sse_event("error", {"detail": f"Solution call failed: {e}"})
+            return
+        finally:
+            await pieces.aclose()
+        result.solution = "".join(parts)
+        yield _done_event(ticket, result)
+
+    return _event_stream(events())
+
+
+def _stream_mcp_solution(ticket: TicketDetail, result: SolutionResponse, **call_args: Any) -> StreamingResponse:
+    """
+    MCP tools return their answer in one piece: relay the tool's progress notifications while it runs (with
+    keep-alive comments in between), then the whole text as a single 'token' event.
+    """
+    progress: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def on_progress(done: float, total: float | None = None, message: str | None = None) -> None:
+        progress.put_nowait({"progress": done, "total": total, "message": message})
+
+    async def events() -> AsyncIterator[bytes]:
+        yield sse_event("meta", result.model_dump(exclude={"solution"}))
+        call = asyncio.create_task(call_mcp_solution(ticket, on_progress=on_progress, **call_args))
+        try:
+            while not call.done():
+                next_progress = asyncio.create_task(progress.get())
+                finished, _ = await asyncio.wait(
+                    {call, next_progress}, timeout=_STREAM_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_progress in finished:
+                    yield sse_event("progress", next_progress.result())
+                else:
+                    next_progress.cancel()
+                if not finished:
+                    yield SSE_PING
+            solution = call.result()
+        except Exception as e:
+            logger.warning("Streaming MCP solution for %s failed: %s", result.ticket_id, e)
+            yield sse_event("error", {"detail": f"MCP call failed: {e}"})
+            return
+        finally:
+            call.cancel()
+        yield sse_event("token", {"text": solution})
+        result.solution = solution
+        yield _done_event(ticket, result)
+
+    return _event_stream(events())
+
+
+@router.post(
+    "/tickets/{ticket_id}/solution",
+    response_model=SolutionResponse,
+    responses={200: {"content": {SSE_MEDIA_TYPE: {}}}},
+)
+async def ticket_solution(
+    ticket_id: str,
+    body: SolutionRequest | None = None,
+    stream: bool = Query(default=False, description=_STREAM_DESCRIPTION),
+    cache: CacheMode = _CACHE_QUERY,
+):
     """
     Fetch the ticket and return a solution. Uses Groq if GROQ_API_KEY is set, else the default MCP server.
-    User can pass an optional question about the ticket.
+    User can pass an optional question about the ticket. With stream=true the answer is sent as server-sent
+    events while it is generated. Groq answers are cached on disk per ticket revision, question and model.
     """
     try:
-        ticket = fetch_ticket(ticket_id)
+        ticket = await fetch_ticket(ticket_id)
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Ticket not found: {e}")
 
     question = (body.question if body else None) or "Provide a solution or recommendations for this ticket."
+    if stream:
+        result = SolutionResponse(ticket_id=ticket_id, ticket_summary=ticket.summary, question=question, solution="")
+        if settings.groq_api_key:
+            return await _stream_groq_solution(ticket, result, cache)
+        try:
+            get_server_config(None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _stream_mcp_solution(ticket, result, mcp_server_key=None, tool_name=None, question=question)
+
     try:
         if settings.groq_api_key:
-            solution = get_solution_from_groq(
-                ticket, question, include_subtasks_for_story_epic=is_story_or_epic(ticket)
+            solution = await get_solution_from_groq_async(
+                ticket, question, include_subtasks_for_story_epic=is_story_or_epic(ticket), cache=cache
             )
             mcp_key, tool_name = None, None
         else:
@@ -68,19 +268,45 @@ async def ticket_solution(ticket_id: str, body: SolutionRequest | None = None) -
     )
 
 
-@router.post("/mcp/solution", response_model=SolutionResponse)
-async def mcp_solution(body: McpSolutionRequest) -> SolutionResponse:
+@router.post("/mcp/solution", response_model=SolutionResponse, responses={200: {"content": {SSE_MEDIA_TYPE: {}}}})
+async def mcp_solution(
+    body: McpSolutionRequest,
+    stream: bool = Query(default=False, description=_STREAM_DESCRIPTION),
+):
     """
     Pass the given ticket data to the specified MCP server and return the solution.
-    You can specify which MCP server (by key) and which tool to call.
+    You can specify which MCP server (by key) and which tool to call. With stream=true the tool's progress and
+    answer are sent as server-sent events.
     """
     try:
-        ticket = fetch_ticket(body.ticket_id)
+        ticket = await fetch_ticket(body.ticket_id)
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Ticket not found: {e}")
 
+    if stream:
+        try:
+            cfg = get_server_config(body.mcp_server_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result = SolutionResponse(
+            ticket_id=body.ticket_id,
+            ticket_summary=ticket.summary,
+            question=body.question,
+            solution="",
+            mcp_server_key=body.mcp_server_key,
+            tool_name=body.tool_name or cfg.solution_tool_name,
+        )
+        return _stream_mcp_solution(
+            ticket,
+            result,
+            mcp_server_key=body.mcp_server_key,
+            tool_name=body.tool_name,
+            question=body.question,
+            extra_tool_args=body.tool_arguments or None,
+        )
+
     try:
         solution = await call_mcp_solution(
             ticket,
@@ -110,207 +336,132 @@ async def mcp_solution(body: McpSolutionRequest) -> SolutionResponse:
     )
 
 
-@router.post("/tickets/{ticket_id}/solution/post-to-jira", response_model=PostSolutionToJiraResponse)
-async def solution_post_to_jira(ticket_id: str, body: PostSolutionToJiraRequest | None = None) -> PostSolutionToJiraResponse:
+_COMMENT_HEADING = "Suggested approach and solution\n\n"
+
+
+def _solution_comment(solution: str, created_subtask_keys: list[str]) -> str:
+    if created_subtask_keys:
+        return f"{_COMMENT_HEADING}Created sub-tasks: {', '.join(created_subtask_keys)}\n\n{solution}"
+    return _COMMENT_HEADING + solution
+
+
+def _stage_http_error(e: StageFailed) -> HTTPException:
+    if e.stage == "ticket":
+        if isinstance(e.error, ValueError):
+            return HTTPException(status_code=503, detail=str(e.error))
+        return HTTPException(status_code=404, detail=f"Ticket not found: {e.error}")
+    if e.stage == "solution":
+        if isinstance(e.error, ValueError):
+            return HTTPException(status_code=400, detail=str(e.error))
+        return HTTPException(status_code=502, detail=f"Solution call failed: {e.error}")
+    if e.stage == "comment":
+        return HTTPException(status_code=502, detail=f"Failed to add comment to Jira: {e.error}")
+    return HTTPException(status_code=502, detail=str(e))
+
+
+async def _post_solution(
+    ticket_id: str,
+    defaults: SubtaskDefaults | None,
+    *,
+    question: str | None = None,
+    solution: str | None = None,
+    cache: CacheMode = "use",
+) -> PostSolutionToJiraResponse:
     """
-    Generate an approach plan and solution for the ticket, post it as a comment, and if the ticket
-    is a Story or Epic, create sub-tasks under it from the 'Suggested sub-tasks:' section.
+    Post-to-jira (solution is None: generate one for 'question') and publish, as a stage graph:
+
+        ticket ──> solution ──┬──> subtasks ──> comment
+                              └──> description
+
+    'solution' waits for 'ticket' only when it is generated. The comment lists the created sub-tasks, so it is
+    posted once they exist (one Jira call, no later edit); the description is filled meanwhile. Every write
+    waits for the ticket, so a failed fetch never leaves a comment behind for a retry to duplicate.
     """
-    question = (
-        (body.question if body else None)
-        or "Provide an approach plan (numbered steps), the detailed solution, and if this is a Story/Epic a 'Suggested sub-tasks:' list."
-    )
-    try:
-        ticket = fetch_ticket(ticket_id)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Ticket not found: {e}")
+    graph = StageGraph(settings.solution_stage_concurrency)
 
-    try:
+    async def ticket_stage(results: dict[str, Any]) -> TicketDetail:
+        return await fetch_ticket(ticket_id)
+
+    async def solution_stage(results: dict[str, Any]) -> str:
+        if solution is not None:
+            return solution
         if settings.groq_api_key:
-            solution = get_solution_from_groq(
-                ticket, question, as_plan_and_solution=True, include_subtasks_for_story_epic=True
-            )
-        else:
-            solution = await call_mcp_solution(
-                ticket, mcp_server_key=None, tool_name=None, question=question
+            return await get_solution_from_groq_async(
+                results["ticket"],
+                question,
+                as_plan_and_solution=True,
+                include_subtasks_for_story_epic=True,
+                cache=cache,
             )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Solution call failed: {e}")
+        return await call_mcp_solution(results["ticket"], mcp_server_key=None, tool_name=None, question=question)
 
-    created_subtask_keys: list[str] = []
-    subtask_errors: list[str] = []
-    defaults: SubtaskDefaults | None = body.subtask_defaults if body else None
-    assignee_id = (defaults.assignee_account_id if defaults else None) or (settings.jira_default_assignee_account_id or None)
-    priority_name = (defaults.priority if defaults else None) or (settings.jira_default_priority or None)
-    labels_list: list[str] = []
-    if defaults and defaults.labels:
-        labels_list = list(defaults.labels)
-    elif settings.jira_default_subtask_labels:
-        labels_list = [x.strip() for x in settings.jira_default_subtask_labels.split(",") if x.strip()]
-    due_days = (defaults.due_days if defaults is not None and defaults.due_days is not None else None) or settings.jira_default_due_days
-    duedate_str: str | None = None
-    if due_days and due_days > 0:
-        duedate_str = (datetime.now(timezone.utc) + timedelta(days=due_days)).strftime("%Y-%m-%d")
-    components_list: list[str] = []
-    if defaults and defaults.components:
-        components_list = list(defaults.components)
-    elif settings.jira_default_components:
-        components_list = [x.strip() for x in settings.jira_default_components.split(",") if x.strip()]
-    fix_version_str = (defaults.fix_version if defaults else None) or (settings.jira_default_fix_version or None) or None
+    async def subtasks_stage(results: dict[str, Any]) -> tuple[list[str], list[str], str | None]:
+        return await _create_suggested_subtasks(ticket_id, results["ticket"], results["solution"], defaults)
 
-    if is_story_or_epic(ticket) and ticket.project:
-        subtask_items: list[SubtaskItem] = parse_suggested_subtasks(solution)
-        if not subtask_items:
-            first_line = (solution.split("\n")[0] or "Implement solution").strip()[:255]
-            subtask_items = [SubtaskItem(summary=first_line or "Implement solution", description=solution[:2000] or None)]
-        # Ensure every sub-task gets a description (parsed description, or full solution, or placeholder)
-        solution_fallback = (solution or "").strip()[:5000] or "See parent story and solution comment for context."
-        for item in subtask_items:
-            desc = (item.description or "").strip() or solution_fallback
-            try:
-                created = create_subtask(
-                    ticket_id,
-                    ticket.project,
-                    item.summary,
-                    description=desc,
-                    assignee_account_id=assignee_id,
-                    priority_name=priority_name,
-                    labels=labels_list or None,
-                    duedate=duedate_str,
-                    components=components_list or None,
-                    fix_version=fix_version_str,
-                )
-                if created.get("key"):
-                    created_subtask_keys.append(created["key"])
-            except Exception as e:
-                subtask_errors.append(f"{item.summary!r}: {e}")
-
-    # Update issue description if it was empty
-    description_updated = False
-    if not (ticket.description and str(ticket.description).strip()):
+    async def description_stage(results: dict[str, Any]) -> bool:
+        ticket: TicketDetail = results["ticket"]
+        if ticket.description and str(ticket.description).strip():
+            return False
         try:
-            update_issue_description(ticket_id, solution)
-            description_updated = True
-        except Exception:
-            pass  # Non-fatal; comment will still contain the solution
+            await update_issue_description(ticket_id, results["solution"])
+        except Exception as e:
+            # Non-fatal; the comment still contains the solution
+            logger.warning("Could not set empty description of %s: %s", ticket_id, e)
+            return False
+        return True
 
-    comment_prefix = "Suggested approach and solution\n\n"
-    if created_subtask_keys:
-        comment_prefix += f"Created sub-tasks: {', '.join(created_subtask_keys)}\n\n"
-    comment_body = comment_prefix + solution
+    async def comment_stage(results: dict[str, Any]) -> dict:
+        return await add_comment_to_ticket(ticket_id, _solution_comment(results["solution"], results["subtasks"][0]))
+
+    graph.add("ticket", ticket_stage)
+    graph.add("solution", solution_stage, after=("ticket",) if solution is None else ())
+    graph.add("subtasks", subtasks_stage, after=("ticket", "solution"))
+    graph.add("description", description_stage, after=("ticket", "solution"))
+    graph.add("comment", comment_stage, after=("ticket", "solution", "subtasks"))
     try:
-        comment = add_comment_to_ticket(ticket_id, comment_body)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Failed to add comment to Jira: {e}")
+        results = await graph.run()
+    except StageFailed as e:
+        raise _stage_http_error(e)
 
-    comment_id = comment.get("id")
+    created_subtask_keys, subtask_errors, subtask_format = results["subtasks"]
+    comment_id = results["comment"].get("id")
     base_url = settings.jira_url.rstrip("/")
     comment_url = f"{base_url}/browse/{ticket_id}?focusedCommentId={comment_id}" if comment_id else None
 
     return PostSolutionToJiraResponse(
         ticket_id=ticket_id,
-        solution=solution,
+        solution=results["solution"],
         comment_id=comment_id,
         comment_url=comment_url,
         created_subtask_keys=created_subtask_keys,
         subtask_errors=subtask_errors,
-        description_updated=description_updated,
+        description_updated=results["description"],
+        subtask_format=subtask_format,
+        stage_timings=graph.timings,
+        total_ms=graph.total_ms,
         success=True,
     )
 
 
+@router.post("/tickets/{ticket_id}/solution/post-to-jira", response_model=PostSolutionToJiraResponse)
+async def solution_post_to_jira(
+    ticket_id: str, body: PostSolutionToJiraRequest | None = None, cache: CacheMode = _CACHE_QUERY
+) -> PostSolutionToJiraResponse:
+    """
+    Generate an approach plan and solution for the ticket, post it as a comment, and if the ticket
+    is a Story or Epic, create sub-tasks under it from the 'Suggested sub-tasks:' section.
+    Sub-tasks and the description update run concurrently, then the comment; see stage_timings in the response.
+    """
+    question = (
+        (body.question if body else None)
+        or "Provide an approach plan (numbered steps), the detailed solution, and if this is a Story/Epic a 'Suggested sub-tasks:' list."
+    )
+    return await _post_solution(ticket_id, body.subtask_defaults if body else None, question=question, cache=cache)
+
+
 @router.post("/tickets/{ticket_id}/solution/publish", response_model=PostSolutionToJiraResponse)
 async def solution_publish_to_jira(ticket_id: str, body: PublishSolutionRequest) -> PostSolutionToJiraResponse:
     """
     Publish a pre-generated/reviewed solution string to the ticket directly, without making an LLM call.
     """
-    try:
-        ticket = fetch_ticket(ticket_id)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Ticket not found: {e}")
-
-    solution = body.solution
-    created_subtask_keys: list[str] = []
-    subtask_errors: list[str] = []
-    defaults: SubtaskDefaults | None = body.subtask_defaults
-    assignee_id = (defaults.assignee_account_id if defaults else None) or (settings.jira_default_assignee_account_id or None)
-    priority_name = (defaults.priority if defaults else None) or (settings.jira_default_priority or None)
-    labels_list: list[str] = []
-    if defaults and defaults.labels:
-        labels_list = list(defaults.labels)
-    elif settings.jira_default_subtask_labels:
-        labels_list = [x.strip() for x in settings.jira_default_subtask_labels.split(",") if x.strip()]
-    due_days = (defaults.due_days if defaults is not None and defaults.due_days is not None else None) or settings.jira_default_due_days
-    duedate_str: str | None = None
-    if due_days and due_days > 0:
-        duedate_str = (datetime.now(timezone.utc) + timedelta(days=due_days)).strftime("%Y-%m-%d")
-    components_list: list[str] = []
-    if defaults and defaults.components:
-        components_list = list(defaults.components)
-    elif settings.jira_default_components:
-        components_list = [x.strip() for x in settings.jira_default_components.split(",") if x.strip()]
-    fix_version_str = (defaults.fix_version if defaults else None) or (settings.jira_default_fix_version or None) or None
-
-    if is_story_or_epic(ticket) and ticket.project:
-        subtask_items: list[SubtaskItem] = parse_suggested_subtasks(solution)
-        if not subtask_items:
-            first_line = (solution.split("\n")[0] or "Implement solution").strip()[:255]
-            subtask_items = [SubtaskItem(summary=first_line or "Implement solution", description=solution[:2000] or None)]
-        solution_fallback = (solution or "").strip()[:5000] or "See parent story and solution comment for context."
-        for item in subtask_items:
-            desc = (item.description or "").strip() or solution_fallback
-            try:
-                created = create_subtask(
-                    ticket_id,
-                    ticket.project,
-                    item.summary,
-                    description=desc,
-                    assignee_account_id=assignee_id,
-                    priority_name=priority_name,
-                    labels=labels_list or None,
-                    duedate=duedate_str,
-                    components=components_list or None,
-                    fix_version=fix_version_str,
-                )
-                if created.get("key"):
-                    created_subtask_keys.append(created["key"])
-            except Exception as e:
-                subtask_errors.append(f"{item.summary!r}: {e}")
-
-    description_updated = False
-    if not (ticket.description and str(ticket.description).strip()):
-        try:
-            update_issue_description(ticket_id, solution)
-            description_updated = True
-        except Exception:
-            pass
-
-    comment_prefix = "Suggested approach and solution\n\n"
-    if created_subtask_keys:
-        comment_prefix += f"Created sub-tasks: {', '.join(created_subtask_keys)}\n\n"
-    comment_body = comment_prefix + solution
-    try:
-        comment = add_comment_to_ticket(ticket_id, comment_body)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Failed to add comment to Jira: {e}")
-
-    comment_id = comment.get("id")
-    base_url = settings.jira_url.rstrip("/")
-    comment_url = f"{base_url}/browse/{ticket_id}?focusedCommentId={comment_id}" if comment_id else None
-
-    return PostSolutionToJiraResponse(
-        ticket_id=ticket_id,
-        solution=solution,
-        comment_id=comment_id,
-        comment_url=comment_url,
-        created_subtask_keys=created_subtask_keys,
-        subtask_errors=subtask_errors,
-        description_updated=description_updated,
-        success=True,
-    )
+    return await _post_solution(ticket_id, body.subtask_defaults, solution=body.solution)
@@ -1,53 +1,254 @@
 """Tickets API: fetch from Jira."""
-from fastapi import APIRouter, HTTPException, Query
+import hashlib
+import itertools
+import json
+from datetime import datetime
+from typing import Any, Iterator
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.models import TicketDetail, TicketSummary
-from app.services.jira_service import DEFAULT_JQL, fetch_ticket, fetch_tickets
+from app.config import settings
+from app.models import (
+    TicketBatchRequest,
+    TicketBatchResponse,
+    TicketDetail,
+    TicketFields,
+    TicketSearchResponse,
+    TicketSummary,
+)
+from app.responses import dumps
+from app.services.jira_common import DEFAULT_JQL, parse_ticket_fields, select_comments
+from app.services.jira_service import (
+    fetch_ticket,
+    fetch_ticket_fields_page,
+    fetch_tickets_by_keys,
+    fetch_tickets_page,
+    iter_tickets,
+)
+from app.services.search_index import search_index
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_SUMMARY_FIELDS = frozenset(TicketSummary.model_fields) - {"key"}
+_FIELDS_QUERY = Query(
+    default=None,
+    description="Comma-separated fields to return (and request from Jira), e.g. 'summary,status,updated'; "
+    "default: all. Choose from key, summary, description, status, issue_type, assignee, project, created, updated, subtasks",
+)
+_INCLUDE_RAW_QUERY = Query(default=False, description="Also return the raw Jira issue payload (always read live)")
+
+
+def _requested_fields(fields: str | None) -> list[str] | None:
+    try:
+        return parse_ticket_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _compact(ticket: TicketSummary | TicketDetail, fields: list[str] | None, include_raw: bool) -> TicketFields:
+    """The response shape: only the requested fields (all when None), raw only when asked for."""
+    exclude = None if include_raw else {"raw"}
+    include = None if fields is None else {"key", *fields, *(("raw",) if include_raw else ())}
+    return TicketFields(**ticket.model_dump(include=include, exclude=exclude))
+
+
+def _json_data(body: Any) -> Any:
+    """Response models as the route's response_model_exclude_unset=True would serialize them."""
+    if isinstance(body, BaseModel):
+        return body.model_dump(mode="json", exclude_unset=True)
+    if isinstance(body, list):
+        return [_json_data(b) for b in body]
+    return body
+
+
+def _conditional_json(request: Request, response: Response, body: Any) -> Response:
+    """
+    body rendered once to JSON, with a strong ETag (hash of those bytes), or a bodyless 304 when the client's
+    If-None-Match already has it. Bodies come from the ticket/comment caches while they are fresh, so a 304 then
+    costs no Jira call.
+    """
+    content = dumps(_json_data(body))
+    etag = '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+    headers = {**response.headers, "ETag": etag, "Cache-Control": "no-cache"}  # always revalidate; cheap with the tag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison, as RFC 9110 prescribes for If-None-Match (compressed responses carry W/ tags)
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
+
+
+def _ndjson_tickets(jql: str, page_size: int, limit: int | None) -> StreamingResponse:
+    """
+    Stream every matching ticket as one JSON object per line, as soon as its page is parsed.
+    The first page is fetched before responding so config/Jira errors still map to 503/502.
+    """
+    tickets = iter_tickets(jql=jql, page_size=page_size)
+    try:
+        first = next(tickets, None)
+    except ValueError as e:
+        raise HTTPException(status_code=503 if not settings.jira_configured else 400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Jira request failed: {e}")
+
+    def lines() -> Iterator[str]:
+        if first is None:
+            return
+        sent = 0
+        try:
+            for t in itertools.chain([first], tickets):
+                if limit is not None and sent >= limit:
+                    return
+                yield t.model_dump_json() + "\n"
+                sent += 1
+        except Exception as e:
+            # Headers are already sent; report the failure as a final line
+            yield json.dumps({"error": f"Jira request failed: {e}"}) + "\n"
+        finally:
+            tickets.close()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
 
-@router.get("", response_model=list[TicketSummary])
+
+@router.get("/stream", response_class=StreamingResponse)
+def stream_tickets(
+    jql: str = Query(default=DEFAULT_JQL, description="JQL query"),
+    page_size: int = Query(default=100, ge=1, le=100, description="Jira page size"),
+    limit: int | None = Query(default=None, ge=1, description="Stop after this many tickets (default: all)"),
+):
+    """Export every ticket matching the JQL as NDJSON (one TicketSummary per line), following all pages."""
+    return _ndjson_tickets(jql, page_size, limit)
+
+
+@router.get("/search", response_model=TicketSearchResponse)
+def search_tickets(
+    q: str = Query(..., min_length=1, description="Free text; every word must match, the last one as a prefix"),
+    limit: int = Query(default=20, ge=1, le=100),
+    project: str | None = Query(default=None, description="Restrict to one project key"),
+) -> TicketSearchResponse:
+    """
+    Full-text search over summaries, descriptions and comments of tickets this service has fetched (or mirrored),
+    ranked by relevance with highlighted snippets. Served from the local index; Jira is not called.
+    """
+    if not search_index.enabled:
+        raise HTTPException(status_code=503, detail="Ticket search index is disabled (TICKET_SEARCH_DB_PATH)")
+    return TicketSearchResponse(query=q, results=search_index.search(q, limit=limit, project=project))
+
+
+@router.get("", response_model=list[TicketFields], response_model_exclude_unset=True)
 def list_tickets(
+    request: Request,
+    response: Response,
     jql: str = Query(default=DEFAULT_JQL, description="JQL query"),
     max_results: int = Query(default=50, ge=1, le=100),
     start_at: int = Query(default=0, ge=0),
-) -> list[TicketSummary]:
-    """Fetch tickets from Jira using JQL."""
+    cursor: str | None = Query(default=None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    max_staleness: float | None = Query(
+        default=None, ge=0, description="Max age in seconds of mirrored data (default JIRA_MIRROR_MAX_STALENESS_SECONDS; 0 = live)"
+    ),
+    fields: str | None = _FIELDS_QUERY,
+    include_raw: bool = _INCLUDE_RAW_QUERY,
+) -> list[TicketFields]:
+    """
+    Fetch tickets from Jira using JQL. If more results exist, the X-Next-Cursor header holds the next page cursor.
+    By default each ticket has key, summary, status, issue_type and assignee; 'fields' picks others, and only those
+    are requested from Jira.
+    With 'Accept: application/x-ndjson' every matching ticket is streamed instead (same as /tickets/stream).
+    """
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return _ndjson_tickets(jql, max_results, None)
+    wanted = _requested_fields(fields)
     try:
-        return fetch_tickets(jql=jql, max_results=max_results, start_at=start_at)
+        if include_raw or (wanted is not None and not _SUMMARY_FIELDS.issuperset(wanted)):
+            tickets, next_cursor = fetch_ticket_fields_page(
+                jql, wanted, max_results=max_results, cursor=cursor, start_at=start_at, include_raw=include_raw
+            )
+        else:
+            tickets, next_cursor = fetch_tickets_page(
+                jql=jql, max_results=max_results, cursor=cursor, start_at=start_at, max_staleness=max_staleness
+            )
     except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+        # Not configured -> 503; otherwise the cursor was rejected
+        raise HTTPException(status_code=503 if not settings.jira_configured else 400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Jira request failed: {e}")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = [_compact(t, wanted, include_raw) for t in tickets]
+    return _conditional_json(request, response, body)
 
 
-@router.get("/{ticket_id}", response_model=TicketDetail)
-def get_ticket(ticket_id: str) -> TicketDetail:
-    """Get a single ticket by key (e.g. PROJ-123)."""
+@router.post("/batch", response_model=TicketBatchResponse)
+def get_tickets_batch(body: TicketBatchRequest) -> TicketBatchResponse:
+    """Fetch many tickets by key in a few 'key in (...)' searches instead of one request per ticket."""
     try:
-        return fetch_ticket(ticket_id)
+        tickets, missing = fetch_tickets_by_keys(body.keys)
+    except ValueError as e:
+        raise HTTPException(status_code=503 if not settings.jira_configured else 400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Jira request failed: {e}")
+    return TicketBatchResponse(tickets=tickets, missing=missing)
+
+
+@router.get("/{ticket_id}", response_model=TicketFields, response_model_exclude_unset=True)
+def get_ticket(
+    request: Request,
+    response: Response,
+    ticket_id: str,
+    max_staleness: float | None = Query(
+        default=None, ge=0, description="Max age in seconds of mirrored data (default JIRA_MIRROR_MAX_STALENESS_SECONDS; 0 = live)"
+    ),
+    fields: str | None = _FIELDS_QUERY,
+    include_raw: bool = _INCLUDE_RAW_QUERY,
+) -> TicketFields:
+    """
+    Get a single ticket by key (e.g. PROJ-123), optionally only some fields. Carries an ETag; a matching
+    If-None-Match gets 304 (served from the ticket cache without calling Jira while it is fresh).
+    """
+    wanted = _requested_fields(fields)
+    try:
+        ticket = fetch_ticket(ticket_id, max_staleness=max_staleness, fields=wanted, include_raw=include_raw)
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Ticket not found or error: {e}")
+    body = _compact(ticket, wanted, include_raw)
+    return _conditional_json(request, response, body)
 
 @router.get("/{ticket_id}/comments")
-def get_ticket_comments(ticket_id: str):
-    """Get comments for a single ticket."""
+def get_ticket_comments(
+    request: Request,
+    response: Response,
+    ticket_id: str,
+    since: datetime | None = Query(default=None, description="Only comments created or edited after this ISO time (naive = UTC)"),
+    order_by: str = Query(default="created", pattern="^[-+]?created$", description="'created' (oldest first) or '-created'"),
+    start_at: int = Query(default=0, ge=0),
+    max_results: int | None = Query(default=None, ge=1, description="Page size; default: every matching comment"),
+):
+    """
+    Get comments for a single ticket, bodies as Markdown. The whole thread is fetched (all Jira pages) and cached
+    per ticket; 'total' counts the comments matching 'since' before paging. ETag / If-None-Match as for tickets.
+    """
     from app.services.jira_service import fetch_ticket_comments
     try:
         comments = fetch_ticket_comments(ticket_id)
-        return {"comments": comments}
+        page, total = select_comments(
+            comments, since=since, newest_first=order_by == "-created", start_at=start_at, max_results=max_results
+        )
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Comments not found or error: {e}")
+    body = {"comments": page, "total": total, "start_at": start_at, "max_results": max_results}
+    return _conditional_json(request, response, body)
 
 @router.get("/{ticket_id}/pr")
-def check_ticket_pr(ticket_id: str):
-    """Check if a GitHub PR exists for this ticket branch."""
+def check_ticket_pr(request: Request, response: Response, ticket_id: str):
+    """Check if a GitHub PR exists for this ticket branch (with an ETag, like the ticket endpoints)."""
     from app.config import settings
     if not settings.github_token or not settings.github_default_repo_url:
         return {"pr_url": None}
@@ -58,9 +259,10 @@ def check_ticket_pr(ticket_id: str):
     branch_name = normalize_branch_name(ticket_id)
     try:
         pr_url = check_pull_request_exists(settings.github_default_repo_url, branch_name, settings.github_token)
-        return {"pr_url": pr_url}
     except Exception as e:
         return {"pr_url": None, "error": str(e)}
+    body = {"pr_url": pr_url}
+    return _conditional_json(request, response, body)
 
 
 class CodeReviewRequest(BaseModel):
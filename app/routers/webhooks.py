@@ -0,0 +1,38 @@
+"""Webhooks API: Jira pushes issue/comment changes here so cached data is refreshed without polling."""
+import json
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.jira_webhooks import SIGNATURE_HEADER, handle_event, note_rejected, run_refresh, verify_secret
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+@router.post("/jira")
+async def jira_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    secret: str | None = Query(default=None, description="Shared secret, if not using a signed webhook"),
+):
+    """
+    Receive Jira issue created/updated/deleted and comment events. Cached tickets, mirror rows and the search
+    index are invalidated immediately; known tickets are re-fetched in the background.
+    """
+    if not settings.jira_webhook_secret:
+        raise HTTPException(status_code=503, detail="Jira webhooks are not configured (JIRA_WEBHOOK_SECRET)")
+    body = await request.body()
+    if not verify_secret(body, request.headers.get(SIGNATURE_HEADER), secret):
+        note_rejected()
+        raise HTTPException(status_code=401, detail="Invalid webhook secret or signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook body must be a JSON object")
+    action, refreshes = await run_in_threadpool(handle_event, payload)  # SQLite (mirror, search index)
+    if refreshes:
+        background_tasks.add_task(run_refresh, refreshes)
+    return {"action": action, "refreshing": [key for _, key in refreshes]}
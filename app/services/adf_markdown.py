@@ -0,0 +1,471 @@
+"""
+Jira ADF (Atlassian Document Format) -> Markdown.
+
+Iterative walk with an explicit stack, so deeply nested documents (lists in panels in lists...) cannot hit the
+recursion limit, and a single output buffer: list indentation and blockquote markers are written once at the
+start of each line instead of re-indenting finished sub-strings. Each node type has a handler on _Writer. Runs
+on every fetched ticket and comment, so the usual shapes (paragraphs of inline nodes, list items holding only
+such paragraphs, tables of such cells) are written by their parent's handler in one go instead of node by node
+through the stack.
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+_ENTER = 0
+_EXIT = 1
+
+# Node types rendered as the concatenation of their children (plus block spacing).
+_CONTAINERS = frozenset(("doc", "bodiedExtension", "layoutSection", "layoutColumn", "extensionFrame"))
+_QUOTES = frozenset(("blockquote", "panel"))
+_EXPANDS = frozenset(("expand", "nestedExpand"))
+_LISTS = frozenset(("bulletList", "orderedList", "taskList", "decisionList"))
+_CELLS = frozenset(("tableCell", "tableHeader"))
+
+
+_DELIMITERS = {"strong": "**", "em": "*", "strike": "~~"}
+_SINGLE_MARK_DELIMITERS = {**_DELIMITERS, "code": "`"}
+
+
+def _marked(text: str, marks: list[dict[str, Any]]) -> str:
+    """Apply inline marks; surrounding whitespace is kept outside the delimiters so Markdown still parses."""
+    if len(marks) == 1 and text and text[0] != " " and text[-1] != " ":
+        # Common case: one bold/italic/code/strike/link mark on a run without surrounding spaces
+        mark = marks[0]
+        if isinstance(mark, dict):
+            t = mark.get("type")
+            d = _SINGLE_MARK_DELIMITERS.get(t)
+            if d:
+                return d + text + d
+            if t == "link":
+                return f"[{text}]({(mark.get('attrs') or {}).get('href', '')})"
+    core = text.strip()
+    if not core:
+        return text
+    opening = closing = ""
+    href = None
+    code = False
+    for mark in marks:
+        t = mark.get("type") if isinstance(mark, dict) else None
+        d = _DELIMITERS.get(t)
+        if d:
+            opening += d
+            closing = d + closing
+        elif t == "code":
+            code = True
+        elif t == "link":
+            href = (mark.get("attrs") or {}).get("href", "")
+    if code:
+        core = f"`{core}`"
+    core = opening + core + closing
+    if href is not None:
+        core = f"[{core}]({href})"
+    return core if len(core) == len(text) else text.replace(text.strip(), core, 1)
+
+
+def _atom(node_type: str, attrs: dict[str, Any]) -> str:
+    """Inline leaf nodes that carry their text in attrs."""
+    if node_type == "mention":
+        text = attrs.get("text") or attrs.get("id") or ""
+        return text if text.startswith("@") else f"@{text}"
+    if node_type == "emoji":
+        return attrs.get("text") or attrs.get("shortName") or ""
+    if node_type == "status":
+        return f"[{attrs.get('text', '')}]"
+    if node_type == "date":
+        try:
+            ts = int(attrs.get("timestamp")) / 1000
+            return datetime.fromtimestamp(ts, tz=timezone.utc).date().isoformat()
+        except (TypeError, ValueError, OverflowError, OSError):
+            return ""
+    if node_type in ("inlineCard", "blockCard", "embedCard"):
+        url = attrs.get("url") or ""
+        return f"<{url}>" if url else ""
+    if node_type in ("media", "mediaInline"):
+        name = attrs.get("alt") or attrs.get("filename") or attrs.get("id") or "attachment"
+        url = attrs.get("url")
+        return f"![{name}]({url})" if url else f"[attachment: {name}]"
+    return attrs.get("text") or ""
+
+
+def _inline_text(children: Any) -> str | None:
+    """
+    Render a run of inline nodes (the usual content of paragraphs and headings) in one loop, without going
+    through the node stack. None if a child has block content, so the caller falls back to the full walk.
+    """
+    # Runs are short (a few nodes): appending to one str is cheaper than collecting parts for join()
+    out = ""
+    try:
+        for c in children:
+            t = c.get("type")
+            if t == "text":
+                text = c.get("text") or ""
+                marks = c.get("marks")
+                out += _marked(text, marks) if marks else text
+            elif t == "hardBreak":
+                out += "\n"
+            elif "content" in c:
+                return None
+            else:
+                out += _atom(t or "", c.get("attrs") or {})
+    except AttributeError:  # malformed child; the full walk skips it
+        return None
+    return out
+
+
+def _simple_cell(children: Any) -> str | None:
+    """Cell text for the common case of a cell holding only paragraphs of inline content, else None."""
+    texts = []
+    for c in children:
+        if not isinstance(c, dict) or c.get("type") != "paragraph":
+            return None
+        inline = _inline_text(c.get("content") or ())
+        if inline is None:
+            return None
+        texts.append(inline)
+    return _cell_text("\n".join(texts))
+
+
+def _simple_table(rows: Any) -> list[list[str]] | None:
+    """Cell texts, row by row, when every cell is a _simple_cell (the usual table), else None."""
+    out = []
+    for row in rows:
+        if not isinstance(row, dict) or row.get("type") != "tableRow":
+            return None
+        cells = []
+        content = row.get("content")
+        for cell in content if isinstance(content, list) else ():
+            if not isinstance(cell, dict) or cell.get("type") not in _CELLS:
+                return None
+            children = cell.get("content")
+            text = _simple_cell(children if isinstance(children, list) else ())
+            if text is None:
+                return None
+            cells.append(text)
+        out.append(cells)
+    return out
+
+
+def _simple_item(item: Any) -> list[str] | None:
+    """Paragraph texts of a list item holding only paragraphs of inline content (the usual item), else None."""
+    if not isinstance(item, dict) or item.get("type") != "listItem":
+        return None
+    content = item.get("content")
+    texts = []
+    for c in content if isinstance(content, list) else ():
+        if not isinstance(c, dict) or c.get("type") != "paragraph":
+            return None
+        children = c.get("content")
+        inline = _inline_text(children if isinstance(children, list) else ())
+        if inline is None:
+            return None
+        texts.append(inline)
+    return texts
+
+
+def _list_markers(node_type: str, node: dict[str, Any], items: list[Any]) -> list[str]:
+    if node_type == "orderedList":
+        try:
+            start = int((node.get("attrs") or {}).get("order", 1))
+        except (TypeError, ValueError):
+            start = 1
+        return [f"{start + i}. " for i in range(len(items))]
+    if node_type == "taskList":
+        return [
+            "* [x] " if isinstance(it, dict) and (it.get("attrs") or {}).get("state") == "DONE" else "* [ ] "
+            for it in items
+        ]
+    return ["* "] * len(items)
+
+
+def _cell_text(raw: str) -> str:
+    """Table cells must stay on one line: paragraphs become <br>, pipes are escaped."""
+    lines = raw.splitlines()
+    if len(lines) == 1:  # the usual cell: skip the generator
+        text = lines[0].strip()
+    else:
+        text = "<br>".join(line.strip() for line in lines if line.strip())
+    return text.replace("|", "\\|") if "|" in text else text
+
+
+def _table_lines(rows: list[list[str]]) -> list[str]:
+    rows = [r for r in rows if r]
+    if not rows:
+        return []
+    width = max(len(r) for r in rows)
+    lines = ["| " + " | ".join(r + [""] * (width - len(r))) + " |" for r in rows]
+    lines.insert(1, "|" + " --- |" * width)
+    return lines
+
+
+class _Writer:
+    """
+    One conversion: the output buffer, the line state, and a handler per node type. The walk (adf_to_markdown)
+    pops work off an explicit stack; an enter handler writes what comes before a node's children and pushes the
+    exit handler that writes what comes after, and returns True when the children are to be walked.
+    """
+
+    def __init__(self) -> None:
+        self.out: list[str] = []
+        self.prefix: list[str] = []  # per-line prefixes: list indentation and '> '
+        self.lead = ""  # "".join(prefix)
+        self.line_start = True  # nothing written on the current line yet
+        self.pending = 0  # newlines owed before the next content (block separation)
+        self.started = False
+        self.in_item = 0  # list item depth: blocks inside items are separated by one newline instead of a blank line
+        self.tables: list[list[list[str]]] = []
+        self.captures: list[tuple] = []
+        self.stack: list[tuple[int, Any, Any]] = []
+
+    def emit(self, s: str) -> None:
+        """Write s (may contain newlines) at the current position, settling owed separators and prefixes."""
+        write = self.out.append
+        lead = self.lead
+        if self.pending:
+            head = "\n" if not self.line_start else ""
+            if self.pending > 1:
+                head += (lead.rstrip() + "\n") * (self.pending - 1)
+            self.line_start = True
+            self.pending = 0
+            if "\n" not in s:
+                write(head + lead + s if s else head)
+                self.line_start = not s
+                self.started = True
+                return
+            write(head)
+        if "\n" in s:
+            lines = s.split("\n")
+            last = lines.pop()
+            for line in lines:
+                if line:
+                    write(lead + line + "\n" if self.line_start else line + "\n")
+                else:
+                    write(lead.rstrip() + "\n" if self.line_start else "\n")
+                self.line_start = True
+            s = last
+            self.started = True
+            if not s:
+                return
+        if self.line_start:
+            write(lead + s if lead else s)
+            self.line_start = False
+        else:
+            write(s)
+        self.started = True
+
+    def end_block(self) -> None:
+        """Owe the separator after a block: a blank line, or one newline inside a list item."""
+        gap = 1 if self.in_item else 2
+        if self.started and self.pending < gap:
+            self.pending = gap
+
+    def push_exit(self, handler: Callable[["_Writer"], None]) -> None:
+        self.stack.append((_EXIT, handler, None))
+
+    def _push_prefix(self, s: str) -> None:
+        self.prefix.append(s)
+        self.lead += s
+
+    def _pop_prefix(self) -> None:
+        self.lead = self.lead[: len(self.lead) - len(self.prefix.pop())]
+
+    # Enter handlers: (node, children, arg pushed with the node) -> walk the children?
+
+    def paragraph(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        if n.get("type") == "heading":
+            try:
+                level = min(max(int((n.get("attrs") or {}).get("level", 1)), 1), 6)
+            except (TypeError, ValueError):
+                level = 1
+            self.emit("#" * level + " ")
+        inline = _inline_text(children)
+        if inline is None:
+            self.push_exit(_Writer.end_block)
+            return True
+        if inline:
+            self.emit(inline)
+        self.end_block()
+        return False
+
+    def text(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        text = n.get("text") or ""
+        marks = n.get("marks")
+        self.emit(_marked(text, marks) if marks else text)
+        return False
+
+    def hard_break(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        self.emit("\n")
+        return False
+
+    def list_block(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        self.push_exit(_Writer.end_block)
+        markers = _list_markers(n.get("type"), n, children)
+        for k, child in enumerate(children):
+            texts = _simple_item(child)
+            if texts is None:
+                # This item (and so the ones after it) goes through the stack
+                for rest, m in zip(reversed(children[k:]), reversed(markers[k:])):
+                    self.stack.append((_ENTER, rest, m))
+                break
+            # Usual item: written here rather than through the stack, with the same spacing as list_item
+            marker = markers[k]
+            self.emit(marker)
+            if len(texts) == 1 and "\n" not in texts[0]:
+                self.out.append(texts[0])  # one line: the rest of the marker's line
+            else:
+                saved_lead = self.lead
+                self.lead += " " * len(marker)
+                for text in texts:
+                    if text:
+                        self.emit(text)
+                    if self.pending < 1:
+                        self.pending = 1
+                self.lead = saved_lead
+            if self.pending < 1:
+                self.pending = 1
+        return False
+
+    def list_item(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        marker = arg or "* "
+        self.emit(marker)
+        self._push_prefix(" " * len(marker))
+        self.in_item += 1
+        self.push_exit(_Writer.end_item)
+        return True
+
+    def code_block(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        lang = (n.get("attrs") or {}).get("language") or ""
+        code = "".join(c.get("text", "") for c in children if isinstance(c, dict))
+        self.emit("```" + lang + "\n" + code.rstrip("\n") + "\n```")
+        self.end_block()
+        return False
+
+    def quote(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        if self.pending:
+            self.emit("")
+        self._push_prefix("> ")
+        self.push_exit(_Writer.end_quote)
+        return True
+
+    def expand(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        title = (n.get("attrs") or {}).get("title")
+        if title:
+            self.emit(f"**{title}**")
+            self.end_block()
+        self.push_exit(_Writer.end_block)
+        return True
+
+    def rule(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        self.emit("---")
+        self.end_block()
+        return False
+
+    def table(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        rows = _simple_table(children)
+        if rows is None:
+            self.tables.append([])
+            self.push_exit(_Writer.end_table)
+            return True
+        # Usual table: written here rather than cell by cell through the stack
+        self._write_table(rows)
+        return False
+
+    def table_row(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        if self.tables:
+            self.tables[-1].append([])
+        return True
+
+    def cell(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        if not (self.tables and self.tables[-1]):
+            return True
+        cell = _simple_cell(children)
+        if cell is not None:
+            self.tables[-1][-1].append(cell)
+            return False
+        # Rendered into the same buffer, detached from the surrounding prefix, then cut out by end_cell
+        self.captures.append(
+            (len(self.out), self.prefix, self.lead, self.line_start, self.pending, self.started, self.in_item)
+        )
+        self.prefix, self.lead, self.line_start, self.pending, self.started, self.in_item = [], "", True, 0, False, 0
+        self.push_exit(_Writer.end_cell)
+        return True
+
+    def media(self, n: dict[str, Any], children: Any, arg: Any) -> bool:
+        t = n.get("type")
+        if t == "blockCard" or t == "embedCard":
+            self.emit(_atom(t, n.get("attrs") or {}))
+        self.push_exit(_Writer.end_block)
+        return True
+
+    # Exit handlers
+
+    def end_item(self) -> None:
+        self._pop_prefix()
+        self.in_item -= 1
+        if self.started and self.pending < 1:
+            self.pending = 1
+
+    def end_quote(self) -> None:
+        self._pop_prefix()
+        self.end_block()
+
+    def end_cell(self) -> None:
+        start, self.prefix, self.lead, self.line_start, self.pending, self.started, self.in_item = self.captures.pop()
+        self.tables[-1][-1].append(_cell_text("".join(self.out[start:])))
+        del self.out[start:]
+
+    def end_table(self) -> None:
+        self._write_table(self.tables.pop())
+
+    def _write_table(self, rows: list[list[str]]) -> None:
+        lines = _table_lines(rows)
+        if lines:
+            self.emit("\n".join(lines))
+            self.end_block()
+
+
+_ENTER_HANDLERS: dict[str, Callable[[_Writer, dict[str, Any], Any, Any], bool]] = {
+    "paragraph": _Writer.paragraph,
+    "heading": _Writer.paragraph,
+    "text": _Writer.text,
+    "hardBreak": _Writer.hard_break,
+    **dict.fromkeys(_LISTS, _Writer.list_block),
+    **dict.fromkeys(("listItem", "taskItem", "decisionItem"), _Writer.list_item),
+    "codeBlock": _Writer.code_block,
+    **dict.fromkeys(_QUOTES, _Writer.quote),
+    **dict.fromkeys(_EXPANDS, _Writer.expand),
+    "rule": _Writer.rule,
+    "table": _Writer.table,
+    "tableRow": _Writer.table_row,
+    **dict.fromkeys(_CELLS, _Writer.cell),
+    **dict.fromkeys(("mediaSingle", "mediaGroup", "blockCard", "embedCard"), _Writer.media),
+}
+
+
+def adf_to_markdown(node: dict[str, Any]) -> str:
+    """Convert an ADF document (or any ADF node) to Markdown."""
+    if not isinstance(node, dict):
+        return ""
+    w = _Writer()
+    stack = w.stack
+    stack.append((_ENTER, node, None))
+    handlers = _ENTER_HANDLERS
+    while stack:
+        op, n, arg = stack.pop()
+        if op == _EXIT:
+            n(w)
+            continue
+        if not isinstance(n, dict):
+            continue
+        t = n.get("type")
+        content = n.get("content")
+        children = content if isinstance(content, list) else ()
+        handler = handlers.get(t)
+        if handler is not None:
+            if not handler(w, n, children, arg):
+                continue
+        elif t not in _CONTAINERS and not children:
+            w.emit(_atom(t or "", n.get("attrs") or {}))
+            continue
+        for child in reversed(children):
+            stack.append((_ENTER, child, None))
+    return "".join(w.out)
@@ -2,41 +2,13 @@
 import json
 import re
 
-import httpx
-
-from app.config import settings
 from app.models import TicketDetail
-from app.services.jira_service import ticket_to_context_string
-
-GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+from app.services.llm_client import chat_completion
+from app.services.prompt_builder import build_prompt_parts
 
 
 def _call_groq(system: str, user: str) -> str:
-    if not settings.groq_api_key:
-        raise ValueError("GROQ_API_KEY is not set")
-    with httpx.Client(timeout=120.0) as client:
-        r = client.post(
-            GROQ_CHAT_URL,
-            headers={
-                "Authorization": f"Bearer {settings.groq_api_key.strip()}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": settings.groq_model,
-                "messages": [
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                "stream": False,
-            },
-        )
-        if r.status_code != 200:
-            raise RuntimeError(f"Groq API error {r.status_code}: {r.text}")
-        data = r.json()
-    choices = data.get("choices") or []
-    if not choices:
-        return ""
-    return (choices[0].get("message") or {}).get("content") or ""
+    return chat_completion(system, user) or ""
 
 
 def _parse_files_json(raw: str) -> list[dict]:
@@ -66,10 +38,10 @@ def generate_code_changes(
     Ask Groq for concrete code changes. Returns list of {path, content}.
     Paths are relative to repo root. Validates: no '..', no absolute.
     """
-    ctx = ticket_to_context_string(ticket)
+    parts = build_prompt_parts(ticket, solution=solution, repo_files=repo_file_list)
     file_hint = ""
-    if repo_file_list:
-        file_hint = f"\nExisting files in repo (prefer editing these): {', '.join(repo_file_list[:50])}"
+    if parts.repo_hints:
+        file_hint = f"\nExisting files in repo (prefer editing these): {parts.repo_hints}"
     lang_lower = language.strip().lower()
     practices = {
         "python": "Follow PEP 8 and use type hints where appropriate.",
@@ -88,7 +60,7 @@ def generate_code_changes(
         f"{practice}"
     )
     user = (
-        f"Ticket context:\n{ctx}\n\nSolution:\n{solution}\n\n"
+        f"Ticket context:\n{parts.context}\n\nSolution:\n{parts.solution}\n\n"
         f"Language: {language}{file_hint}\n\n"
         "Output the JSON with 'files' array (path and content for each file)."
     )
@@ -116,12 +88,12 @@ def generate_tests(
     """
     Ask Groq for test files. Returns list of {path, content}.
     """
-    ctx = ticket_to_context_string(ticket)
+    parts = build_prompt_parts(ticket, solution=solution, repo_files=changed_file_paths)
     lang_lower = language.strip().lower()
     framework = (test_framework or "").strip() or {"python": "pytest", "typescript": "jest", "javascript": "jest"}.get(lang_lower, "standard")
     changed_hint = ""
-    if changed_file_paths:
-        changed_hint = f"\nImplementations to test: {', '.join(changed_file_paths[:30])}"
+    if parts.repo_hints:
+        changed_hint = f"\nImplementations to test: {parts.repo_hints}"
 
     system = (
         "You are a test generator. Given a Jira ticket and solution, output test files as JSON only. "
@@ -131,7 +103,7 @@ def generate_tests(
         f"Use {framework} style for {language}."
     )
     user = (
-        f"Ticket context:\n{ctx}\n\nSolution:\n{solution}\n\n"
+        f"Ticket context:\n{parts.context}\n\nSolution:\n{parts.solution}\n\n"
         f"Language: {language}, test framework: {framework}{changed_hint}\n\n"
         "Output the JSON with 'files' array (path and content for each test file)."
     )
@@ -0,0 +1,46 @@
+"""
+In-process LRU cache of each ticket's whole comment thread, bodies already converted to Markdown.
+
+Within COMMENT_CACHE_TTL_SECONDS a thread is served without calling Jira. After that, if the issue's 'updated'
+timestamp was known when the thread was fetched, only that field is re-read (adding or editing a comment bumps it)
+and the thread is re-fetched only if it changed. Comments posted through this API and comment webhooks drop the
+entry. Cached lists are shared between callers; treat them as read-only.
+"""
+from dataclasses import dataclass
+
+from app.config import settings
+from app.services.ttl_cache import TTLCache
+
+
+@dataclass
+class CachedComments:
+    comments: list[dict]
+    issue_updated: str | None  # issue 'updated' read before the thread was fetched; None = cannot revalidate
+    fresh: bool
+
+
+class CommentCache(TTLCache[tuple[list[dict], str | None]]):
+    """Values are (comments, issue_updated)."""
+
+    def get(self, ticket_id: str) -> CachedComments | None:
+        """Cached thread (fresh or needing revalidation), or None on a miss."""
+        entry = self._lookup(ticket_id)
+        if entry is None:
+            return None
+        (comments, issue_updated), fresh = entry
+        return CachedComments(comments, issue_updated, fresh)
+
+    def put(
+        self,
+        ticket_id: str,
+        comments: list[dict],
+        issue_updated: str | None,
+        *,
+        changed: bool = False,
+        generation: int | None = None,
+    ) -> bool:
+        """Store a freshly fetched thread; changed and generation as in TicketCache.put()."""
+        return self._store(ticket_id, (comments, issue_updated), changed, generation)
+
+
+comment_cache = CommentCache(settings.comment_cache_max_entries, settings.comment_cache_ttl_seconds)
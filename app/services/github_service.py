@@ -3,6 +3,11 @@ import re
 
 import httpx
 
+from app.services.single_flight import SingleFlight
+
+# Concurrent lookups of the same branch's PR (UI status checks, code review) share one GitHub request
+pr_lookup_flight = SingleFlight("github_pr_lookup")
+
 
 def parse_repo_owner_name(repo_url: str) -> tuple[str, str] | None:
     """Extract owner and repo name from HTTPS or SSH URL. Returns (owner, name) or None."""
@@ -73,6 +78,12 @@ def get_pull_request_by_branch(
     """
     Get PR info by head branch. Returns dict with html_url and number, or None.
     """
+    return pr_lookup_flight.do(
+        (repo_url, head_branch, token), lambda: _get_pull_request_by_branch(repo_url, head_branch, token)
+    )
+
+
+def _get_pull_request_by_branch(repo_url: str, head_branch: str, token: str) -> dict | None:
     parsed = parse_repo_owner_name(repo_url)
     if not parsed:
         return None
@@ -1,11 +1,19 @@
-"""Groq API client for generating solutions from ticket context. Get key: https://console.groq.com/keys"""
-import httpx
+"""
+Groq prompts for solutions and ticket drafts (sent through llm_client). Get key: https://console.groq.com/keys
+
+Solutions go through solution_cache: cache="use" (default) answers a repeated prompt from disk, "refresh" asks
+the LLM and replaces the stored answer, "bypass" neither reads nor writes it.
+"""
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 
 from app.config import settings
 from app.models import TicketDetail
-from app.services.jira_service import is_story_or_epic, ticket_to_context_string
-
-GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+from app.services.jira_common import is_story_or_epic
+from app.services.llm_client import chat_completion, chat_completion_async, chat_completion_stream
+from app.services.prompt_builder import build_prompt_parts
+from app.services.solution_cache import CacheMode, cache_key, cached_solution, store_solution
 
 # Supported models: llama-3.3-70b-versatile, llama-3.1-8b-instant, mixtral-8x7b-32768, etc.
 # See https://console.groq.com/docs/models
@@ -38,17 +46,15 @@ PLAN_SOLUTION_SUBTASKS_SYSTEM = (
 )
 
 
-def get_solution_from_groq(
+def _solution_prompt(
     ticket: TicketDetail,
     question: str,
     *,
     as_plan_and_solution: bool = False,
     include_subtasks_for_story_epic: bool = False,
-) -> str:
-    """Call Groq API with ticket context and question; return the model response."""
-    if not settings.groq_api_key:
-        raise ValueError("GROQ_API_KEY is not set. Get a key at https://console.groq.com/keys")
-    ticket_context = ticket_to_context_string(ticket)
+) -> tuple[str, str]:
+    """(system, user) messages for a ticket solution."""
+    ticket_context = build_prompt_parts(ticket).context
     use_subtasks = include_subtasks_for_story_epic and is_story_or_epic(ticket)
     if as_plan_and_solution and use_subtasks:
         system_content = PLAN_SOLUTION_SUBTASKS_SYSTEM
@@ -60,43 +66,110 @@ def get_solution_from_groq(
             "Use the ticket context (key, summary, description, status, etc.) to give concise, actionable advice."
         )
     user_content = f"Ticket context:\n{ticket_context}\n\nUser question: {question}"
-    payload = {
-        "model": settings.groq_model,
-        "messages": [
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_content},
-        ],
-        "stream": False,
-    }
-    with httpx.Client(timeout=120.0) as client:
-        r = client.post(
-            GROQ_CHAT_URL,
-            headers={
-                "Authorization": f"Bearer {settings.groq_api_key.strip()}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-        if r.status_code != 200:
-            err_body = r.text
-            try:
-                err_json = r.json()
-                err_body = err_json.get("error", {}).get("message", err_body) or err_json.get("message", err_body)
-            except Exception:
-                pass
-            raise RuntimeError(f"Groq API error {r.status_code}: {err_body}")
-        data = r.json()
-    choices = data.get("choices") or []
-    if not choices:
+    return system_content, user_content
+
+
+def _solution_text(text: str | None) -> str:
+    if text is None:
         return "No response from Groq."
-    msg = choices[0].get("message") or {}
-    return msg.get("content") or "Empty response from Groq."
+    return text or "Empty response from Groq."
+
+
+def _cache_lookup(system: str, user: str, cache: CacheMode) -> tuple[str | None, str | None]:
+    """(cache key or None when bypassing, cached solution or None)."""
+    if cache == "bypass":
+        return None, None
+    key = cache_key(settings.groq_model, system, user)
+    return key, cached_solution(key) if cache == "use" else None
+
+
+def _cache_store(key: str | None, ticket: TicketDetail, text: str | None) -> None:
+    # Only real answers are kept; "No response" / "Empty response" placeholders are not
+    if key is not None and text:
+        store_solution(key, text, model=settings.groq_model, ticket_key=ticket.key)
+
+
+def get_solution_from_groq(
+    ticket: TicketDetail,
+    question: str,
+    *,
+    as_plan_and_solution: bool = False,
+    include_subtasks_for_story_epic: bool = False,
+    cache: CacheMode = "use",
+) -> str:
+    """Call Groq API with ticket context and question; return the model response."""
+    system, user = _solution_prompt(
+        ticket,
+        question,
+        as_plan_and_solution=as_plan_and_solution,
+        include_subtasks_for_story_epic=include_subtasks_for_story_epic,
+    )
+    key, cached = _cache_lookup(system, user, cache)
+    if cached is not None:
+        return cached
+    text = chat_completion(system, user)
+    _cache_store(key, ticket, text)
+    return _solution_text(text)
+
+
+async def get_solution_from_groq_async(
+    ticket: TicketDetail,
+    question: str,
+    *,
+    as_plan_and_solution: bool = False,
+    include_subtasks_for_story_epic: bool = False,
+    cache: CacheMode = "use",
+) -> str:
+    """Async variant of get_solution_from_groq() for async routes (does not block the event loop)."""
+    system, user = _solution_prompt(
+        ticket,
+        question,
+        as_plan_and_solution=as_plan_and_solution,
+        include_subtasks_for_story_epic=include_subtasks_for_story_epic,
+    )
+    # The cache is SQLite: look up and store in a thread so a busy database never blocks the event loop
+    key, cached = await asyncio.to_thread(_cache_lookup, system, user, cache)
+    if cached is not None:
+        return cached
+    text = await chat_completion_async(system, user)
+    await asyncio.to_thread(_cache_store, key, ticket, text)
+    return _solution_text(text)
+
+
+async def stream_solution_from_groq(
+    ticket: TicketDetail,
+    question: str,
+    *,
+    as_plan_and_solution: bool = False,
+    include_subtasks_for_story_epic: bool = False,
+    cache: CacheMode = "use",
+) -> AsyncIterator[str]:
+    """
+    get_solution_from_groq_async() as the text arrives; joined, the pieces are the same solution. A cached
+    answer comes as one piece; a streamed one is stored only if the stream was read to the end.
+    """
+    system, user = _solution_prompt(
+        ticket,
+        question,
+        as_plan_and_solution=as_plan_and_solution,
+        include_subtasks_for_story_epic=include_subtasks_for_story_epic,
+    )
+    key, cached = await asyncio.to_thread(_cache_lookup, system, user, cache)
+    if cached is not None:
+        yield cached
+        return
+    parts: list[str] = []
+    async with aclosing(chat_completion_stream(system, user)) as pieces:
+        async for text in pieces:
+            parts.append(text)
+            yield text
+    await asyncio.to_thread(_cache_store, key, ticket, "".join(parts))
+    if not parts:
+        yield _solution_text("")
+
 
 def generate_ticket_draft(prompt: str, existing_context: str = None) -> str:
     """Call Groq API to draft a Jira ticket from a one-liner prompt. Returns JSON string."""
-    if not settings.groq_api_key:
-        raise ValueError("GROQ_API_KEY is not set. Get a key at https://console.groq.com/keys")
-    
     system_content = (
         "You are an expert Agile Product Manager and Technical Lead. Your job is to take a short one-liner prompt from a user "
         "and draft a comprehensive Jira ticket in highly professional language with structured formatting.\n"
@@ -106,28 +179,6 @@ def generate_ticket_draft(prompt: str, existing_context: str = None) -> str:
     user_content = f"User prompt: {prompt}"
     if existing_context:
         user_content += f"\n\nExisting Ticket Context for Update:\n{existing_context}"
-        
-    payload = {
-        "model": settings.groq_model,
-        "messages": [
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_content},
-        ],
-        "response_format": {"type": "json_object"},
-        "stream": False,
-    }
-    with httpx.Client(timeout=60.0) as client:
-        r = client.post(
-            GROQ_CHAT_URL,
-            headers={"Authorization": f"Bearer {settings.groq_api_key.strip()}", "Content-Type": "application/json"},
-            json=payload,
-        )
-        if r.status_code != 200:
-            raise RuntimeError(f"Groq API error {r.status_code}: {r.text}")
-        data = r.json()
-    
-    choices = data.get("choices") or []
-    if not choices:
-        return "{}"
-    msg = choices[0].get("message") or {}
-    return msg.get("content") or "{}"
+
+    text = chat_completion(system_content, user_content, response_format={"type": "json_object"}, timeout=60.0)
+    return text or "{}"
@@ -0,0 +1,409 @@
+"""Async twin of jira_service for async routes: same functions, awaited over a pooled httpx.AsyncClient."""
+import asyncio
+import logging
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.models import SubtaskItem, TicketDetail, TicketSummary
+from app.services.comment_cache import comment_cache
+from app.services.jira_common import (
+    DEFAULT_JQL,
+    DETAIL_FIELDS,
+    LEGACY_CREATEMETA_PATH,
+    SEARCH_FIELDS,
+    SUBTASK_BULK_MAX,
+    SUBTASK_ISSUETYPE_ERROR,
+    bulk_outcome,
+    bulk_payload,
+    cached_subtask_type_id,
+    comment_page_params,
+    comment_texts,
+    created_ticket,
+    createmeta_issuetypes,
+    createmeta_path,
+    extract_detail,
+    extract_summary,
+    forget_subtask_type_id,
+    jira_fields,
+    keys_jql,
+    keys_rejected_by_jira,
+    known_issue_updated,
+    markdown_comments,
+    mirrored_tickets_page,
+    new_ticket_fields,
+    normalize_issue_keys,
+    pick_subtask_type_id,
+    remaining_comment_starts,
+    remember_subtask_type_id,
+    subtask_fields,
+    subtask_issuetype_candidates,
+    ticket_changed,
+    ticket_flight,
+    ticket_flight_key,
+    ticket_update_fields,
+    unchanged_since,
+    updated_ticket,
+)
+from app.services.jira_governor import LANE_BULK, jira_lane
+from app.services.jira_http import get_async_jira_http_client
+from app.services.jira_search import MAX_PAGE_SIZE, offset_cursor, search_page_async
+from app.services.markdown_adf import markdown_to_adf
+from app.services.mirror_service import mirrored_ticket, store_mirrored_ticket
+from app.services.search_index import append_comment, index_comments, index_tickets
+from app.services.ticket_cache import ticket_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_tickets_page(
+    jql: str = DEFAULT_JQL,
+    max_results: int = 50,
+    cursor: str | None = None,
+    start_at: int = 0,
+    max_staleness: float | None = None,
+) -> tuple[list[TicketSummary], str | None]:
+    """Fetch one page of tickets via JQL search or the local mirror (see jira_service.fetch_tickets_page)."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured (JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN)")
+    max_results = min(max(1, max_results), 100)
+    cursor = cursor or offset_cursor(start_at)
+    # SQLite calls (mirror, search index) run in a thread: a busy database must not stall the event loop
+    mirrored = await asyncio.to_thread(mirrored_tickets_page, jql or DEFAULT_JQL, max_results, cursor, max_staleness)
+    if mirrored is not None:
+        return mirrored
+    page = await search_page_async(jql or DEFAULT_JQL, max_results, SEARCH_FIELDS, cursor)
+    return [extract_summary(i) for i in page.issues if isinstance(i, dict)], page.next_cursor
+
+
+async def fetch_tickets(
+    jql: str = DEFAULT_JQL,
+    max_results: int = 50,
+    start_at: int = 0,
+    max_staleness: float | None = None,
+) -> list[TicketSummary]:
+    """Fetch one page of tickets via JQL search."""
+    return (await fetch_tickets_page(jql, max_results, start_at=start_at, max_staleness=max_staleness))[0]
+
+
+async def fetch_ticket(
+    ticket_id: str,
+    max_staleness: float | None = None,
+    fields: list[str] | None = None,
+    include_raw: bool = False,
+) -> TicketDetail:
+    """Fetch a single ticket by key, through the shared ticket_cache and mirror (see jira_service.fetch_ticket)."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    return await ticket_flight.do_async(
+        ticket_flight_key(ticket_id, max_staleness, fields, include_raw),
+        lambda: _fetch_ticket(ticket_id, max_staleness, fields, include_raw),
+    )
+
+
+async def _fetch_ticket(
+    ticket_id: str, max_staleness: float | None, fields: list[str] | None, include_raw: bool
+) -> TicketDetail:
+    cached = None
+    generation = ticket_cache.generation(ticket_id)  # a write landing mid-fetch keeps this copy out
+    if not include_raw:
+        cached = ticket_cache.get(ticket_id)
+        if cached is not None and cached.fresh:
+            return cached.detail
+        mirrored = await asyncio.to_thread(mirrored_ticket, ticket_id, max_staleness)
+        if mirrored is not None:
+            return mirrored
+    client = get_async_jira_http_client()
+    if fields is not None:
+        r = await client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": jira_fields(fields)})
+        r.raise_for_status()
+        return extract_detail(r.json(), include_raw)
+    if cached is not None:
+        r = await client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": "updated"})
+        r.raise_for_status()
+        if unchanged_since(cached.detail, r.json()):
+            ticket_cache.mark_valid(ticket_id)
+            return cached.detail
+    r = await client.get(
+        f"/rest/api/3/issue/{ticket_id}",
+        params={"fields": DETAIL_FIELDS},
+    )
+    r.raise_for_status()
+    issue = r.json()
+    detail = extract_detail(issue)
+    if ticket_cache.put(ticket_id, detail, changed=cached is not None, generation=generation):
+        await asyncio.to_thread(store_mirrored_ticket, detail)
+    await asyncio.to_thread(index_tickets, [detail])
+    return detail.model_copy(update={"raw": issue}) if include_raw else detail
+
+
+async def _fetch_key_chunk(keys: list[str]) -> list[TicketDetail]:
+    """One 'key in (...)' search (see jira_service._fetch_key_chunk)."""
+    generations = {k: ticket_cache.generation(k) for k in keys}
+    try:
+        issues = (await search_page_async(keys_jql(keys), len(keys), DETAIL_FIELDS)).issues
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 400:
+            raise
+        remaining = [k for k in keys if k not in keys_rejected_by_jira(e.response, keys)]
+        if remaining and len(remaining) < len(keys):
+            return await _fetch_key_chunk(remaining)
+        logger.warning("Jira batch fetch: search rejected %d keys; fetching one by one", len(keys))
+        results = await asyncio.gather(*(fetch_ticket(k) for k in keys), return_exceptions=True)
+        found = []
+        for result in results:
+            if isinstance(result, httpx.HTTPStatusError) and result.response.status_code in (400, 403, 404):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            found.append(result)
+        return found
+    details = [extract_detail(i) for i in issues if isinstance(i, dict)]
+    for detail in details:
+        ticket_cache.put(detail.key, detail, generation=generations.get(detail.key))
+    await asyncio.to_thread(index_tickets, details)
+    return details
+
+
+async def fetch_tickets_by_keys(keys: list[str]) -> tuple[list[TicketDetail], list[str]]:
+    """Fetch many tickets with concurrent 'key in (...)' searches (see jira_service.fetch_tickets_by_keys)."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    wanted = normalize_issue_keys(keys)
+    by_key: dict[str, TicketDetail] = {}
+    to_fetch: list[str] = []
+    for key in wanted:
+        cached = ticket_cache.get(key)
+        if cached is not None and cached.fresh:
+            by_key[key] = cached.detail
+        else:
+            to_fetch.append(key)
+    limit = asyncio.Semaphore(max(1, settings.jira_batch_concurrency))
+
+    async def run(chunk: list[str]) -> list[TicketDetail]:
+        async with limit:
+            return await _fetch_key_chunk(chunk)
+
+    chunks = [to_fetch[i:i + MAX_PAGE_SIZE] for i in range(0, len(to_fetch), MAX_PAGE_SIZE)]
+    for details in await asyncio.gather(*(run(c) for c in chunks)):
+        by_key.update({d.key.upper(): d for d in details})
+    tickets = [by_key[k] for k in wanted if k in by_key]
+    missing = [k for k in wanted if k not in by_key]
+    return tickets, missing
+
+
+async def fetch_ticket_comments(ticket_id: str) -> list[dict]:
+    """Every comment of a ticket, oldest first, with Markdown bodies; paged and cached as in the sync version."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    generation = comment_cache.generation(ticket_id)
+    cached = comment_cache.get(ticket_id)
+    if cached is not None and cached.fresh:
+        return cached.comments
+    client = get_async_jira_http_client()
+    if cached is not None and cached.issue_updated:
+        r = await client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": "updated"})
+        r.raise_for_status()
+        issue_updated = (r.json().get("fields") or {}).get("updated")
+        if issue_updated == cached.issue_updated:
+            comment_cache.mark_valid(ticket_id)
+            return cached.comments
+    else:
+        issue_updated = known_issue_updated(ticket_id)
+    path = f"/rest/api/3/issue/{ticket_id}/comment"
+    limit = asyncio.Semaphore(max(1, settings.jira_batch_concurrency))
+
+    async def get_page(start_at: int) -> dict[str, Any]:
+        async with limit:
+            r = await client.get(path, params=comment_page_params(start_at))
+        r.raise_for_status()
+        return r.json()
+
+    first = await get_page(0)
+    raw = list(first.get("comments") or [])
+    for page in await asyncio.gather(*(get_page(s) for s in remaining_comment_starts(first))):
+        raw.extend(page.get("comments") or [])
+    comments = markdown_comments(raw)
+    comment_cache.put(ticket_id, comments, issue_updated, changed=cached is not None, generation=generation)
+    await asyncio.to_thread(index_comments, ticket_id, comment_texts(comments))
+    return comments
+
+
+async def add_comment_to_ticket(ticket_id: str, body_text: str) -> dict:
+    """Add a comment to a Jira issue. Returns the created comment payload."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    body_adf = markdown_to_adf(body_text)
+    r = await get_async_jira_http_client().post(f"/rest/api/3/issue/{ticket_id}/comment", json={"body": body_adf})
+    r.raise_for_status()
+    await asyncio.to_thread(ticket_changed, ticket_id)
+    comment_cache.invalidate(ticket_id)
+    await asyncio.to_thread(append_comment, ticket_id, body_text)
+    return r.json()
+
+
+async def update_issue_description(issue_key: str, description_text: str) -> None:
+    """Update the issue's description field (Jira Cloud expects ADF). Fails if Jira is not configured."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    description_adf = markdown_to_adf(description_text or "")
+    r = await get_async_jira_http_client().put(
+        f"/rest/api/3/issue/{issue_key}", json={"fields": {"description": description_adf}}
+    )
+    r.raise_for_status()
+    await asyncio.to_thread(ticket_changed, issue_key)
+
+
+async def _resolve_subtask_type_id(project_key: str) -> str | None:
+    """The project's sub-task issuetype id from create-meta (see jira_service._resolve_subtask_type_id)."""
+    cached = cached_subtask_type_id(project_key)
+    if cached:
+        return cached
+    client = get_async_jira_http_client()
+    try:
+        r = await client.get(createmeta_path(project_key), params={"maxResults": 200})
+        if r.status_code in (404, 405):
+            r = await client.get(LEGACY_CREATEMETA_PATH, params={"projectKeys": project_key})
+        r.raise_for_status()
+        type_id = pick_subtask_type_id(createmeta_issuetypes(r.json()))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Jira create-meta for %s failed (%s); sub-task issuetype is guessed by name", project_key, e)
+        return None
+    if type_id:
+        remember_subtask_type_id(project_key, type_id)
+    return type_id
+
+
+async def _post_subtask(client: httpx.AsyncClient, fields: dict[str, Any], type_id: str | None) -> dict:
+    for issuetype in subtask_issuetype_candidates(type_id):
+        r = await client.post("/rest/api/3/issue", json={"fields": {**fields, "issuetype": issuetype}})
+        if r.status_code in (200, 201):
+            return r.json()
+        if r.status_code != 400:
+            r.raise_for_status()
+    raise RuntimeError(SUBTASK_ISSUETYPE_ERROR)
+
+
+async def create_subtask(
+    parent_issue_key: str,
+    project_key: str,
+    summary: str,
+    *,
+    description: str | None = None,
+    assignee_account_id: str | None = None,
+    priority_name: str | None = None,
+    labels: list[str] | None = None,
+    duedate: str | None = None,
+    components: list[str] | None = None,
+    fix_version: str | None = None,
+) -> dict:
+    """Create a sub-task under a Story/Epic (see jira_service.create_subtask). Returns the created issue payload."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    fields = subtask_fields(
+        parent_issue_key,
+        project_key,
+        summary,
+        description=description,
+        assignee_account_id=assignee_account_id,
+        priority_name=priority_name,
+        labels=labels,
+        duedate=duedate,
+        components=components,
+        fix_version=fix_version,
+    )
+    created = await _post_subtask(get_async_jira_http_client(), fields, await _resolve_subtask_type_id(project_key))
+    await asyncio.to_thread(ticket_changed, parent_issue_key)  # parent's subtasks list changed
+    return created
+
+
+async def create_subtasks(
+    parent_issue_key: str,
+    project_key: str,
+    subtasks: list[SubtaskItem],
+    *,
+    assignee_account_id: str | None = None,
+    priority_name: str | None = None,
+    labels: list[str] | None = None,
+    duedate: str | None = None,
+    components: list[str] | None = None,
+    fix_version: str | None = None,
+) -> list[dict | Exception]:
+    """Create several sub-tasks with bulk creates, one-by-one fallback (see jira_service.create_subtasks)."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    fields_list = [
+        subtask_fields(
+            parent_issue_key,
+            project_key,
+            item.summary,
+            description=item.description,
+            assignee_account_id=assignee_account_id,
+            priority_name=priority_name,
+            labels=labels,
+            duedate=duedate,
+            components=components,
+            fix_version=fix_version,
+        )
+        for item in subtasks
+    ]
+    results: list[dict | Exception | None] = [None] * len(fields_list)
+    client = get_async_jira_http_client()
+    with jira_lane(LANE_BULK):  # interactive reads go first; tasks below inherit the lane
+        type_id = await _resolve_subtask_type_id(project_key) if fields_list else None
+        if type_id and len(fields_list) > 1:
+            for start in range(0, len(fields_list), SUBTASK_BULK_MAX):
+                chunk = fields_list[start:start + SUBTASK_BULK_MAX]
+                r = await client.post("/rest/api/3/issue/bulk", json=bulk_payload(chunk, type_id))
+                outcome = bulk_outcome(r, len(chunk))
+                if outcome is None:
+                    logger.warning(
+                        "Jira bulk sub-task create for %s: status %s; creating one by one",
+                        parent_issue_key,
+                        r.status_code,
+                    )
+                    if r.status_code == 400:
+                        forget_subtask_type_id(project_key)
+                        type_id = None
+                    break
+                results[start:start + len(chunk)] = outcome
+        pending = [i for i, result in enumerate(results) if result is None]
+        limit = asyncio.Semaphore(max(1, settings.jira_batch_concurrency))
+
+        async def run(i: int) -> dict:
+            async with limit:
+                return await _post_subtask(client, fields_list[i], type_id)
+
+        for i, result in zip(pending, await asyncio.gather(*(run(i) for i in pending), return_exceptions=True)):
+            results[i] = result
+    if any(isinstance(result, dict) for result in results):
+        await asyncio.to_thread(ticket_changed, parent_issue_key)  # parent's subtasks list changed
+    return results
+
+
+async def create_ticket(
+    project_key: str,
+    summary: str,
+    description: str | None = None,
+    issue_type: str = "Task",
+) -> dict:
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    payload = {"fields": new_ticket_fields(project_key, summary, description, issue_type)}
+    return created_ticket(await get_async_jira_http_client().post("/rest/api/3/issue", json=payload))
+
+
+async def update_ticket(
+    ticket_id: str,
+    summary: str | None = None,
+    description: str | None = None,
+) -> dict:
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    fields: dict[str, Any] = ticket_update_fields(summary, description)
+    if not fields:
+        return {}
+    r = await get_async_jira_http_client().put(f"/rest/api/3/issue/{ticket_id}", json={"fields": fields})
+    await asyncio.to_thread(ticket_changed, ticket_id)
+    return updated_ticket(ticket_id, r)
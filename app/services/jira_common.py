@@ -0,0 +1,472 @@
+"""
+The transport-independent half of the Jira client, shared by jira_service (httpx.Client) and jira_async_service
+(httpx.AsyncClient): field lists, request parameters and payload builders, parsing of Jira's responses into
+models and errors, and the state both share (ticket_flight, the sub-task issuetype cache, cache invalidation).
+The two services only send the requests.
+"""
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.models import TicketDetail, TicketSummary
+from app.services.adf_markdown import adf_to_markdown
+from app.services.jira_search import cursor_offset, offset_cursor
+from app.services.markdown_adf import markdown_to_adf
+from app.services.mirror_service import mark_mirrored_ticket_stale, mirrored_page
+from app.services.single_flight import SingleFlight
+from app.services.ticket_cache import ticket_cache
+
+# Default JQL for listing issues (project is not empty avoids empty-JQL 400 on some instances).
+DEFAULT_JQL = "project is not empty ORDER BY created DESC"
+SEARCH_FIELDS = "summary,status,issuetype,assignee"
+DETAIL_FIELDS = "summary,description,status,issuetype,assignee,project,created,updated,subtasks"
+# API field name (TicketDetail attribute) -> the Jira field it is read from, for ?fields=... push-down
+TICKET_FIELDS = {
+    "summary": "summary",
+    "description": "description",
+    "status": "status",
+    "issue_type": "issuetype",
+    "assignee": "assignee",
+    "project": "project",
+    "created": "created",
+    "updated": "updated",
+    "subtasks": "subtasks",
+}
+
+
+def parse_ticket_fields(value: str | None) -> list[str] | None:
+    """API field names from a comma-separated ?fields= value (None = all). Raises ValueError for unknown names."""
+    if value is None or not value.strip():
+        return None
+    names: list[str] = []
+    for part in value.split(","):
+        name = part.strip()
+        if not name or name == "key" or name in names:
+            continue
+        if name not in TICKET_FIELDS:
+            raise ValueError(f"Unknown field {name!r}; choose from key, {', '.join(TICKET_FIELDS)}")
+        names.append(name)
+    return names
+
+
+def jira_fields(fields: list[str] | None) -> str:
+    """The Jira 'fields' parameter for these API fields (all detail fields when None)."""
+    if fields is None:
+        return DETAIL_FIELDS
+    return ",".join(TICKET_FIELDS[f] for f in fields) or "summary"  # key alone: ask for the smallest field
+
+
+def extract_summary(issue: dict[str, Any]) -> TicketSummary:
+    fields = issue.get("fields") or {}
+    status = (fields.get("status") or {}).get("name")
+    itype = (fields.get("issuetype") or {}).get("name")
+    assignee = (fields.get("assignee") or {}).get("displayName") or (fields.get("assignee") or {}).get("emailAddress")
+    return TicketSummary(
+        key=issue.get("key", ""),
+        summary=(fields.get("summary") or ""),
+        status=status,
+        issue_type=itype,
+        assignee=assignee,
+    )
+
+
+def extract_detail(issue: dict[str, Any], include_raw: bool = False) -> TicketDetail:
+    fields = issue.get("fields") or {}
+    desc = fields.get("description")
+    if isinstance(desc, dict):
+        description = adf_to_markdown(desc).strip()
+    else:
+        description = str(desc) if desc is not None else None
+
+    status = (fields.get("status") or {}).get("name")
+    itype = (fields.get("issuetype") or {}).get("name")
+    assignee = (fields.get("assignee") or {}).get("displayName") or (fields.get("assignee") or {}).get("emailAddress")
+    project = (fields.get("project") or {}).get("key")
+    subtasks = fields.get("subtasks", [])
+
+    return TicketDetail(
+        key=issue.get("key", ""),
+        summary=(fields.get("summary") or ""),
+        description=description,
+        status=status,
+        issue_type=itype,
+        assignee=assignee,
+        project=project,
+        created=fields.get("created"),
+        updated=fields.get("updated"),
+        subtasks=subtasks,
+        raw=issue if include_raw else None,
+    )
+
+
+def mirrored_tickets_page(
+    jql: str, max_results: int, cursor: str | None, max_staleness: float | None
+) -> tuple[list[TicketSummary], str | None] | None:
+    """fetch_tickets_page from the mirror (offset cursors only; Jira's page tokens can only be resumed by Jira)."""
+    offset = cursor_offset(cursor)
+    if offset is None:
+        return None
+    served = mirrored_page(jql, max_results, offset, max_staleness)
+    if served is None:
+        return None
+    tickets, more = served
+    return tickets, offset_cursor(offset + len(tickets)) if more else None
+
+
+# Concurrent identical fetch_ticket() calls, here and in jira_async_service, share one Jira round trip
+ticket_flight = SingleFlight("fetch_ticket")
+
+
+def unchanged_since(cached: TicketDetail, revalidation: dict[str, Any]) -> bool:
+    """True if a fields=updated response shows the cached ticket is still current."""
+    updated = (revalidation.get("fields") or {}).get("updated")
+    return bool(updated) and updated == cached.updated
+
+
+def ticket_changed(ticket_id: str) -> None:
+    """A write through this API changed the ticket: drop it from ticket_cache and flag its mirror row."""
+    ticket_cache.invalidate(ticket_id)
+    mark_mirrored_ticket_stale(ticket_id)
+    key = ticket_id.strip().upper()
+    ticket_flight.forget(lambda flight_key: flight_key[0] == key)
+
+
+def ticket_flight_key(
+    ticket_id: str, max_staleness: float | None, fields: list[str] | None, include_raw: bool
+) -> tuple[Any, ...]:
+    return (ticket_id.strip().upper(), max_staleness, tuple(fields) if fields is not None else None, include_raw)
+
+
+ISSUE_KEY_RE = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+# Keys Jira names in a 400 for 'key in (...)', e.g. "An issue with key 'PROJ-9' does not exist for field 'key'."
+_ERROR_KEY_RE = re.compile(r"'([A-Z][A-Z0-9_]*-\d+)'")
+
+
+def normalize_issue_keys(keys: list[str]) -> list[str]:
+    """Upper-case, de-duplicate (keeping order) and validate issue keys so they are safe to put in JQL."""
+    out: list[str] = []
+    seen: set[str] = set()
+    for raw in keys:
+        key = (raw or "").strip().upper()
+        if not key or key in seen:
+            continue
+        if not ISSUE_KEY_RE.match(key):
+            raise ValueError(f"Invalid issue key: {raw!r}")
+        seen.add(key)
+        out.append(key)
+    return out
+
+
+def keys_jql(keys: list[str]) -> str:
+    return f"key in ({', '.join(keys)})"
+
+
+def keys_rejected_by_jira(r: httpx.Response, keys: list[str]) -> list[str]:
+    """Keys a 'key in (...)' search was rejected for (deleted, moved or not visible issues)."""
+    try:
+        messages = r.json().get("errorMessages") or []
+    except ValueError:
+        return []
+    named = {k for msg in messages for k in _ERROR_KEY_RE.findall(str(msg))}
+    return [k for k in keys if k in named]
+
+
+# Jira's cap on maxResults for GET /issue/{id}/comment
+COMMENT_PAGE_SIZE = 100
+
+
+def comment_page_params(start_at: int) -> dict[str, Any]:
+    # Oldest first, so comments added while the pages are fetched land after them instead of shifting them
+    return {"startAt": start_at, "maxResults": COMMENT_PAGE_SIZE, "orderBy": "created"}
+
+
+def remaining_comment_starts(page: dict[str, Any]) -> list[int]:
+    """startAt of every page after the first, from the first page's 'total'."""
+    got = len(page.get("comments") or [])
+    if not got:
+        return []
+    size = page.get("maxResults") or got  # Jira may serve fewer per page than asked
+    return list(range(page.get("startAt", 0) + got, page.get("total") or 0, size))
+
+
+def markdown_comments(comments: list[Any]) -> list[dict]:
+    """Comments in thread order, de-duplicated by id, with each ADF body converted to Markdown once."""
+    out = []
+    seen: set[str] = set()
+    for c in comments:
+        if not isinstance(c, dict) or c.get("id") in seen:
+            continue
+        seen.add(c.get("id"))
+        body = c.get("body")
+        out.append({**c, "body": adf_to_markdown(body).strip() if isinstance(body, dict) else str(body or "")})
+    return out
+
+
+def known_issue_updated(ticket_id: str) -> str | None:
+    """Issue 'updated' from a fresh ticket_cache entry, stored with the thread so it can be revalidated cheaply."""
+    known = ticket_cache.get(ticket_id)
+    return known.detail.updated if known is not None and known.fresh else None
+
+
+def _jira_time(value: Any) -> datetime | None:
+    """Jira timestamp (e.g. '2024-05-01T10:00:00.000+0000') as an aware datetime."""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def select_comments(
+    comments: list[dict],
+    *,
+    since: datetime | None = None,
+    newest_first: bool = False,
+    start_at: int = 0,
+    max_results: int | None = None,
+) -> tuple[list[dict], int]:
+    """
+    One page of a fetched thread: comments created or edited after 'since' (naive = UTC), in the requested order.
+    Returns (page, number of comments matching before paging).
+    """
+    if since is not None:
+        since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        matching = []
+        for c in comments:
+            changed = _jira_time(c.get("updated")) or _jira_time(c.get("created"))
+            if changed is None or changed > since:
+                matching.append(c)
+        comments = matching
+    if newest_first:
+        comments = comments[::-1]
+    end = None if max_results is None else start_at + max_results
+    return comments[start_at:end], len(comments)
+
+
+def comment_texts(comments: list[dict]) -> list[str]:
+    """Plain Markdown of each comment body (ADF in API v3, a string in v2) for the search index."""
+    out = []
+    for c in comments:
+        body = c.get("body") if isinstance(c, dict) else None
+        out.append(adf_to_markdown(body).strip() if isinstance(body, dict) else str(body or ""))
+    return out
+
+
+def is_story_or_epic(ticket: TicketDetail) -> bool:
+    """True if the ticket is a Story or Epic (can have sub-tasks in Jira)."""
+    it = (ticket.issue_type or "").strip().lower()
+    return it in ("story", "epic")
+
+
+def ticket_to_context_string(ticket: TicketDetail) -> str:
+    """Serialize ticket for MCP tool context (whole description; LLM prompts use prompt_builder.build_prompt_parts)."""
+    lines = [
+        f"Key: {ticket.key}",
+        f"Summary: {ticket.summary}",
+        f"Type: {ticket.issue_type or 'N/A'}",
+        f"Status: {ticket.status or 'N/A'}",
+        f"Assignee: {ticket.assignee or 'Unassigned'}",
+        f"Project: {ticket.project or 'N/A'}",
+    ]
+    if ticket.description:
+        lines.append(f"Description: {ticket.description}")
+    if ticket.created:
+        lines.append(f"Created: {ticket.created}")
+    if ticket.updated:
+        lines.append(f"Updated: {ticket.updated}")
+    return "\n".join(lines)
+
+
+SUBTASK_ISSUETYPE_ERROR = (
+    "Jira create sub-task failed: try setting JIRA_SUBTASK_ISSUETYPE in .env to your project's sub-task type name"
+)
+
+
+def subtask_fields(
+    parent_issue_key: str,
+    project_key: str,
+    summary: str,
+    *,
+    description: str | None = None,
+    assignee_account_id: str | None = None,
+    priority_name: str | None = None,
+    labels: list[str] | None = None,
+    duedate: str | None = None,
+    components: list[str] | None = None,
+    fix_version: str | None = None,
+) -> dict[str, Any]:
+    """Build the create-issue 'fields' for a sub-task; issuetype is filled in per attempt."""
+    summary_trimmed = (summary or "Task").strip()[:255]
+    fields: dict[str, Any] = {
+        "project": {"key": project_key},
+        "parent": {"key": parent_issue_key},
+        "summary": summary_trimmed,
+        "issuetype": {"name": ""},  # set per attempt
+    }
+    if description and description.strip():
+        fields["description"] = markdown_to_adf(description.strip())
+    if assignee_account_id and assignee_account_id.strip():
+        fields["assignee"] = {"accountId": assignee_account_id.strip()}
+    if priority_name and priority_name.strip():
+        fields["priority"] = {"name": priority_name.strip()}
+    if labels:
+        fields["labels"] = [str(l).strip() for l in labels if str(l).strip()]
+    if duedate and str(duedate).strip():
+        fields["duedate"] = str(duedate).strip()
+    if components:
+        fields["components"] = [{"name": str(c).strip()} for c in components if str(c).strip()]
+    if fix_version and str(fix_version).strip():
+        fields["fixVersions"] = [{"name": str(fix_version).strip()}]
+    return fields
+
+
+# Jira accepts at most this many issues per POST /rest/api/3/issue/bulk.
+SUBTASK_BULK_MAX = 50
+
+_subtask_type_lock = threading.Lock()
+# (site, project key, JIRA_SUBTASK_ISSUETYPE) -> sub-task issuetype id from create-meta
+_subtask_type_ids: dict[tuple[str, str, str], str] = {}
+
+
+def _subtask_type_key(project_key: str) -> tuple[str, str, str]:
+    return (settings.jira_url.rstrip("/"), project_key.strip().upper(), settings.jira_subtask_issuetype)
+
+
+def cached_subtask_type_id(project_key: str) -> str | None:
+    with _subtask_type_lock:
+        return _subtask_type_ids.get(_subtask_type_key(project_key))
+
+
+def remember_subtask_type_id(project_key: str, type_id: str) -> None:
+    with _subtask_type_lock:
+        _subtask_type_ids[_subtask_type_key(project_key)] = type_id
+
+
+def forget_subtask_type_id(project_key: str) -> None:
+    """Drop a cached id Jira rejected (issue types were changed); the next create resolves it again."""
+    with _subtask_type_lock:
+        _subtask_type_ids.pop(_subtask_type_key(project_key), None)
+
+
+def createmeta_path(project_key: str) -> str:
+    return f"/rest/api/3/issue/createmeta/{project_key}/issuetypes"
+
+
+# Older sites only have the project-wide create-meta; it lists issuetypes without expanding their fields.
+LEGACY_CREATEMETA_PATH = "/rest/api/3/issue/createmeta"
+
+
+def createmeta_issuetypes(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Issue types from either create-meta shape: {'issueTypes': [...]} or {'projects': [{'issuetypes': [...]}]}."""
+    types = payload.get("issueTypes") or payload.get("values")
+    if types is None:
+        projects = payload.get("projects") or [{}]
+        types = projects[0].get("issuetypes") or []
+    return [t for t in types if isinstance(t, dict)]
+
+
+def pick_subtask_type_id(issue_types: list[dict[str, Any]]) -> str | None:
+    """The sub-task issuetype to use: the one named like a subtask_issuetype_candidates() name, else the first."""
+    subtask_types = [t for t in issue_types if t.get("subtask") and t.get("id")]
+    by_name = {str(t.get("name") or "").strip().lower(): t for t in subtask_types}
+    for name in _subtask_issuetype_names():
+        if name.lower() in by_name:
+            return str(by_name[name.lower()]["id"])
+    return str(subtask_types[0]["id"]) if subtask_types else None
+
+
+def _subtask_issuetype_names() -> list[str]:
+    """Issuetype names to try for sub-tasks: JIRA_SUBTASK_ISSUETYPE first, then 'Sub-task' and 'Subtask'."""
+    types_to_try: list[str] = []
+    if settings.jira_subtask_issuetype and settings.jira_subtask_issuetype not in types_to_try:
+        types_to_try.append(settings.jira_subtask_issuetype)
+    for name in ("Sub-task", "Subtask"):
+        if name not in types_to_try:
+            types_to_try.append(name)
+    return types_to_try
+
+
+def subtask_issuetype_candidates(type_id: str | None) -> list[dict[str, str]]:
+    """'issuetype' values to try in order: the create-meta id when known, then the names."""
+    candidates = [{"id": type_id}] if type_id else []
+    return candidates + [{"name": name} for name in _subtask_issuetype_names()]
+
+
+def bulk_payload(fields_list: list[dict[str, Any]], type_id: str) -> dict[str, Any]:
+    return {"issueUpdates": [{"fields": {**fields, "issuetype": {"id": type_id}}} for fields in fields_list]}
+
+
+def _element_error(error: dict[str, Any]) -> str:
+    element = error.get("elementErrors") or {}
+    messages = list(element.get("errorMessages") or [])
+    messages += [f"{field}: {msg}" for field, msg in (element.get("errors") or {}).items()]
+    return "; ".join(messages) or f"status {error.get('status')}"
+
+
+def bulk_outcome(r: httpx.Response, count: int) -> list[dict | Exception] | None:
+    """
+    Per-issue results of a bulk create, in request order: the created issue payload or the error Jira gave for it.
+    None only when nothing can have been created (endpoint missing, or every issue rejected) and the issues should
+    be created one by one instead. Any other failure (5xx after the governor's retries) is that chunk's error:
+    Jira may have created some of its issues, and posting them again would duplicate them.
+    """
+    if r.status_code in (404, 405):
+        return None
+    failed = RuntimeError(f"Jira bulk create sub-tasks failed with status {r.status_code}; not retried one by one")
+    if r.status_code not in (200, 201, 400):
+        return [failed] * count
+    try:
+        payload = r.json()
+    except ValueError:
+        return [failed] * count
+    errors = {e.get("failedElementNumber"): e for e in payload.get("errors") or [] if isinstance(e, dict)}
+    if r.status_code == 400 and len(errors) >= count:
+        return None
+    if not isinstance(payload.get("issues"), list):
+        return [failed] * count
+    issues = iter(payload["issues"])
+    outcome: list[dict | Exception] = []
+    for i in range(count):
+        if i in errors:
+            outcome.append(RuntimeError(f"Jira create sub-task failed: {_element_error(errors[i])}"))
+        else:
+            outcome.append(next(issues, None) or RuntimeError("Jira bulk create returned no issue for this sub-task"))
+    return outcome
+
+
+def new_ticket_fields(project_key: str, summary: str, description: str | None, issue_type: str) -> dict[str, Any]:
+    fields: dict[str, Any] = {
+        "project": {"key": project_key},
+        "summary": (summary or "Task").strip()[:255],
+        "issuetype": {"name": issue_type},
+    }
+    if description and description.strip():
+        fields["description"] = markdown_to_adf(description.strip())
+    return fields
+
+
+def ticket_update_fields(summary: str | None, description: str | None) -> dict[str, Any]:
+    fields: dict[str, Any] = {}
+    if summary is not None:
+        fields["summary"] = summary.strip()[:255]
+    if description is not None:
+        fields["description"] = markdown_to_adf(description.strip())
+    return fields
+
+
+def created_ticket(r: httpx.Response) -> dict:
+    """The created issue payload of a POST /rest/api/3/issue, or RuntimeError with Jira's answer."""
+    if r.status_code == 201:
+        return r.json()
+    raise RuntimeError(f"Jira create ticket failed: {r.text}")
+
+
+def updated_ticket(ticket_id: str, r: httpx.Response) -> dict:
+    """update_ticket()'s result for a PUT /rest/api/3/issue/{id}, or RuntimeError with Jira's answer."""
+    if r.status_code == 204:
+        return {"id": ticket_id, "message": "updated"}
+    raise RuntimeError(f"Jira update ticket failed: {r.text}")
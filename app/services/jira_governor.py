@@ -0,0 +1,366 @@
+"""
+Rate-limit governor for all Jira traffic, installed as the transport of the pooled clients in jira_http.
+
+- Token bucket: sized and refilled from Jira's rate-limit headers (X-RateLimit-Limit, -Remaining, -FillRate,
+  -Interval-Seconds), or from JIRA_RATE_LIMIT_PER_SECOND when set. Unlimited until one of them says otherwise.
+- AIMD concurrency: the in-flight limit grows by 1/limit per answered request up to JIRA_MAX_CONCURRENCY and is
+  halved on 429/503 (once per burst).
+- Retries: 429, and 503 on idempotent requests or with Retry-After, are retried up to JIRA_MAX_RETRIES times after
+  Retry-After (or exponential backoff), with jitter. A Retry-After pauses every lane, not just the caller.
+- Priority lanes: requests made inside jira_lane(LANE_BULK) (mirror sync, webhook refreshes, sub-task creation)
+  are only admitted while no interactive request is waiting.
+
+One governor is shared by the sync and async clients, since both spend the same Jira budget.
+"""
+import asyncio
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+import httpx
+
+from app.config import settings
+from app.services.http_retry import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_BULK)  # highest priority first
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("jira_lane", default=LANE_INTERACTIVE)
+
+T = TypeVar("T")
+
+_THROTTLED_STATUSES = (429, 503)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_BACKOFF_BASE_SECONDS = 0.5
+# A burst of 429s answers requests sent at the same limit; halve once per burst, not once per response.
+_DECREASE_GUARD_SECONDS = 1.0
+# Queued callers are woken when it is their turn; this only bounds the wait if a wake-up were ever lost.
+_POLL_SECONDS = 1.0
+
+
+@contextmanager
+def jira_lane(lane: str) -> Iterator[None]:
+    """Send the Jira calls made inside this block (in this thread or task) through the given lane."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def in_current_lane(fn: Callable[..., T]) -> Callable[..., T]:
+    """fn, bound to the caller's lane: thread pool workers don't inherit the caller's context."""
+    lane = _lane.get()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        with jira_lane(lane):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+def _header_number(response: httpx.Response, name: str) -> float | None:
+    try:
+        return float(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Waiter:
+    """A caller queued for admission; woken through a threading.Event (sync) or a future on its loop (async)."""
+
+    __slots__ = ("lane", "loop", "event", "future")
+
+    def __init__(self, lane: str, loop: asyncio.AbstractEventLoop | None = None):
+        self.lane = lane
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future: asyncio.Future | None = None
+
+    def arm(self) -> None:
+        """Reset before waiting; called under the governor lock so a wake-up in between is not lost."""
+        if self.loop is None:
+            self.event.clear()
+        else:
+            self.future = self.loop.create_future()
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        elif self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+class JiraGovernor:
+    """Admission control for Jira requests: priority queue per lane, AIMD in-flight limit and token bucket."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque[_Waiter]] = {lane: deque() for lane in LANES}
+        self._in_flight = 0
+        self._limit = float(max(1, settings.jira_max_concurrency))
+        self._rate = 0.0  # tokens per second; 0 = no bucket
+        self._capacity = math.inf
+        self._tokens = math.inf
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._stats: dict[str, Any] = {
+            "requests": 0,
+            "throttled": 0,
+            "retries": 0,
+            "gave_up": 0,
+            "queued": {lane: 0 for lane in LANES},
+            "queued_seconds": {lane: 0.0 for lane in LANES},
+        }
+
+    # --- admission (caller holds the lock) ---
+
+    def _head(self) -> _Waiter | None:
+        for lane in LANES:
+            if self._queues[lane]:
+                return self._queues[lane][0]
+        return None
+
+    def _wake_head(self) -> None:
+        head = self._head()
+        if head is not None:
+            head.wake()
+
+    def _refill(self, now: float) -> None:
+        rate = settings.jira_rate_limit_per_second
+        if rate > 0 and rate != self._rate:
+            # A configured cap overrides what Jira advertises; allow a one-second burst.
+            self._rate, self._capacity = rate, max(1.0, rate)
+            self._tokens = min(self._tokens, self._capacity)
+        if self._rate > 0:
+            self._tokens = min(self._capacity, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _try_admit(self, waiter: _Waiter, now: float) -> float | None:
+        """Admit the waiter (None), or return how long it should wait before trying again."""
+        if self._head() is not waiter or self._in_flight >= int(self._limit):
+            return _POLL_SECONDS
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._rate > 0 and self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+        if self._rate > 0:
+            self._tokens -= 1
+        self._in_flight += 1
+        self._stats["requests"] += 1
+        self._queues[waiter.lane].popleft()
+        self._wake_head()  # the next caller may fit too
+        return None
+
+    def _enqueue(self, waiter: _Waiter) -> float | None:
+        with self._lock:
+            self._queues[waiter.lane].append(waiter)
+            return self._retry_admit(waiter)
+
+    def _retry_admit(self, waiter: _Waiter) -> float | None:
+        delay = self._try_admit(waiter, time.monotonic())
+        if delay is not None:
+            waiter.arm()
+        return delay
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            try:
+                self._queues[waiter.lane].remove(waiter)
+            except ValueError:
+                return
+            self._wake_head()
+
+    def _note_wait(self, lane: str, started: float) -> None:
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["queued"][lane] += 1
+            self._stats["queued_seconds"][lane] += waited
+
+    def acquire(self, lane: str) -> None:
+        """Block until a request in this lane may be sent."""
+        waiter = _Waiter(lane)
+        started = time.monotonic()
+        delay = self._enqueue(waiter)
+        if delay is None:
+            return
+        try:
+            while delay is not None:
+                waiter.event.wait(delay)
+                with self._lock:
+                    delay = self._retry_admit(waiter)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._note_wait(lane, started)
+
+    async def acquire_async(self, lane: str) -> None:
+        """acquire() for the event loop: waits without blocking it."""
+        waiter = _Waiter(lane, asyncio.get_running_loop())
+        started = time.monotonic()
+        delay = self._enqueue(waiter)
+        if delay is None:
+            return
+        try:
+            while delay is not None:
+                await asyncio.wait({waiter.future}, timeout=delay)
+                with self._lock:
+                    delay = self._retry_admit(waiter)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._note_wait(lane, started)
+
+    # --- feedback ---
+
+    def _observe_headers(self, response: httpx.Response, now: float) -> None:
+        if settings.jira_rate_limit_per_second > 0:
+            return
+        fill = _header_number(response, "X-RateLimit-FillRate")
+        if fill is not None and fill > 0:
+            interval = _header_number(response, "X-RateLimit-Interval-Seconds") or 1.0
+            self._refill(now)
+            self._rate = fill / interval
+            self._capacity = _header_number(response, "X-RateLimit-Limit") or max(1.0, self._rate)
+            self._tokens = min(self._tokens, self._capacity)
+        remaining = _header_number(response, "X-RateLimit-Remaining")
+        if remaining is not None and self._rate > 0:
+            self._refill(now)
+            self._tokens = min(self._capacity, remaining)  # Jira's count includes other clients of this user
+
+    def release(self, response: httpx.Response | None) -> None:
+        """Free the slot taken by acquire(); response is None when the request failed without one."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if response is not None:
+                self._observe_headers(response, now)
+                ceiling = float(max(1, settings.jira_max_concurrency))
+                if response.status_code in _THROTTLED_STATUSES:
+                    self._stats["throttled"] += 1
+                    if now - self._last_decrease >= _DECREASE_GUARD_SECONDS:
+                        self._limit = max(1.0, min(self._limit, ceiling) / 2)
+                        self._last_decrease = now
+                    pause = retry_after_seconds(response)
+                    if pause:
+                        self._paused_until = max(self._paused_until, now + pause)
+                else:
+                    self._limit = min(ceiling, self._limit + 1 / self._limit)
+            self._wake_head()
+
+    def retry_delay(self, request: httpx.Request, response: httpx.Response, attempt: int) -> float | None:
+        """Seconds to wait before retrying a throttled request, or None to hand the response to the caller."""
+        if response.status_code not in _THROTTLED_STATUSES:
+            return None
+        retry_after = retry_after_seconds(response)
+        if response.status_code == 503 and retry_after is None and request.method not in _IDEMPOTENT_METHODS:
+            return None  # may have been applied; retrying could duplicate it
+        if retry_after is None:
+            backoff = _BACKOFF_BASE_SECONDS * 2 ** attempt
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+        else:
+            delay = retry_after + random.uniform(0, min(1.0, 0.1 + retry_after / 10))
+        if attempt >= settings.jira_max_retries or delay > settings.jira_retry_max_wait_seconds:
+            with self._lock:
+                self._stats["gave_up"] += 1
+            logger.warning(
+                "Jira %s %s: %s after %d retries", request.method, request.url.path, response.status_code, attempt
+            )
+            return None
+        with self._lock:
+            self._stats["retries"] += 1
+        logger.info("Jira %s %s: %s, retrying in %.1fs", request.method, request.url.path, response.status_code, delay)
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "concurrency_limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "waiting": {lane: len(q) for lane, q in self._queues.items()},
+                "rate_per_second": self._rate or None,
+                "tokens": None if math.isinf(self._tokens) else round(self._tokens, 1),
+                "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                **{k: dict(v) if isinstance(v, dict) else v for k, v in self._stats.items()},
+            }
+
+
+jira_governor = JiraGovernor()
+
+
+class GovernedTransport(httpx.BaseTransport):
+    """Sends each request through jira_governor, retrying throttled ones."""
+
+    def __init__(self, transport: httpx.BaseTransport, governor: JiraGovernor = jira_governor):
+        self._transport = transport
+        self._governor = governor
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        lane = _lane.get()
+        attempt = 0
+        while True:
+            self._governor.acquire(lane)
+            try:
+                response = self._transport.handle_request(request)
+            except BaseException:
+                self._governor.release(None)
+                raise
+            self._governor.release(response)
+            delay = self._governor.retry_delay(request, response, attempt)
+            if delay is None:
+                return response
+            response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncGovernedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of GovernedTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, governor: JiraGovernor = jira_governor):
+        self._transport = transport
+        self._governor = governor
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        lane = _lane.get()
+        attempt = 0
+        while True:
+            await self._governor.acquire_async(lane)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                self._governor.release(None)
+                raise
+            self._governor.release(response)
+            delay = self._governor.retry_delay(request, response, attempt)
+            if delay is None:
+                return response
+            await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def governor_stats() -> dict[str, Any]:
+    return jira_governor.stats()
@@ -0,0 +1,116 @@
+"""
+Shared HTTP transport for Jira: one pooled keep-alive client per process, reused by every Jira call.
+Requests go through jira_governor (rate limits, adaptive concurrency, retries of throttled calls).
+"""
+import logging
+import threading
+
+import httpx
+
+from app.config import settings
+from app.services.jira_governor import AsyncGovernedTransport, GovernedTransport
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client: httpx.Client | None = None
+_client_identity: tuple[str, str, str] | None = None
+_async_client: httpx.AsyncClient | None = None
+_async_client_identity: tuple[str, str, str] | None = None
+_retired_async_clients: list[httpx.AsyncClient] = []
+
+
+def _identity() -> tuple[str, str, str]:
+    """Site + credentials the pooled client was built for (rebuilt when /settings changes them)."""
+    return (settings.jira_url.rstrip("/"), settings.jira_username, settings.jira_api_token)
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 multiplexing is opt-in (JIRA_HTTP2) and needs the optional 'h2' package."""
+    if not settings.jira_http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("JIRA_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _client_kwargs() -> dict:
+    base, username, token = _identity()
+    return {
+        "base_url": base,
+        "auth": (username, token),
+        "headers": {"Accept": "application/json"},
+        "timeout": settings.jira_timeout_seconds,
+    }
+
+
+def _transport_kwargs() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=settings.jira_pool_max_connections,
+            max_keepalive_connections=settings.jira_pool_max_keepalive,
+            keepalive_expiry=settings.jira_pool_keepalive_expiry,
+        ),
+    }
+
+
+def get_jira_http_client() -> httpx.Client:
+    """
+    Return the process-wide Jira client (base_url = JIRA_URL, basic auth already set).
+    Callers pass paths like '/rest/api/3/issue/PROJ-1' and must not close it.
+    """
+    global _client, _client_identity
+    identity = _identity()
+    with _lock:
+        if _client is None or _client.is_closed or _client_identity != identity:
+            stale = _client
+            _client = httpx.Client(
+                **_client_kwargs(), transport=GovernedTransport(httpx.HTTPTransport(**_transport_kwargs()))
+            )
+            _client_identity = identity
+            if stale is not None and not stale.is_closed:
+                stale.close()
+        return _client
+
+
+def get_async_jira_http_client() -> httpx.AsyncClient:
+    """Async counterpart of get_jira_http_client(), used by jira_async_service from async routes."""
+    global _async_client, _async_client_identity
+    identity = _identity()
+    with _lock:
+        if _async_client is None or _async_client.is_closed or _async_client_identity != identity:
+            # Can't await aclose() here; a stale client stays usable for in-flight requests until shutdown.
+            if _async_client is not None and not _async_client.is_closed:
+                _retired_async_clients.append(_async_client)
+            _async_client = httpx.AsyncClient(
+                **_client_kwargs(), transport=AsyncGovernedTransport(httpx.AsyncHTTPTransport(**_transport_kwargs()))
+            )
+            _async_client_identity = identity
+        return _async_client
+
+
+def close_jira_http_client() -> None:
+    """Close pooled connections (called from the app lifespan on shutdown)."""
+    global _client, _client_identity
+    with _lock:
+        if _client is not None and not _client.is_closed:
+            _client.close()
+        _client = None
+        _client_identity = None
+
+
+async def close_async_jira_http_client() -> None:
+    """Close the async pool (called from the app lifespan on shutdown)."""
+    global _async_client, _async_client_identity
+    with _lock:
+        clients = [c for c in (_async_client, *_retired_async_clients) if c is not None]
+        _async_client = None
+        _async_client_identity = None
+        _retired_async_clients.clear()
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
@@ -0,0 +1,341 @@
+"""
+Jira search capability negotiation and pagination.
+
+Jira sites differ in which search endpoint they accept (GET/POST /rest/api/3/search/jql, or only the legacy
+POST /rest/api/3/search). Instead of walking the whole fallback cascade on every call, the first working
+strategy is remembered per site for JIRA_SEARCH_CAPABILITY_TTL_SECONDS and used directly afterwards. The
+exception is jql_get_nofields, the retry without 'fields' after a 400: it answers only the request that needed it.
+
+Pages are addressed by opaque cursors: "t:<nextPageToken>" on search/jql, "o:<startAt>" on the legacy endpoint.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import httpx
+
+from app.config import settings
+from app.services.jira_governor import in_current_lane
+from app.services.jira_http import get_async_jira_http_client, get_jira_http_client
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "this strategy is not supported here, try the next one" during negotiation.
+_TRY_NEXT_STATUSES = (400, 404, 405, 410)
+# Statuses that mean "this endpoint does not exist here"; other strategies on the same endpoint are skipped.
+_ENDPOINT_GONE_STATUSES = (404, 405, 410)
+
+_TOKEN_PREFIX = "t:"
+_OFFSET_PREFIX = "o:"
+# Largest page Jira returns when issue fields are requested.
+MAX_PAGE_SIZE = 100
+
+
+def offset_cursor(start_at: int) -> str | None:
+    """Cursor for a plain startAt offset (the /tickets start_at parameter)."""
+    return f"{_OFFSET_PREFIX}{start_at}" if start_at > 0 else None
+
+
+def _parse_offset(cursor: str) -> int:
+    try:
+        return max(0, int(cursor[len(_OFFSET_PREFIX):]))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def cursor_offset(cursor: str | None) -> int | None:
+    """startAt encoded in an offset cursor (0 for no cursor); None for token cursors, which only Jira can resume."""
+    if not cursor:
+        return 0
+    if cursor.startswith(_OFFSET_PREFIX):
+        return _parse_offset(cursor)
+    return None
+
+
+@dataclass
+class SearchPage:
+    """One page of raw Jira issues plus the cursor for the next page (None on the last page)."""
+    issues: list[dict[str, Any]] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+@dataclass(frozen=True)
+class SearchStrategy:
+    """One way of calling Jira search; builds the httpx request kwargs and reads the next-page cursor."""
+    name: str
+    method: str
+    path: str
+    fields_in: str  # "params" (comma-separated), "body" (JSON array) or "none"
+
+    @property
+    def paging(self) -> str:
+        """'offset' (startAt/total) on the legacy endpoint, 'token' (nextPageToken) on search/jql."""
+        return "offset" if self.path.endswith("/search") else "token"
+
+    def accepts(self, cursor: str | None) -> bool:
+        if not cursor:
+            return True
+        return cursor.startswith(_OFFSET_PREFIX if self.paging == "offset" else _TOKEN_PREFIX)
+
+    def request(self, jql: str, max_results: int, fields: str, cursor: str | None = None) -> dict[str, Any]:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+        if self.method == "GET":
+            params: dict[str, Any] = {"jql": jql, "maxResults": max_results}
+            if self.fields_in == "params":
+                params["fields"] = ",".join(field_list)
+            if cursor:
+                params["nextPageToken"] = cursor[len(_TOKEN_PREFIX):]
+            return {"method": "GET", "url": self.path, "params": params}
+        body: dict[str, Any] = {"jql": jql, "maxResults": max_results}
+        if self.paging == "offset":
+            body["startAt"] = _parse_offset(cursor) if cursor else 0
+        elif cursor:
+            body["nextPageToken"] = cursor[len(_TOKEN_PREFIX):]
+        if self.fields_in == "body":
+            body["fields"] = field_list
+        return {"method": "POST", "url": self.path, "json": body}
+
+    def page(self, r: httpx.Response) -> SearchPage:
+        data = r.json()
+        issues = data.get("issues") or data.get("values") or []
+        if self.paging == "offset":
+            end = int(data.get("startAt") or 0) + len(issues)
+            total = data.get("total")
+            more = bool(issues) and (end < total if isinstance(total, int) else not data.get("isLast", False))
+            return SearchPage(issues, f"{_OFFSET_PREFIX}{end}" if more else None)
+        token = data.get("nextPageToken")
+        more = bool(token) and not data.get("isLast", False)
+        return SearchPage(issues, f"{_TOKEN_PREFIX}{token}" if more else None)
+
+
+# Same order as the original fallback cascade: recommended GET search/jql first, legacy POST /search last.
+STRATEGIES: tuple[SearchStrategy, ...] = (
+    SearchStrategy("jql_get", "GET", "/rest/api/3/search/jql", "params"),
+    SearchStrategy("jql_get_nofields", "GET", "/rest/api/3/search/jql", "none"),
+    SearchStrategy("jql_post", "POST", "/rest/api/3/search/jql", "body"),
+    SearchStrategy("legacy_post", "POST", "/rest/api/3/search", "body"),
+)
+_STRATEGIES_BY_NAME = {s.name: s for s in STRATEGIES}
+
+_lock = threading.Lock()
+_capabilities: dict[str, tuple[str, float]] = {}  # site -> (strategy name, expires_at monotonic)
+_stats: dict[str, Any] = {
+    "cache_hits": 0,
+    "negotiations": 0,
+    "fallback_attempts": 0,
+    "renegotiations": 0,
+    "offset_scans": 0,
+    "selected": {s.name: 0 for s in STRATEGIES},
+}
+
+
+def _cached_strategy(site: str) -> SearchStrategy | None:
+    with _lock:
+        entry = _capabilities.get(site)
+        if not entry:
+            return None
+        name, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _capabilities[site]
+            return None
+        _stats["cache_hits"] += 1
+        return _STRATEGIES_BY_NAME.get(name)
+
+
+def _remember(site: str, strategy: SearchStrategy) -> None:
+    with _lock:
+        _capabilities[site] = (strategy.name, time.monotonic() + settings.jira_search_capability_ttl_seconds)
+        _stats["selected"][strategy.name] += 1
+
+
+def _forget(site: str) -> None:
+    with _lock:
+        _capabilities.pop(site, None)
+        _stats["renegotiations"] += 1
+
+
+def _log_response(strategy: SearchStrategy, r: httpx.Response) -> None:
+    logger.info(
+        "Jira search %s (%s %s): status=%s body=%s",
+        strategy.name, strategy.method, strategy.path, r.status_code, r.text[:500] if r.text else "",
+    )
+
+
+def _cached_result(site: str, strategy: SearchStrategy, r: httpx.Response) -> SearchPage | None:
+    """Result of a call with the cached strategy; None means the endpoint went away and we must renegotiate."""
+    if r.status_code == 200:
+        return strategy.page(r)
+    if r.status_code in _ENDPOINT_GONE_STATUSES:
+        logger.warning("Jira search: cached strategy %s now returns %s; renegotiating", strategy.name, r.status_code)
+        _forget(site)
+        return None
+    _log_response(strategy, r)
+    r.raise_for_status()
+    return SearchPage()
+
+
+class _Negotiation:
+    """Walks STRATEGIES in order, skipping endpoints already known to be gone, until one returns 200."""
+
+    def __init__(self, site: str, cursor: str | None):
+        self.site = site
+        self.cursor = cursor
+        self.gone: set[tuple[str, str]] = set()
+        self.first_response: httpx.Response | None = None
+        self.attempts = 0
+        with _lock:
+            _stats["negotiations"] += 1
+
+    def candidates(self) -> Iterator[SearchStrategy]:
+        for strategy in STRATEGIES:
+            if (strategy.method, strategy.path) in self.gone or not strategy.accepts(self.cursor):
+                continue
+            if self.attempts:
+                with _lock:
+                    _stats["fallback_attempts"] += 1
+            self.attempts += 1
+            yield strategy
+
+    def feed(self, strategy: SearchStrategy, r: httpx.Response) -> SearchPage | None:
+        """Record a response; returns the page on success, None to try the next strategy, raises otherwise."""
+        _log_response(strategy, r)
+        if self.first_response is None:
+            self.first_response = r
+        if r.status_code == 200:
+            if strategy.fields_in == "none":
+                # Reached because this request's fields were rejected (400); caching it would strip the fields
+                # from every later search on the site, so it only serves this request
+                logger.info("Jira search: strategy %s served this request only (%s)", strategy.name, self.site)
+                return strategy.page(r)
+            logger.info("Jira search: using strategy %s for %s", strategy.name, self.site)
+            _remember(self.site, strategy)
+            return strategy.page(r)
+        if r.status_code in _ENDPOINT_GONE_STATUSES:
+            self.gone.add((strategy.method, strategy.path))
+        if r.status_code in _TRY_NEXT_STATUSES:
+            return None
+        r.raise_for_status()
+        return None
+
+    def fail(self) -> SearchPage:
+        r = self.first_response
+        if r is None:
+            raise ValueError("Cursor is not valid for this Jira site's search endpoint; restart from the first page")
+        logger.error("Jira search: all strategies failed. First response: status=%s url=%s body=%s", r.status_code, r.url, r.text)
+        r.raise_for_status()
+        return SearchPage()
+
+
+class _OffsetScan:
+    """
+    Serves an offset cursor on a token-paged site by walking pages from the start. Only the legacy
+    start_at parameter needs this; clients that pass back the returned cursor never re-scan.
+    """
+
+    def __init__(self, cursor: str, max_results: int):
+        self.offset = _parse_offset(cursor)
+        self.max_results = max_results
+        self.seen = 0
+        self.collected: list[dict[str, Any]] = []
+        with _lock:
+            _stats["offset_scans"] += 1
+
+    def feed(self, page: SearchPage) -> SearchPage | None:
+        """Consume one page; returns the result once enough issues were collected or the last page was seen."""
+        for issue in page.issues:
+            if self.seen >= self.offset and len(self.collected) < self.max_results:
+                self.collected.append(issue)
+            self.seen += 1
+        if len(self.collected) >= self.max_results:
+            more = self.seen > self.offset + len(self.collected) or page.next_cursor is not None
+            return SearchPage(self.collected, offset_cursor(self.offset + len(self.collected)) if more else None)
+        if page.next_cursor is None:
+            return SearchPage(self.collected, None)
+        return None
+
+
+def search_page(jql: str, max_results: int, fields: str, cursor: str | None = None) -> SearchPage:
+    """Fetch one page of raw issues with the site's known-good strategy (negotiating it on first use)."""
+    client = get_jira_http_client()
+    site = str(client.base_url)
+    cached = _cached_strategy(site)
+    if cached is None and cursor and cursor.startswith(_OFFSET_PREFIX):
+        search_page(jql, 1, fields)  # negotiate first, then serve the offset the way this site pages
+        cached = _cached_strategy(site)
+    if cached is not None and not cached.accepts(cursor):
+        if cached.paging == "offset":
+            raise ValueError("Cursor is not valid for this Jira site's search endpoint; restart from the first page")
+        scan = _OffsetScan(cursor, max_results)
+        page = search_page(jql, MAX_PAGE_SIZE, fields)
+        while (result := scan.feed(page)) is None:
+            page = search_page(jql, MAX_PAGE_SIZE, fields, page.next_cursor)
+        return result
+    if cached is not None:
+        result = _cached_result(site, cached, client.request(**cached.request(jql, max_results, fields, cursor)))
+        if result is not None:
+            return result
+    negotiation = _Negotiation(site, cursor)
+    for strategy in negotiation.candidates():
+        result = negotiation.feed(strategy, client.request(**strategy.request(jql, max_results, fields, cursor)))
+        if result is not None:
+            return result
+    return negotiation.fail()
+
+
+async def search_page_async(jql: str, max_results: int, fields: str, cursor: str | None = None) -> SearchPage:
+    """Async variant of search_page() sharing the same per-site capability cache."""
+    client = get_async_jira_http_client()
+    site = str(client.base_url)
+    cached = _cached_strategy(site)
+    if cached is None and cursor and cursor.startswith(_OFFSET_PREFIX):
+        await search_page_async(jql, 1, fields)
+        cached = _cached_strategy(site)
+    if cached is not None and not cached.accepts(cursor):
+        if cached.paging == "offset":
+            raise ValueError("Cursor is not valid for this Jira site's search endpoint; restart from the first page")
+        scan = _OffsetScan(cursor, max_results)
+        page = await search_page_async(jql, MAX_PAGE_SIZE, fields)
+        while (result := scan.feed(page)) is None:
+            page = await search_page_async(jql, MAX_PAGE_SIZE, fields, page.next_cursor)
+        return result
+    if cached is not None:
+        result = _cached_result(site, cached, await client.request(**cached.request(jql, max_results, fields, cursor)))
+        if result is not None:
+            return result
+    negotiation = _Negotiation(site, cursor)
+    for strategy in negotiation.candidates():
+        result = negotiation.feed(strategy, await client.request(**strategy.request(jql, max_results, fields, cursor)))
+        if result is not None:
+            return result
+    return negotiation.fail()
+
+
+def iter_issues(jql: str, page_size: int, fields: str) -> Iterator[dict[str, Any]]:
+    """
+    Yield every raw issue matching the JQL, following the cursor page by page. The next page is fetched
+    in a background thread while the caller consumes the current one, so at most two pages are held in memory.
+    """
+    page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="jira-prefetch") as pool:
+        page = search_page(jql, page_size, fields)
+        fetch = in_current_lane(search_page)  # e.g. the mirror backfill's bulk lane
+        while True:
+            upcoming = pool.submit(fetch, jql, page_size, fields, page.next_cursor) if page.next_cursor else None
+            yield from page.issues
+            if upcoming is None:
+                return
+            page = upcoming.result()
+
+
+def search_capability_stats() -> dict[str, Any]:
+    """Counters for /health: cache hits, negotiations, fallback attempts and the strategy cached per site."""
+    now = time.monotonic()
+    with _lock:
+        return {
+            **{k: v for k, v in _stats.items() if k != "selected"},
+            "selected": dict(_stats["selected"]),
+            "sites": {site: name for site, (name, expires_at) in _capabilities.items() if expires_at > now},
+        }
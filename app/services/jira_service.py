@@ -1,553 +1,334 @@
-"""Jira client for fetching tickets and creating sub-tasks."""
+"""Jira client for fetching tickets and creating sub-tasks (payloads and response parsing: jira_common)."""
 import logging
-import re
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 
 import httpx
-from jira import JIRA
 
 from app.config import settings
 from app.models import SubtaskItem, TicketDetail, TicketSummary
+from app.services.comment_cache import comment_cache
+from app.services.jira_common import (
+    DEFAULT_JQL,
+    DETAIL_FIELDS,
+    LEGACY_CREATEMETA_PATH,
+    SEARCH_FIELDS,
+    SUBTASK_BULK_MAX,
+    SUBTASK_ISSUETYPE_ERROR,
+    bulk_outcome,
+    bulk_payload,
+    cached_subtask_type_id,
+    comment_page_params,
+    comment_texts,
+    created_ticket,
+    createmeta_issuetypes,
+    createmeta_path,
+    extract_detail,
+    extract_summary,
+    forget_subtask_type_id,
+    jira_fields,
+    keys_jql,
+    keys_rejected_by_jira,
+    known_issue_updated,
+    markdown_comments,
+    mirrored_tickets_page,
+    new_ticket_fields,
+    normalize_issue_keys,
+    pick_subtask_type_id,
+    remaining_comment_starts,
+    remember_subtask_type_id,
+    subtask_fields,
+    subtask_issuetype_candidates,
+    ticket_changed,
+    ticket_flight,
+    ticket_flight_key,
+    ticket_update_fields,
+    unchanged_since,
+    updated_ticket,
+)
+from app.services.jira_governor import LANE_BULK, in_current_lane, jira_lane
+from app.services.jira_http import get_jira_http_client
+from app.services.jira_search import MAX_PAGE_SIZE, iter_issues, offset_cursor, search_page
+from app.services.markdown_adf import markdown_to_adf
+from app.services.mirror_service import mirrored_ticket, store_mirrored_ticket
+from app.services.search_index import append_comment, index_comments, index_tickets
+from app.services.ticket_cache import ticket_cache
 
 logger = logging.getLogger(__name__)
 
 
-def is_story_or_epic(ticket: TicketDetail) -> bool:
-    """True if the ticket is a Story or Epic (can have sub-tasks in Jira)."""
-    it = (ticket.issue_type or "").strip().lower()
-    return it in ("story", "epic")
-
-
-# Default JQL for listing issues (project is not empty avoids empty-JQL 400 on some instances).
-DEFAULT_JQL = "project is not empty ORDER BY created DESC"
-SEARCH_FIELDS = "summary,status,issuetype,assignee"
-
-
-def _get_jira_client() -> JIRA:
-    """Build JIRA client for Cloud (get_server_info=True enables enhanced_search_issues)."""
-    return JIRA(
-        server=settings.jira_url.rstrip("/"),
-        basic_auth=(settings.jira_username, settings.jira_api_token),
-        get_server_info=True,
-    )
-
-
-def _issue_to_dict(issue) -> dict[str, Any]:
-    """Turn jira.Issue into the dict shape our extractors expect."""
-    return getattr(issue, "raw", issue) if not isinstance(issue, dict) else issue
-
-
-def _extract_summary(issue: dict[str, Any]) -> TicketSummary:
-    fields = issue.get("fields") or {}
-    status = (fields.get("status") or {}).get("name")
-    itype = (fields.get("issuetype") or {}).get("name")
-    assignee = (fields.get("assignee") or {}).get("displayName") or (fields.get("assignee") or {}).get("emailAddress")
-    return TicketSummary(
-        key=issue.get("key", ""),
-        summary=(fields.get("summary") or ""),
-        status=status,
-        issue_type=itype,
-        assignee=assignee,
-    )
-
-
-def _adf_to_markdown(node: dict[str, Any], list_index: int = None) -> str:
-    """Recursively convert Jira ADF to Markdown."""
-    if not isinstance(node, dict):
-        return ""
-    
-    node_type = node.get("type")
-    
-    if node_type == "text":
-        text = node.get("text", "")
-        # Handle marks (bold, italic, code, link)
-        marks = node.get("marks", [])
-        for mark in marks:
-            t = mark.get("type")
-            if t == "strong":
-                text = f"**{text}**"
-            elif t == "em":
-                text = f"*{text}*"
-            elif t == "code":
-                text = f"`{text}`"
-            elif t == "link":
-                url = mark.get("attrs", {}).get("href", "")
-                text = f"[{text}]({url})"
-        return text
-
-    content = node.get("content", [])
-    parts = []
-    
-    for i, child in enumerate(content):
-        if node_type == "orderedList":
-            parts.append(_adf_to_markdown(child, list_index=i+1))
-        elif node_type == "bulletList":
-            parts.append(_adf_to_markdown(child, list_index=0))
-        else:
-            parts.append(_adf_to_markdown(child))
-            
-    if node_type == "paragraph":
-        return "".join(parts) + "\n\n"
-    elif node_type == "heading":
-        level = node.get("attrs", {}).get("level", 1)
-        return f"{'#' * level} " + "".join(parts) + "\n\n"
-    elif node_type in ("bulletList", "orderedList"):
-        return "".join(parts) + "\n"
-    elif node_type == "listItem":
-        prefix = f"{list_index}. " if list_index else "* "
-        # list items usually contain paragraphs, so we strip trailing newlines
-        item_text = "".join(parts).strip()
-        # Handle multi-line list items by indenting subsequent lines
-        indented_text = item_text.replace("\n", "\n  ")
-        return f"{prefix}{indented_text}\n"
-    elif node_type == "codeBlock":
-        lang = node.get("attrs", {}).get("language", "")
-        return f"```{lang}\n" + "".join(parts).strip() + "\n```\n\n"
-    elif node_type in ("doc", "blockquote", "panel"):
-        return "".join(parts)
-    elif node_type == "rule":
-        return "---\n\n"
-
-    return "".join(parts)
-
-
-def _extract_detail(issue: dict[str, Any]) -> TicketDetail:
-    fields = issue.get("fields") or {}
-    desc = fields.get("description")
-    if isinstance(desc, dict):
-        description = _adf_to_markdown(desc).strip()
-    else:
-        description = str(desc) if desc is not None else None
-
-    status = (fields.get("status") or {}).get("name")
-    itype = (fields.get("issuetype") or {}).get("name")
-    assignee = (fields.get("assignee") or {}).get("displayName") or (fields.get("assignee") or {}).get("emailAddress")
-    project = (fields.get("project") or {}).get("key")
-    subtasks = fields.get("subtasks", [])
-
-    return TicketDetail(
-        key=issue.get("key", ""),
-        summary=(fields.get("summary") or ""),
-        description=description,
-        status=status,
-        issue_type=itype,
-        assignee=assignee,
-        project=project,
-        created=fields.get("created"),
-        updated=fields.get("updated"),
-        subtasks=subtasks,
-        raw=issue,
-    )
-
-
-def _fetch_tickets_via_rest(
-    jql: str,
-    max_results: int,
-) -> list[TicketSummary]:
-    """Fallback: fetch tickets via direct REST. Prefer GET search/jql (recommended by Atlassian)."""
-    base = settings.jira_url.rstrip("/")
-    auth = (settings.jira_username, settings.jira_api_token)
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    # Use comma-separated string for fields; some Jira versions reject array in query string
-    fields_str = SEARCH_FIELDS.strip() or "summary,status,issuetype,assignee"
-    jql_str = jql or DEFAULT_JQL
-
-    def parse_issues(data: dict) -> list[TicketSummary]:
-        issues = data.get("issues") or data.get("values") or []
-        return [_extract_summary(i if isinstance(i, dict) else getattr(i, "raw", i)) for i in issues]
-
-    with httpx.Client(timeout=30.0) as client:
-        url_jql = f"{base}/rest/api/3/search/jql"
-        # 1) GET /rest/api/3/search/jql – recommended; params only (no body)
-        logger.info("Jira fetch_tickets: trying GET %s with jql=%s", url_jql, jql_str[:80])
-        r = client.get(
-            url_jql,
-            auth=auth,
-            params={"jql": jql_str, "maxResults": max_results, "fields": fields_str},
-        )
-        logger.info("Jira GET search/jql response: status=%s body=%s", r.status_code, r.text[:500] if r.text else "")
-        if r.status_code == 200:
-            return parse_issues(r.json())
-        # 2) GET without fields (minimal params)
-        if r.status_code == 400:
-            logger.info("Jira fetch_tickets: trying GET search/jql without fields")
-            r2 = client.get(url_jql, auth=auth, params={"jql": jql_str, "maxResults": max_results})
-            logger.info("Jira GET search/jql (no fields) response: status=%s body=%s", r2.status_code, r2.text[:500] if r2.text else "")
-            if r2.status_code == 200:
-                return parse_issues(r2.json())
-        # 3) POST /rest/api/3/search/jql – body with jql, maxResults, fields (array ok in JSON body)
-        if r.status_code in (400, 404, 410):
-            logger.info("Jira fetch_tickets: trying POST %s", url_jql)
-            body = {
-                "jql": jql_str,
-                "maxResults": max_results,
-                "fields": [f.strip() for f in fields_str.split(",")],
-            }
-            r3 = client.post(url_jql, auth=auth, headers=headers, json=body)
-            logger.info("Jira POST search/jql response: status=%s body=%s", r3.status_code, r3.text[:500] if r3.text else "")
-            if r3.status_code == 200:
-                return parse_issues(r3.json())
-        # 4) POST /rest/api/3/search (legacy)
-        if r.status_code in (400, 404, 410):
-            url_legacy = f"{base}/rest/api/3/search"
-            logger.info("Jira fetch_tickets: trying POST legacy %s", url_legacy)
-            r4 = client.post(
-                url_legacy,
-                auth=auth,
-                headers=headers,
-                json={
-                    "jql": jql_str,
-                    "startAt": 0,
-                    "maxResults": max_results,
-                    "fields": [f.strip() for f in fields_str.split(",")],
-                },
-            )
-            logger.info("Jira POST legacy search response: status=%s body=%s", r4.status_code, r4.text[:500] if r4.text else "")
-            if r4.status_code == 200:
-                return parse_issues(r4.json())
-        logger.error("Jira fetch_tickets: all REST attempts failed. Last response: status=%s url=%s body=%s", r.status_code, r.url, r.text)
-        r.raise_for_status()
-        return []
+def fetch_tickets_page(
+    jql: str = DEFAULT_JQL,
+    max_results: int = 50,
+    cursor: str | None = None,
+    start_at: int = 0,
+    max_staleness: float | None = None,
+) -> tuple[list[TicketSummary], str | None]:
+    """
+    Fetch one page of tickets via JQL search (endpoint negotiated per site, see jira_search).
+    Returns (tickets, next_cursor); pass next_cursor back to get the following page, None means last page.
+    start_at is honoured when no cursor is given. Served from the local mirror when it can answer the JQL
+    and was synced within max_staleness seconds (None = JIRA_MIRROR_MAX_STALENESS_SECONDS, 0 = always live).
+    """
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured (JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN)")
+    max_results = min(max(1, max_results), 100)
+    cursor = cursor or offset_cursor(start_at)
+    mirrored = mirrored_tickets_page(jql or DEFAULT_JQL, max_results, cursor, max_staleness)
+    if mirrored is not None:
+        return mirrored
+    page = search_page(jql or DEFAULT_JQL, max_results, SEARCH_FIELDS, cursor)
+    out = [extract_summary(i) for i in page.issues if isinstance(i, dict)]
+    logger.info("Jira fetch_tickets: got %d tickets (more=%s)", len(out), page.next_cursor is not None)
+    return out, page.next_cursor
 
 
 def fetch_tickets(
     jql: str = DEFAULT_JQL,
     max_results: int = 50,
     start_at: int = 0,
+    max_staleness: float | None = None,
 ) -> list[TicketSummary]:
-    """Fetch tickets using jira.enhanced_search_issues(); fallback to direct REST if needed."""
+    """Fetch one page of tickets via JQL search (see fetch_tickets_page)."""
+    return fetch_tickets_page(jql, max_results, start_at=start_at, max_staleness=max_staleness)[0]
+
+
+def fetch_ticket_fields_page(
+    jql: str,
+    fields: list[str] | None,
+    max_results: int = 50,
+    cursor: str | None = None,
+    start_at: int = 0,
+    include_raw: bool = False,
+) -> tuple[list[TicketDetail], str | None]:
+    """
+    fetch_tickets_page for GET /tickets?fields=...: Jira is asked for just those fields (see TICKET_FIELDS), and only
+    they are filled in on the returned tickets. Always live; the results are partial, so they are not cached.
+    """
     if not settings.jira_configured:
         raise ValueError("Jira is not configured (JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN)")
     max_results = min(max(1, max_results), 100)
-    jql_str = jql or DEFAULT_JQL
-    last_error = None
-    for use_post in (False, True):
-        try:
-            method = "POST" if use_post else "GET"
-            logger.info("Jira fetch_tickets: trying jira library enhanced_search_issues (use_post=%s)", use_post)
-            jira_client = _get_jira_client()
-            result = jira_client.enhanced_search_issues(
-                jql_str=jql_str,
-                maxResults=max_results,
-                fields=SEARCH_FIELDS,
-                nextPageToken=None,
-                use_post=use_post,
-            )
-            if isinstance(result, dict):
-                issues = result.get("issues") or result.get("values") or []
-            else:
-                issues = list(result) if result is not None else []
-            out = []
-            for issue in issues or []:
-                out.append(_extract_summary(_issue_to_dict(issue)))
-            if out:
-                logger.info("Jira fetch_tickets: got %d tickets via jira library (%s)", len(out), method)
-                return out
-            logger.warning("Jira fetch_tickets: jira library (%s) returned 0 issues", method)
-        except Exception as e:
-            last_error = e
-            logger.warning("Jira fetch_tickets: jira library (use_post=%s) failed: %s", use_post, e, exc_info=True)
-            continue
-    logger.info("Jira fetch_tickets: falling back to direct REST (jira library failed: %s)", last_error)
-    try:
-        out = _fetch_tickets_via_rest(jql_str, max_results)
-        logger.info("Jira fetch_tickets: REST fallback returned %d tickets", len(out))
-        return out
-    except Exception as e:
-        logger.error("Jira fetch_tickets: REST fallback also failed: %s", e, exc_info=True)
-        raise
+    page = search_page(jql or DEFAULT_JQL, max_results, jira_fields(fields), cursor or offset_cursor(start_at))
+    return [extract_detail(i, include_raw) for i in page.issues if isinstance(i, dict)], page.next_cursor
 
 
-def fetch_ticket(ticket_id: str) -> TicketDetail:
-    """Fetch a single ticket by key (GET /rest/api/3/issue/{id})."""
+def iter_tickets(jql: str = DEFAULT_JQL, page_size: int = 100) -> Iterator[TicketSummary]:
+    """Yield every ticket matching the JQL, page by page (next page prefetched while the current one is consumed)."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured (JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN)")
+    for issue in iter_issues(jql or DEFAULT_JQL, page_size, SEARCH_FIELDS):
+        if isinstance(issue, dict):
+            yield extract_summary(issue)
+
+
+def fetch_ticket(
+    ticket_id: str,
+    max_staleness: float | None = None,
+    fields: list[str] | None = None,
+    include_raw: bool = False,
+) -> TicketDetail:
+    """
+    Fetch a single ticket by key (GET /rest/api/3/issue/{id}).
+    Served from ticket_cache within its TTL, then from the local mirror if synced within max_staleness (see
+    fetch_tickets_page). Otherwise only 'updated' is checked and the full issue is re-fetched (and its
+    description re-converted) only if it changed.
+    When it has to be fetched, 'fields' (see TICKET_FIELDS) narrows the Jira request; such partial tickets are not
+    cached. include_raw always reads Jira and attaches the issue payload, which caches never hold.
+    Concurrent identical calls share one (ticket_flight).
+    """
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    # Use httpx for single-issue GET to avoid pulling in full jira.issue() if needed
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue/{ticket_id}"
-    with httpx.Client(timeout=30.0) as client:
-        r = client.get(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token),
-            params={"fields": "summary,description,status,issuetype,assignee,project,created,updated,subtasks"},
-        )
+    return ticket_flight.do(
+        ticket_flight_key(ticket_id, max_staleness, fields, include_raw),
+        lambda: _fetch_ticket(ticket_id, max_staleness, fields, include_raw),
+    )
+
+
+def _fetch_ticket(
+    ticket_id: str, max_staleness: float | None, fields: list[str] | None, include_raw: bool
+) -> TicketDetail:
+    cached = None
+    generation = ticket_cache.generation(ticket_id)  # a write landing mid-fetch keeps this copy out
+    if not include_raw:
+        cached = ticket_cache.get(ticket_id)
+        if cached is not None and cached.fresh:
+            return cached.detail
+        mirrored = mirrored_ticket(ticket_id, max_staleness)
+        if mirrored is not None:
+            return mirrored
+    client = get_jira_http_client()
+    if fields is not None:
+        r = client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": jira_fields(fields)})
+        r.raise_for_status()
+        return extract_detail(r.json(), include_raw)
+    if cached is not None:
+        r = client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": "updated"})
         r.raise_for_status()
-        issue = r.json()
-    return _extract_detail(issue)
+        if unchanged_since(cached.detail, r.json()):
+            ticket_cache.mark_valid(ticket_id)
+            return cached.detail
+    # Use httpx for single-issue GET to avoid pulling in full jira.issue() if needed
+    r = client.get(
+        f"/rest/api/3/issue/{ticket_id}",
+        params={"fields": DETAIL_FIELDS},
+    )
+    r.raise_for_status()
+    issue = r.json()
+    detail = extract_detail(issue)
+    if ticket_cache.put(ticket_id, detail, changed=cached is not None, generation=generation):
+        store_mirrored_ticket(detail)
+    index_tickets([detail])
+    return detail.model_copy(update={"raw": issue}) if include_raw else detail
+
+
+def _fetch_key_chunk(keys: list[str]) -> list[TicketDetail]:
+    """One 'key in (...)' search; drops keys Jira rejects and retries once, else falls back to per-key GETs."""
+    generations = {k: ticket_cache.generation(k) for k in keys}
+    try:
+        issues = search_page(keys_jql(keys), len(keys), DETAIL_FIELDS).issues
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 400:
+            raise
+        remaining = [k for k in keys if k not in keys_rejected_by_jira(e.response, keys)]
+        if remaining and len(remaining) < len(keys):
+            return _fetch_key_chunk(remaining)
+        logger.warning("Jira batch fetch: search rejected %d keys; fetching one by one", len(keys))
+        found = []
+        for key in keys:
+            try:
+                found.append(fetch_ticket(key))
+            except httpx.HTTPStatusError as err:
+                if err.response.status_code not in (400, 403, 404):
+                    raise
+        return found
+    details = [extract_detail(i) for i in issues if isinstance(i, dict)]
+    for detail in details:
+        ticket_cache.put(detail.key, detail, generation=generations.get(detail.key))
+    index_tickets(details)
+    return details
+
+
+def fetch_tickets_by_keys(keys: list[str]) -> tuple[list[TicketDetail], list[str]]:
+    """
+    Fetch many tickets with 'key in (...)' searches, MAX_PAGE_SIZE keys per search, chunks run concurrently.
+    Fresh tickets from ticket_cache are not re-fetched. Returns (tickets in request order, missing keys).
+    """
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    wanted = normalize_issue_keys(keys)
+    by_key: dict[str, TicketDetail] = {}
+    to_fetch: list[str] = []
+    for key in wanted:
+        cached = ticket_cache.get(key)
+        if cached is not None and cached.fresh:
+            by_key[key] = cached.detail
+        else:
+            to_fetch.append(key)
+    chunks = [to_fetch[i:i + MAX_PAGE_SIZE] for i in range(0, len(to_fetch), MAX_PAGE_SIZE)]
+    if chunks:
+        workers = max(1, min(len(chunks), settings.jira_batch_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-batch") as pool:
+            for details in pool.map(in_current_lane(_fetch_key_chunk), chunks):
+                by_key.update({d.key.upper(): d for d in details})
+    tickets = [by_key[k] for k in wanted if k in by_key]
+    missing = [k for k in wanted if k not in by_key]
+    return tickets, missing
+
 
 def fetch_ticket_comments(ticket_id: str) -> list[dict]:
-    """Fetch comments for a single ticket by key."""
+    """
+    Every comment of a ticket, oldest first, with Markdown bodies. Follows Jira's comment pages (the later ones
+    in parallel) and is cached per ticket in comment_cache. See select_comments() for since/order/paging.
+    """
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue/{ticket_id}/comment"
-    with httpx.Client(timeout=30.0) as client:
-        r = client.get(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token)
-        )
+    generation = comment_cache.generation(ticket_id)
+    cached = comment_cache.get(ticket_id)
+    if cached is not None and cached.fresh:
+        return cached.comments
+    client = get_jira_http_client()
+    if cached is not None and cached.issue_updated:
+        # Read before the comments, so one added in between makes the next revalidation re-fetch
+        r = client.get(f"/rest/api/3/issue/{ticket_id}", params={"fields": "updated"})
         r.raise_for_status()
-        data = r.json()
-    return data.get("comments", [])
-
-
-def ticket_to_context_string(ticket: TicketDetail) -> str:
-    """Serialize ticket for MCP tool context."""
-    lines = [
-        f"Key: {ticket.key}",
-        f"Summary: {ticket.summary}",
-        f"Type: {ticket.issue_type or 'N/A'}",
-        f"Status: {ticket.status or 'N/A'}",
-        f"Assignee: {ticket.assignee or 'Unassigned'}",
-        f"Project: {ticket.project or 'N/A'}",
-    ]
-    if ticket.description:
-        lines.append(f"Description: {ticket.description}")
-    if ticket.created:
-        lines.append(f"Created: {ticket.created}")
-    if ticket.updated:
-        lines.append(f"Updated: {ticket.updated}")
-    return "\n".join(lines)
-
-
-def _text_to_adf_body(text: str) -> dict:
-    """Convert Markdown text to Jira Cloud ADF (Atlassian Document Format)."""
-    import re
-    blocks = []
-    lines = text.split("\n")
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        raw_line = lines[i]
-        
-        if not line:
-            i += 1
-            continue
-            
-        # Code block
-        if line.startswith("```"):
-            lang = line[3:].strip()
-            code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith("```"):
-                code_lines.append(lines[i])
-                i += 1
-            blocks.append({
-                "type": "codeBlock",
-                "attrs": {"language": lang or "plain"},
-                "content": [{"type": "text", "text": "\n".join(code_lines) if code_lines else " "}]
-            })
-            i += 1
-            continue
-            
-        # Heading
-        m_heading = re.match(r"^(#{1,6})\s+(.*)", line)
-        if m_heading:
-            level = len(m_heading.group(1))
-            blocks.append({
-                "type": "heading",
-                "attrs": {"level": level},
-                "content": [{"type": "text", "text": m_heading.group(2)}]
-            })
-            i += 1
-            continue
-            
-        # Bullet List
-        if line.startswith("- ") or line.startswith("* "):
-            items = []
-            while i < len(lines) and (lines[i].strip().startswith("- ") or lines[i].strip().startswith("* ")):
-                item_text = re.sub(r"^[-*]\s+", "", lines[i].strip())
-                
-                # bold parsing inside list
-                text_nodes = []
-                parts = re.split(r'(\*\*.*?\*\*)', item_text)
-                for part in parts:
-                    if part.startswith("**") and part.endswith("**") and len(part) > 4:
-                        text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
-                    elif part:
-                        text_nodes.append({"type": "text", "text": part})
-                        
-                items.append({
-                    "type": "listItem",
-                    "content": [{
-                        "type": "paragraph",
-                        "content": text_nodes if text_nodes else [{"type": "text", "text": " "}]
-                    }]
-                })
-                i += 1
-            blocks.append({
-                "type": "bulletList",
-                "content": items
-            })
-            continue
-
-        # Numbered List
-        m_ordered = re.match(r"^(\d+)\.\s+(.*)", line)
-        if m_ordered:
-            items = []
-            while i < len(lines):
-                m_ord = re.match(r"^(\d+)\.\s+(.*)", lines[i].strip())
-                if not m_ord:
-                    break
-                item_text = m_ord.group(2)
-                
-                text_nodes = []
-                parts = re.split(r'(\*\*.*?\*\*)', item_text)
-                for part in parts:
-                    if part.startswith("**") and part.endswith("**") and len(part) > 4:
-                        text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
-                    elif part:
-                        text_nodes.append({"type": "text", "text": part})
-                        
-                items.append({
-                    "type": "listItem",
-                    "content": [{
-                        "type": "paragraph",
-                        "content": text_nodes if text_nodes else [{"type": "text", "text": " "}]
-                    }]
-                })
-                i += 1
-            blocks.append({
-                "type": "orderedList",
-                "content": items
-            })
-            continue
-            
-        # Paragraph with bold parsing
-        text_nodes = []
-        parts = re.split(r'(\*\*.*?\*\*)', line)
-        for part in parts:
-            if part.startswith("**") and part.endswith("**") and len(part) > 4:
-                text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
-            elif part:
-                text_nodes.append({"type": "text", "text": part})
-        
-        blocks.append({
-            "type": "paragraph",
-            "content": text_nodes if text_nodes else [{"type": "text", "text": line}]
-        })
-        i += 1
-        
-    if not blocks:
-        blocks = [{"type": "paragraph", "content": [{"type": "text", "text": "(No content)"}]}]
-    return {"type": "doc", "version": 1, "content": blocks}
+        issue_updated = (r.json().get("fields") or {}).get("updated")
+        if issue_updated == cached.issue_updated:
+            comment_cache.mark_valid(ticket_id)
+            return cached.comments
+    else:
+        issue_updated = known_issue_updated(ticket_id)
+    path = f"/rest/api/3/issue/{ticket_id}/comment"
+
+    def get_page(start_at: int) -> dict[str, Any]:
+        r = client.get(path, params=comment_page_params(start_at))
+        r.raise_for_status()
+        return r.json()
+
+    first = get_page(0)
+    raw = list(first.get("comments") or [])
+    starts = remaining_comment_starts(first)
+    if starts:
+        workers = max(1, min(len(starts), settings.jira_batch_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-comments") as pool:
+            for page in pool.map(in_current_lane(get_page), starts):
+                raw.extend(page.get("comments") or [])
+    comments = markdown_comments(raw)
+    comment_cache.put(ticket_id, comments, issue_updated, changed=cached is not None, generation=generation)
+    index_comments(ticket_id, comment_texts(comments))
+    return comments
 
 
 def add_comment_to_ticket(ticket_id: str, body_text: str) -> dict:
     """Add a comment to a Jira issue. Returns the created comment payload."""
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue/{ticket_id}/comment"
-    body_adf = _text_to_adf_body(body_text)
-    with httpx.Client(timeout=30.0) as client:
-        r = client.post(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token),
-            json={"body": body_adf},
-        )
-        r.raise_for_status()
-        return r.json()
+    body_adf = markdown_to_adf(body_text)
+    r = get_jira_http_client().post(f"/rest/api/3/issue/{ticket_id}/comment", json={"body": body_adf})
+    r.raise_for_status()
+    ticket_changed(ticket_id)
+    comment_cache.invalidate(ticket_id)
+    append_comment(ticket_id, body_text)
+    return r.json()
 
 
 def update_issue_description(issue_key: str, description_text: str) -> None:
     """Update the issue's description field (Jira Cloud expects ADF). Fails if Jira is not configured."""
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue/{issue_key}"
-    description_adf = _text_to_adf_body(description_text or "")
-    with httpx.Client(timeout=30.0) as client:
-        r = client.put(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token),
-            json={"fields": {"description": description_adf}},
-        )
+    description_adf = markdown_to_adf(description_text or "")
+    r = get_jira_http_client().put(f"/rest/api/3/issue/{issue_key}", json={"fields": {"description": description_adf}})
+    r.raise_for_status()
+    ticket_changed(issue_key)
+
+
+def _resolve_subtask_type_id(project_key: str) -> str | None:
+    """The project's sub-task issuetype id from create-meta, cached per project; None if it can't be read."""
+    cached = cached_subtask_type_id(project_key)
+    if cached:
+        return cached
+    client = get_jira_http_client()
+    try:
+        r = client.get(createmeta_path(project_key), params={"maxResults": 200})
+        if r.status_code in (404, 405):
+            r = client.get(LEGACY_CREATEMETA_PATH, params={"projectKeys": project_key})
         r.raise_for_status()
-
-
-def parse_suggested_subtasks(solution_text: str) -> list[SubtaskItem]:
-    """
-    Extract sub-task items (summary + description) from solution text.
-    Supports: (1) "Summary | Description" per line, (2) multi-line blocks (summary then indented description),
-    (3) fallback APPROACH PLAN lines as summaries (no description).
-    """
-    text = solution_text or ""
-    patterns = [
-        r"(?:Suggested\s+sub-tasks|Sub-tasks\s+to\s+create|SUGGESTED\s+SUB-TASKS|Tasks\s+to\s+create|Recommended\s+(?:sub-?)?tasks):\s*\n",
-        r"\n3\)\s*SUGGESTED\s+SUB-TASKS:\s*\n",
-        r"\n3\.\s*SUGGESTED\s+SUB-TASKS:\s*\n",
-    ]
-    start = -1
-    for pat in patterns:
-        m = re.search(pat, text, re.IGNORECASE)
-        if m:
-            start = m.end()
-            break
-    if start >= 0:
-        section = text[start:]
-        tasks: list[SubtaskItem] = []
-        # Try single-line "Summary | Description" first (only count lines that have a pipe)
-        for line in section.split("\n"):
-            line_stripped = line.strip()
-            if not line_stripped:
-                break
-            if re.match(r"^(?:Solution|Approach|SOLUTION|APPROACH)\s*:?\s*$", line_stripped, re.IGNORECASE):
-                break
-            raw = line_stripped
-            raw = re.sub(r"^\s*[-*]\s+", "", raw)
-            raw = re.sub(r"^\s*\d+[.)]\s+", "", raw)
-            if not raw:
-                continue
-            if "|" in raw:
-                parts = raw.split("|", 1)
-                summary = (parts[0] or "").strip()[:255]
-                description = (parts[1].strip() if len(parts) > 1 and parts[1] else "").strip() or None
-                if summary:
-                    tasks.append(SubtaskItem(summary=summary, description=description))
-        if tasks:
-            return tasks
-
-        # Multi-line block: "1. Summary\n   Description\n2. Next\n   Desc" (no pipe on any line)
-        lines = section.split("\n")
-        current_summary: str | None = None
-        current_desc: list[str] = []
-        for line in lines:
-            stripped = line.strip()
-            is_bullet = bool(re.match(r"^\s*(\d+[.)]|[-*])\s+", line))
-            if is_bullet and stripped:
-                bullet_removed = re.sub(r"^\s*\d+[.)]\s+", "", stripped)
-                bullet_removed = re.sub(r"^\s*[-*]\s+", "", bullet_removed)
-                if bullet_removed and len(bullet_removed) <= 255:
-                    if current_summary:
-                        desc_text = "\n".join(current_desc).strip() or None
-                        tasks.append(SubtaskItem(summary=current_summary, description=desc_text))
-                    current_summary = bullet_removed[:255]
-                    current_desc = []
-            elif current_summary and stripped:
-                current_desc.append(stripped)
-        if current_summary:
-            desc_text = "\n".join(current_desc).strip() or None
-            tasks.append(SubtaskItem(summary=current_summary, description=desc_text))
-        if tasks:
-            return tasks
-    # Fallback: APPROACH PLAN numbered lines as summaries (no description)
-    approach = re.search(r"(?:APPROACH\s+PLAN|1\)\s*APPROACH)\s*:?\s*\n(.*?)(?=\n\s*(?:2\)|2\.|SOLUTION|Suggested)|$)", text, re.IGNORECASE | re.DOTALL)
-    if approach:
-        block = approach.group(1).strip()
-        tasks = []
-        for line in block.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            cleaned = re.sub(r"^\s*\d+[.)]\s+", "", line)
-            cleaned = re.sub(r"^\s*[-*]\s+", "", cleaned)
-            if cleaned and len(cleaned) <= 255:
-                tasks.append(SubtaskItem(summary=cleaned, description=None))
-        if tasks:
-            return tasks
-    return []
+        type_id = pick_subtask_type_id(createmeta_issuetypes(r.json()))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Jira create-meta for %s failed (%s); sub-task issuetype is guessed by name", project_key, e)
+        return None
+    if type_id:
+        remember_subtask_type_id(project_key, type_id)
+    return type_id
+
+
+def _post_subtask(client: httpx.Client, fields: dict[str, Any], type_id: str | None) -> dict:
+    for issuetype in subtask_issuetype_candidates(type_id):
+        r = client.post("/rest/api/3/issue", json={"fields": {**fields, "issuetype": issuetype}})
+        if r.status_code in (200, 201):
+            return r.json()
+        if r.status_code != 400:
+            r.raise_for_status()
+    raise RuntimeError(SUBTASK_ISSUETYPE_ERROR)
 
 
 def create_subtask(
@@ -565,57 +346,100 @@ def create_subtask(
 ) -> dict:
     """
     Create a sub-task under a Story/Epic. Returns the created issue payload (includes 'key').
-    Tries 'Sub-task' then 'Subtask' if the first fails.
+    Uses the project's sub-task issuetype id from create-meta, else tries the names JIRA_SUBTASK_ISSUETYPE,
+    'Sub-task' and 'Subtask'.
     Optional: description (ADF), assignee, priority, labels, duedate (YYYY-MM-DD), components, fix version.
     """
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue"
-    summary_trimmed = (summary or "Task").strip()[:255]
-    fields: dict[str, Any] = {
-        "project": {"key": project_key},
-        "parent": {"key": parent_issue_key},
-        "summary": summary_trimmed,
-        "issuetype": {"name": ""},  # set per attempt
-    }
-    if description and description.strip():
-        fields["description"] = _text_to_adf_body(description.strip())
-    if assignee_account_id and assignee_account_id.strip():
-        fields["assignee"] = {"accountId": assignee_account_id.strip()}
-    if priority_name and priority_name.strip():
-        fields["priority"] = {"name": priority_name.strip()}
-    if labels:
-        fields["labels"] = [str(l).strip() for l in labels if str(l).strip()]
-    if duedate and str(duedate).strip():
-        fields["duedate"] = str(duedate).strip()
-    if components:
-        fields["components"] = [{"name": str(c).strip()} for c in components if str(c).strip()]
-    if fix_version and str(fix_version).strip():
-        fields["fixVersions"] = [{"name": str(fix_version).strip()}]
-
-    types_to_try: list[str] = []
-    if settings.jira_subtask_issuetype and settings.jira_subtask_issuetype not in types_to_try:
-        types_to_try.append(settings.jira_subtask_issuetype)
-    for name in ("Sub-task", "Subtask"):
-        if name not in types_to_try:
-            types_to_try.append(name)
-    for subtask_type in types_to_try:
-        fields["issuetype"] = {"name": subtask_type}
-        payload = {"fields": fields}
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(
-                url,
-                auth=(settings.jira_username, settings.jira_api_token),
-                json=payload,
-            )
-            if r.status_code == 200:
-                return r.json()
-            if r.status_code != 400:
-                r.raise_for_status()
-            if "Subtask" in subtask_type or "Sub-task" in subtask_type:
-                continue
-    raise RuntimeError("Jira create sub-task failed: try setting JIRA_SUBTASK_ISSUETYPE in .env to your project's sub-task type name")
+    fields = subtask_fields(
+        parent_issue_key,
+        project_key,
+        summary,
+        description=description,
+        assignee_account_id=assignee_account_id,
+        priority_name=priority_name,
+        labels=labels,
+        duedate=duedate,
+        components=components,
+        fix_version=fix_version,
+    )
+    created = _post_subtask(get_jira_http_client(), fields, _resolve_subtask_type_id(project_key))
+    ticket_changed(parent_issue_key)  # parent's subtasks list changed
+    return created
+
+
+def create_subtasks(
+    parent_issue_key: str,
+    project_key: str,
+    subtasks: list[SubtaskItem],
+    *,
+    assignee_account_id: str | None = None,
+    priority_name: str | None = None,
+    labels: list[str] | None = None,
+    duedate: str | None = None,
+    components: list[str] | None = None,
+    fix_version: str | None = None,
+) -> list[dict | Exception]:
+    """
+    Create several sub-tasks under a Story/Epic with POST /rest/api/3/issue/bulk (SUBTASK_BULK_MAX per call).
+    Issues the bulk call could not create are created one by one, JIRA_BATCH_CONCURRENCY at a time.
+    Returns, in input order, each created issue payload or the exception that sub-task failed with.
+    """
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    fields_list = [
+        subtask_fields(
+            parent_issue_key,
+            project_key,
+            item.summary,
+            description=item.description,
+            assignee_account_id=assignee_account_id,
+            priority_name=priority_name,
+            labels=labels,
+            duedate=duedate,
+            components=components,
+            fix_version=fix_version,
+        )
+        for item in subtasks
+    ]
+    results: list[dict | Exception | None] = [None] * len(fields_list)
+    client = get_jira_http_client()
+    with jira_lane(LANE_BULK):  # interactive reads go first
+        type_id = _resolve_subtask_type_id(project_key) if fields_list else None
+        if type_id and len(fields_list) > 1:
+            for start in range(0, len(fields_list), SUBTASK_BULK_MAX):
+                chunk = fields_list[start:start + SUBTASK_BULK_MAX]
+                r = client.post("/rest/api/3/issue/bulk", json=bulk_payload(chunk, type_id))
+                outcome = bulk_outcome(r, len(chunk))
+                if outcome is None:
+                    logger.warning(
+                        "Jira bulk sub-task create for %s: status %s; creating one by one",
+                        parent_issue_key,
+                        r.status_code,
+                    )
+                    if r.status_code == 400:
+                        forget_subtask_type_id(project_key)
+                        type_id = None
+                    break
+                results[start:start + len(chunk)] = outcome
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+
+        def run(i: int) -> dict | Exception:
+            try:
+                with jira_lane(LANE_BULK):  # pool threads don't inherit the caller's context
+                    return _post_subtask(client, fields_list[i], type_id)
+            except Exception as e:
+                return e
+
+        workers = max(1, min(len(pending), settings.jira_batch_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-subtask") as pool:
+            for i, result in zip(pending, pool.map(run, pending)):
+                results[i] = result
+    if any(isinstance(result, dict) for result in results):
+        ticket_changed(parent_issue_key)  # parent's subtasks list changed
+    return results
 
 
 def create_ticket(
@@ -626,26 +450,8 @@ def create_ticket(
 ) -> dict:
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue"
-    fields: dict[str, Any] = {
-        "project": {"key": project_key},
-        "summary": (summary or "Task").strip()[:255],
-        "issuetype": {"name": issue_type},
-    }
-    if description and description.strip():
-        fields["description"] = _text_to_adf_body(description.strip())
-    
-    payload = {"fields": fields}
-    with httpx.Client(timeout=30.0) as client:
-        r = client.post(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token),
-            json=payload,
-        )
-        if r.status_code == 201:
-            return r.json()
-        raise RuntimeError(f"Jira create ticket failed: {r.text}")
+    payload = {"fields": new_ticket_fields(project_key, summary, description, issue_type)}
+    return created_ticket(get_jira_http_client().post("/rest/api/3/issue", json=payload))
 
 
 def update_ticket(
@@ -655,25 +461,12 @@ def update_ticket(
 ) -> dict:
     if not settings.jira_configured:
         raise ValueError("Jira is not configured")
-    base = settings.jira_url.rstrip("/")
-    url = f"{base}/rest/api/3/issue/{ticket_id}"
-    fields: dict[str, Any] = {}
-    if summary is not None:
-        fields["summary"] = summary.strip()[:255]
-    if description is not None:
-        fields["description"] = _text_to_adf_body(description.strip())
-    
+    fields = ticket_update_fields(summary, description)
     if not fields:
         return {}
-        
+
     payload = {"fields": fields}
-    with httpx.Client(timeout=30.0) as client:
-        r = client.put(
-            url,
-            auth=(settings.jira_username, settings.jira_api_token),
-            json=payload,
-        )
-        if r.status_code == 204:
-            return {"id": ticket_id, "message": "updated"}
-        raise RuntimeError(f"Jira update ticket failed: {r.text}")
+    r = get_jira_http_client().put(f"/rest/api/3/issue/{ticket_id}", json=payload)
+    ticket_changed(ticket_id)
+    return updated_ticket(ticket_id, r)
 
@@ -0,0 +1,147 @@
+"""
+Jira webhook handling: verify the shared secret, then push issue/comment changes into the local caches.
+
+Webhook payloads carry REST v2 fields (wiki-markup descriptions), so they are only used to learn *which* issue
+changed. Cached state is dropped at once; tickets this service already knows about are then re-fetched
+(in the background) through the normal path, which refreshes ticket_cache, the mirror and the search index.
+"""
+import hashlib
+import hmac
+import logging
+import threading
+from typing import Any
+
+from app.config import settings
+from app.services.comment_cache import comment_cache
+from app.services.jira_governor import LANE_BULK, jira_lane
+from app.services.jira_common import ticket_changed
+from app.services.jira_service import fetch_ticket, fetch_ticket_comments
+from app.services.mirror_service import forget_mirrored_ticket, mirror_projects
+from app.services.search_index import search_index
+from app.services.ticket_cache import ticket_cache
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Hub-Signature"
+
+_pending_lock = threading.Lock()
+_pending: set[tuple[str, str]] = set()  # (kind, key) refreshes queued but not yet run; duplicates are dropped
+_stats = {"received": 0, "rejected": 0, "refreshes": 0, "coalesced": 0, "deleted": 0, "ignored": 0}
+
+
+def verify_secret(body: bytes, signature: str | None, secret_param: str | None) -> bool:
+    """
+    Accept either Jira's HMAC signature ('X-Hub-Signature: sha256=<hex>' over the raw body, for webhooks
+    registered with a secret) or the secret passed as ?secret= in the webhook URL.
+    """
+    secret = settings.jira_webhook_secret
+    if not secret:
+        return False
+    if signature:
+        method, _, digest = signature.partition("=")
+        if method.lower() != "sha256" or not digest:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, digest.lower())
+    return bool(secret_param) and hmac.compare_digest(secret_param.encode(), secret.encode())
+
+
+def _count(stat: str) -> None:
+    # Webhook handlers and refresh tasks run in threads
+    with _pending_lock:
+        _stats[stat] += 1
+
+
+def note_rejected() -> None:
+    _count("rejected")
+
+
+def _issue_keys(payload: dict[str, Any]) -> tuple[str | None, str | None]:
+    """(issue key, parent key if the issue is a sub-task)."""
+    issue = payload.get("issue") or {}
+    key = issue.get("key")
+    parent = ((issue.get("fields") or {}).get("parent") or {}).get("key")
+    return (key.upper() if key else None), (parent.upper() if parent else None)
+
+
+def _is_known(key: str) -> bool:
+    """Worth re-fetching: the ticket is cached, mirrored or searchable here."""
+    return (
+        ticket_cache.contains(key)
+        or key.rpartition("-")[0] in mirror_projects()
+        or search_index.contains(key)
+    )
+
+
+def handle_event(payload: dict[str, Any]) -> tuple[str, list[tuple[str, str]]]:
+    """
+    Apply one webhook event to the caches right away. Returns (action, refreshes) where refreshes are
+    ('ticket' | 'comments', key) pairs to run via run_refresh(), typically as a background task.
+    """
+    _count("received")
+    event = payload.get("webhookEvent") or ""
+    key, parent = _issue_keys(payload)
+    if not key:
+        _count("ignored")
+        return "ignored", []
+
+    if event == "jira:issue_deleted":
+        ticket_cache.invalidate(key)
+        comment_cache.invalidate(key)
+        forget_mirrored_ticket(key)
+        search_index.remove(key)
+        _count("deleted")
+        refreshes = []
+    elif event.startswith("jira:issue_") or event.startswith("comment_"):
+        known = _is_known(key)
+        ticket_changed(key)
+        refreshes = [("ticket", key)] if known else []
+        if event.startswith("comment_"):
+            had_thread = comment_cache.contains(key)
+            comment_cache.invalidate(key)
+            if had_thread or search_index.contains(key):
+                refreshes.append(("comments", key))
+    else:
+        _count("ignored")
+        return "ignored", []
+
+    if parent and event in ("jira:issue_created", "jira:issue_deleted"):
+        # The parent's subtasks list changed too
+        if _is_known(parent):
+            refreshes.append(("ticket", parent))
+        ticket_changed(parent)
+    return event, _queue(refreshes)
+
+
+def _queue(refreshes: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    queued = []
+    with _pending_lock:
+        for item in refreshes:
+            if item in _pending:
+                _stats["coalesced"] += 1
+            else:
+                _pending.add(item)
+                queued.append(item)
+    return queued
+
+
+def run_refresh(refreshes: list[tuple[str, str]]) -> None:
+    """Re-fetch changed tickets/comments from Jira (write-through to cache, mirror and search index)."""
+    with jira_lane(LANE_BULK):
+        for kind, key in refreshes:
+            with _pending_lock:
+                _pending.discard((kind, key))
+            try:
+                if kind == "ticket":
+                    fetch_ticket(key, max_staleness=0)
+                else:
+                    fetch_ticket_comments(key)
+                _count("refreshes")
+            except Exception as e:
+                # Caches were already invalidated, so the next read simply goes to Jira
+                logger.warning("Jira webhook: refreshing %s %s failed: %s", kind, key, e)
+
+
+def webhook_stats() -> dict[str, Any]:
+    with _pending_lock:
+        return {"enabled": bool(settings.jira_webhook_secret), **_stats}
@@ -0,0 +1,415 @@
+"""
+Shared LLM client for solutions, ticket drafts and code generation: OpenAI-compatible chat completions.
+
+- Backends: OpenAICompatibleBackend talks to LLM_BASE_URL (Groq by default) with GROQ_API_KEY and GROQ_MODEL,
+  so a local OpenAI-compatible stand-in (vLLM, llama.cpp server, Ollama's /v1, a mock) is one setting away.
+  set_llm_backend() swaps in any other ChatBackend.
+- Pooling: one keep-alive sync client (for threadpool callers) and one async client per process, rebuilt when
+  the base URL or key changes, so requests stop paying a TLS handshake each. Closed from the app lifespan.
+- Retries: 429, 5xx and connection errors are retried up to LLM_MAX_RETRIES times after Retry-After, else the
+  x-ratelimit-reset-* header of the exhausted limit, else exponential backoff, always with jitter; waits longer
+  than LLM_RETRY_MAX_WAIT_SECONDS are not made. When x-ratelimit-remaining-* reaches 0, later calls wait for the
+  reset instead of collecting a 429.
+- Streaming: chat_completion_stream() yields the text as the server sends it ("stream": true, read as
+  server-sent events), for endpoints that relay a long answer as it is written.
+- Coalescing: identical concurrent calls (same endpoint, model, messages and options) share one completion
+  (llm_flight), streamed or not, so a double submit or several users on one ticket cost a single call.
+"""
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.services.http_retry import retry_after_seconds
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_STAT_NAMES = ("requests", "retries", "rate_limited", "server_errors", "connect_errors", "paused")
+_BACKOFF_BASE_SECONDS = 0.5
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+# (remaining, reset) header pairs of the request and token limits Groq reports
+_RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+)
+
+
+class LLMError(RuntimeError):
+    """The LLM API answered with an error (after retries)."""
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    """Groq's x-ratelimit-reset-* values ('2m59.56s', '7.66s', '350ms', '1h2m') as seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def _exhausted_reset(response: httpx.Response) -> float | None:
+    """Seconds until the first exhausted rate limit (remaining == 0) resets, or None."""
+    waits = []
+    for remaining_header, reset_header in _RATE_LIMIT_HEADERS:
+        remaining = response.headers.get(remaining_header)
+        if remaining is not None and remaining.strip() in ("0", "0.0"):
+            reset = parse_reset_duration(response.headers.get(reset_header))
+            if reset is not None:
+                waits.append(reset)
+    return max(waits) if waits else None
+
+
+class _RetryPolicy:
+    """Sans-IO retry decisions and the shared rate-limit pause; used by both transports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._stats = dict.fromkeys(_STAT_NAMES, 0)
+
+    def pause_remaining(self) -> float:
+        """Seconds to wait before sending (a rate limit is exhausted), capped at the max wait."""
+        with self._lock:
+            self._stats["requests"] += 1
+            wait = self._paused_until - time.monotonic()
+            if wait > 0:
+                self._stats["paused"] += 1
+        return min(max(0.0, wait), settings.llm_retry_max_wait_seconds)
+
+    def observe(self, response: httpx.Response) -> None:
+        reset = _exhausted_reset(response)
+        if reset:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + reset)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, _BACKOFF_BASE_SECONDS * 2**attempt) + _BACKOFF_BASE_SECONDS / 2
+
+    def retry_delay(self, request: httpx.Request, response: httpx.Response, attempt: int) -> float | None:
+        """Seconds to wait before retrying, or None to hand the response to the caller."""
+        if response.status_code not in _RETRY_STATUSES:
+            return None
+        with self._lock:
+            self._stats["rate_limited" if response.status_code == 429 else "server_errors"] += 1
+        hinted = retry_after_seconds(response)
+        if hinted is None and response.status_code == 429:
+            hinted = _exhausted_reset(response)
+        if hinted is None:
+            delay = self._backoff(attempt)
+        else:
+            delay = hinted + random.uniform(0, min(1.0, 0.1 + hinted / 10))
+        return self._accept(request, f"HTTP {response.status_code}", delay, attempt)
+
+    def connect_retry_delay(self, request: httpx.Request, error: Exception, attempt: int) -> float | None:
+        with self._lock:
+            self._stats["connect_errors"] += 1
+        return self._accept(request, type(error).__name__, self._backoff(attempt), attempt)
+
+    def _accept(self, request: httpx.Request, reason: str, delay: float, attempt: int) -> float | None:
+        if attempt >= settings.llm_max_retries or delay > settings.llm_retry_max_wait_seconds:
+            return None
+        with self._lock:
+            self._stats["retries"] += 1
+        logger.info("LLM %s %s: %s, retrying in %.1fs", request.method, request.url.path, reason, delay)
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1)}
+
+
+_policy = _RetryPolicy()
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Retries throttled / failed LLM calls per _RetryPolicy."""
+
+    def __init__(self, transport: httpx.BaseTransport, policy: _RetryPolicy = _policy):
+        self._transport = transport
+        self._policy = policy
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            time.sleep(self._policy.pause_remaining())
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.ConnectError as e:
+                delay = self._policy.connect_retry_delay(request, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self._policy.observe(response)
+                delay = self._policy.retry_delay(request, response, attempt)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RetryTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: _RetryPolicy = _policy):
+        self._transport = transport
+        self._policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._policy.pause_remaining())
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.ConnectError as e:
+                delay = self._policy.connect_retry_delay(request, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self._policy.observe(response)
+                delay = self._policy.retry_delay(request, response, attempt)
+                if delay is None:
+                    return response
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ChatBackend(ABC):
+    """Where chat completions go. complete*() return the first choice's text, or None when there is no choice."""
+
+    name = "LLM"
+
+    @abstractmethod
+    def complete(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> str | None: ...
+
+    @abstractmethod
+    async def complete_async(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> str | None: ...
+
+    async def stream_async(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> AsyncIterator[str]:
+        """Text pieces as they are generated; backends that cannot stream yield the whole answer once."""
+        text = await self.complete_async(messages, model=model, **options)
+        if text:
+            yield text
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _error_message(r: httpx.Response) -> str:
+    try:
+        data = r.json()
+        return (data.get("error") or {}).get("message") or data.get("message") or r.text
+    except Exception:
+        return r.text
+
+
+class OpenAICompatibleBackend(ChatBackend):
+    """POST {base_url}/chat/completions with a bearer key, over pooled clients wrapped in the retry transports."""
+
+    def __init__(self, base_url: str, api_key: str, timeout: float = 120.0, max_connections: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.name = "Groq" if "api.groq.com" in self.base_url else "LLM"
+        self._client_kwargs = {
+            "base_url": self.base_url,
+            "headers": {"Authorization": f"Bearer {api_key.strip()}", "Content-Type": "application/json"},
+            "timeout": timeout,
+        }
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+
+    def _sync(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(
+                    **self._client_kwargs, transport=RetryTransport(httpx.HTTPTransport(limits=self._limits))
+                )
+            return self._client
+
+    def _async(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client is None or self._async_client.is_closed:
+                self._async_client = httpx.AsyncClient(
+                    **self._client_kwargs, transport=AsyncRetryTransport(httpx.AsyncHTTPTransport(limits=self._limits))
+                )
+            return self._async_client
+
+    @staticmethod
+    def _payload(messages: list[dict[str, str]], model: str, options: dict[str, Any]) -> dict[str, Any]:
+        return {"model": model, "messages": messages, "stream": False, **options}
+
+    def _text(self, r: httpx.Response) -> str | None:
+        if r.status_code != 200:
+            raise LLMError(f"{self.name} API error {r.status_code}: {_error_message(r)}")
+        choices = r.json().get("choices") or []
+        if not choices:
+            return None
+        return (choices[0].get("message") or {}).get("content") or ""
+
+    def complete(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> str | None:
+        timeout = options.pop("timeout", None) or httpx.USE_CLIENT_DEFAULT
+        payload = self._payload(messages, model, options)
+        r = self._sync().post("/chat/completions", json=payload, timeout=timeout)
+        return self._text(r)
+
+    async def complete_async(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> str | None:
+        timeout = options.pop("timeout", None) or httpx.USE_CLIENT_DEFAULT
+        payload = self._payload(messages, model, options)
+        r = await self._async().post("/chat/completions", json=payload, timeout=timeout)
+        return self._text(r)
+
+    async def stream_async(self, messages: list[dict[str, str]], *, model: str, **options: Any) -> AsyncIterator[str]:
+        timeout = options.pop("timeout", None) or httpx.USE_CLIENT_DEFAULT
+        payload = self._payload(messages, model, {**options, "stream": True})
+        async with self._async().stream("POST", "/chat/completions", json=payload, timeout=timeout) as r:
+            if r.status_code != 200:
+                await r.aread()
+                raise LLMError(f"{self.name} API error {r.status_code}: {_error_message(r)}")
+            async for line in r.aiter_lines():
+                # OpenAI-style SSE: 'data: {chunk}' lines, then 'data: [DONE]'
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                chunk = json.loads(data)
+                error = chunk.get("error")
+                if error:
+                    message = error.get("message") if isinstance(error, dict) else error
+                    raise LLMError(f"{self.name} stream error: {message}")
+                choices = chunk.get("choices") or []
+                text = (choices[0].get("delta") or {}).get("content") if choices else None
+                if text:
+                    yield text
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            client.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+_lock = threading.Lock()
+_backend: ChatBackend | None = None
+_backend_identity: tuple[str, str] | None = None
+_override: ChatBackend | None = None
+_retired: list[ChatBackend] = []
+
+
+def set_llm_backend(backend: ChatBackend | None) -> None:
+    """Use this backend for every LLM call (None: back to the configured OpenAI-compatible one)."""
+    global _override
+    with _lock:
+        _override = backend
+
+
+def get_llm_backend() -> ChatBackend:
+    """The process-wide backend; callers must not close it."""
+    global _backend, _backend_identity
+    if _override is not None:
+        return _override
+    if not settings.groq_api_key:
+        raise ValueError("GROQ_API_KEY is not set. Get a key at https://console.groq.com/keys")
+    identity = (settings.llm_base_url, settings.groq_api_key)
+    with _lock:
+        if _backend is None or _backend_identity != identity:
+            if _backend is not None:
+                _retired.append(_backend)  # may still serve in-flight calls; closed at shutdown
+            _backend = OpenAICompatibleBackend(
+                settings.llm_base_url,
+                settings.groq_api_key,
+                timeout=settings.llm_timeout_seconds,
+                max_connections=settings.llm_pool_max_connections,
+            )
+            _backend_identity = identity
+        return _backend
+
+
+llm_flight = SingleFlight("llm")
+
+
+def _messages(system: str, user: str) -> list[dict[str, str]]:
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def _flight_key(backend: ChatBackend, system: str, user: str, options: dict[str, Any]) -> str:
+    return json.dumps([id(backend), settings.groq_model, system, user, options], sort_keys=True, default=str)
+
+
+def chat_completion(system: str, user: str, **options: Any) -> str | None:
+    """One system + user turn with GROQ_MODEL; options (response_format, timeout, ...) go to the backend."""
+    backend = get_llm_backend()
+    return llm_flight.do(
+        _flight_key(backend, system, user, options),
+        lambda: backend.complete(_messages(system, user), model=settings.groq_model, **options),
+    )
+
+
+async def chat_completion_async(system: str, user: str, **options: Any) -> str | None:
+    """Async counterpart of chat_completion()."""
+    backend = get_llm_backend()
+    return await llm_flight.do_async(
+        _flight_key(backend, system, user, options),
+        lambda: backend.complete_async(_messages(system, user), model=settings.groq_model, **options),
+    )
+
+
+def chat_completion_stream(system: str, user: str, **options: Any) -> AsyncIterator[str]:
+    """Like chat_completion_async(), but yields the answer in pieces as they are generated."""
+    backend = get_llm_backend()
+    return llm_flight.stream_async(
+        _flight_key(backend, system, user, options),
+        lambda: backend.stream_async(_messages(system, user), model=settings.groq_model, **options),
+    )
+
+
+async def close_llm_clients() -> None:
+    """Close pooled LLM connections (called from the app lifespan on shutdown)."""
+    global _backend, _backend_identity
+    with _lock:
+        backends = [b for b in (_backend, *_retired) if b is not None]
+        _backend = None
+        _backend_identity = None
+        _retired.clear()
+    for backend in backends:
+        backend.close()
+        await backend.aclose()
+
+
+def llm_stats() -> dict[str, Any]:
+    return {"base_url": settings.llm_base_url, "model": settings.groq_model, **_policy.stats()}
@@ -0,0 +1,370 @@
+"""
+Markdown -> Jira ADF (Atlassian Document Format), for comments, descriptions and sub-tasks posted to Jira.
+
+One pass over the lines with a stack of open lists (indentation decides nesting); inline tokens are only tried
+where one can start, with str scans for the common ones and a compiled pattern for the rest. Covers what LLM answers use: headings, paragraphs
+(single newlines become hard breaks), bold/italic/strike, inline code, links, nested bullet/ordered lists,
+fenced code, blockquotes, pipe tables and rules. Output renders back to the same Markdown through
+adf_markdown.adf_to_markdown.
+"""
+import re
+from typing import Any
+
+_FENCE = re.compile(r"(`{3,}|~{3,})\s*([^`\s]*)")
+_HEADING = re.compile(r"(#{1,6})\s+(.*)")
+_RULE = re.compile(r"(?:-[ \t]*){3,}$|(?:\*[ \t]*){3,}$|(?:_[ \t]*){3,}$")
+_MARKER = re.compile(r"([-*+]|(\d{1,9})[.)])(?:[ \t]+(.*))?$")
+_TABLE_SEP = re.compile(r"\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?$")
+_CELL_SPLIT = re.compile(r"(?<!\\)\|")
+
+# Inline tokens that start with `, [, < or _, in priority order; text between tokens is plain. Emphasis and
+# strike runs (*, ~), single-backtick code and backslash escapes are scanned with str methods in _inline instead:
+# they are most of the tokens in generated Markdown, and as lazy patterns they cost far more than the scan.
+_INLINE = re.compile(
+    r"(?P<tick>`+)(?P<code>.+?)(?P=tick)"
+    r"|\[(?P<label>[^\]]*)\]\((?P<href><[^>]*>|[^)\s]*)(?:\s+\"[^\"]*\")?\)"
+    r"|<(?P<url>https?://[^>\s]+)>"
+    r"|(?<!\w)__(?P<under>\S(?:.*?\S)?)__(?!\w)"
+    r"|(?<!\w)_(?P<em_under>[^_\s](?:[^_]*?[^_\s])?)_(?!\w)"
+    r"|(?P<br><br\s*/?>)"
+)
+_SPECIAL = "`[<*_~\\"  # characters that can start an inline token
+_ESCAPABLE = frozenset("\\`*_{}[]()#+-.!|~>")
+_MARKER_START = frozenset("-*+0123456789")
+
+_STRONG = {"type": "strong"}
+_EM = {"type": "em"}
+_STRIKE = {"type": "strike"}
+_CODE = {"type": "code"}
+_HARD_BREAK = {"type": "hardBreak"}
+
+
+def _text(text: str, marks: tuple) -> dict[str, Any]:
+    if marks:
+        return {"type": "text", "text": text, "marks": list(marks)}
+    return {"type": "text", "text": text}
+
+
+def _with(marks: tuple, mark: dict[str, Any]) -> tuple:
+    return marks if mark in marks else marks + (mark,)
+
+
+def _code(code: str, marks: tuple) -> list[dict[str, Any]]:
+    if len(code) > 2 and code[0] == " " and code[-1] == " ":
+        code = code[1:-1]
+    # ADF only allows the code mark together with a link
+    return [_text(code, (_CODE,) + tuple(mk for mk in marks if mk["type"] == "link") if marks else (_CODE,))]
+
+
+def _closing(s: str, first: int, delim: str) -> int:
+    """
+    Where the text opened by delim just before first closes, as \\S(?:.*?\\S)? followed by delim would match it
+    (the optional group is greedy, so a longer text wins over a single character); -1 if it does not.
+    """
+    if first >= len(s) or s[first].isspace():
+        return -1
+    j = s.find(delim, first + 2)
+    while j > 0 and s[j - 1].isspace():
+        j = s.find(delim, j + 1)
+    if j > 0 and s.find("\n", first, j) < 0:
+        return j
+    return first + 1 if s.startswith(delim, first + 1) else -1
+
+
+def _delimited(s: str, pos: int, marks: tuple) -> tuple[int, list[dict[str, Any]]] | None:
+    """***strong em***, **strong**, *em* or ~~strike~~ at pos: (end, nodes), or None when it is plain text."""
+    if s[pos] == "~":
+        j = _closing(s, pos + 2, "~~") if s.startswith("~~", pos) else -1
+        return None if j < 0 else (j + 2, _inline(s[pos + 2 : j], _with(marks, _STRIKE)))
+    if s.startswith("***", pos):
+        j = _closing(s, pos + 3, "***")
+        if j >= 0:
+            return j + 3, _inline(s[pos + 3 : j], _with(_with(marks, _STRONG), _EM))
+    if s.startswith("**", pos):
+        j = _closing(s, pos + 2, "**")
+        if j >= 0:
+            return j + 2, _inline(s[pos + 2 : j], _with(marks, _STRONG))
+    # *em* cannot hold a "*", so it ends right before the next one
+    j = s.find("*", pos + 1)
+    if j <= pos + 1 or s[pos + 1].isspace() or s[j - 1].isspace():
+        return None
+    return j + 1, _inline(s[pos + 1 : j], _with(marks, _EM))
+
+
+def _token(s: str, pos: int, marks: tuple) -> tuple[int, list[dict[str, Any]]] | None:
+    """Any other inline token at pos: (end, nodes nested inside the given marks), or None when it is plain text."""
+    if s[pos] == "`" and s[pos + 1 : pos + 2] != "`":
+        j = s.find("`", pos + 2)
+        if j < 0 or s.find("\n", pos, j) >= 0:
+            return None
+        return j + 1, _code(s[pos + 1 : j], marks)
+    m = _INLINE.match(s, pos)
+    if m is None:
+        return None
+    kind = m.lastgroup
+    if kind == "code":
+        return m.end(), _code(m.group("code"), marks)
+    if kind == "href":
+        href = m.group("href").strip("<>")
+        return m.end(), _inline(m.group("label") or href, marks + ({"type": "link", "attrs": {"href": href}},))
+    if kind == "url":
+        url = m.group("url")
+        return m.end(), [_text(url, marks + ({"type": "link", "attrs": {"href": url}},))]
+    if kind == "under":
+        return m.end(), _inline(m.group("under"), _with(marks, _STRONG))
+    if kind == "br":
+        return m.end(), [_HARD_BREAK]
+    return m.end(), _inline(m.group("em_under"), _with(marks, _EM))
+
+
+def _inline(s: str, marks: tuple = ()) -> list[dict[str, Any]]:
+    """Inline Markdown -> ADF text/hardBreak nodes. Never produces empty text nodes (Jira rejects them)."""
+    # str.find per character beats a regex character-class scan by several times on long lines
+    present = [ch for ch in _SPECIAL if ch in s]
+    if not present:
+        if not s:
+            return []
+        return [{"type": "text", "text": s, "marks": list(marks)} if marks else {"type": "text", "text": s}]
+    # Only at a special character can a token start
+    starts: list[int] = []
+    at = s.find
+    for ch in present:
+        k = at(ch)
+        while k >= 0:
+            starts.append(k)
+            k = at(ch, k + 1)
+    if len(present) > 1:
+        starts.sort()
+    nodes: list[dict[str, Any]] = []
+    plain = ""  # text before pos not emitted yet, escapes resolved
+    pos = 0
+    for start in starts:
+        if start < pos:
+            continue  # inside the token just taken
+        c = s[start]
+        if c == "\\":
+            if s[start + 1 : start + 2] in _ESCAPABLE:
+                plain += s[pos:start] + s[start + 1]
+                pos = start + 2
+            continue
+        found = _delimited(s, start, marks) if c == "*" or c == "~" else _token(s, start, marks)
+        if found is None:
+            continue
+        plain += s[pos:start]
+        if plain:
+            nodes.append(_text(plain, marks))
+            plain = ""
+        pos, inner = found
+        nodes.extend(inner)
+    plain += s[pos:]
+    if plain:
+        nodes.append(_text(plain, marks))
+    return nodes
+
+
+def _table_cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [c.strip() for c in (_CELL_SPLIT.split(line) if "\\|" in line else line.split("|"))]
+
+
+def _table(header: str, rows: list[str]) -> dict[str, Any]:
+    head = _table_cells(header)
+    width = len(head)
+    table_rows = [
+        {
+            "type": "tableRow",
+            "content": [{"type": "tableHeader", "content": [{"type": "paragraph", "content": _inline(c)}]} for c in head],
+        }
+    ]
+    for row in rows:
+        cells = (_table_cells(row) + [""] * width)[:width]
+        table_rows.append({
+            "type": "tableRow",
+            "content": [{"type": "tableCell", "content": [{"type": "paragraph", "content": _inline(c)}]} for c in cells],
+        })
+    return {"type": "table", "attrs": {"isNumberColumnEnabled": False, "layout": "default"}, "content": table_rows}
+
+
+def _table_paragraphs(table: dict[str, Any]) -> list[dict[str, Any]]:
+    """One paragraph per table row, non-empty cells separated by ' | '."""
+    paragraphs = []
+    for row in table["content"]:
+        content: list[dict[str, Any]] = []
+        for cell in row["content"]:
+            cell_content = cell["content"][0]["content"]
+            if cell_content:
+                if content:
+                    content.append({"type": "text", "text": " | "})
+                content.extend(cell_content)
+        if content:
+            paragraphs.append({"type": "paragraph", "content": content})
+    return paragraphs
+
+
+def _nested(block: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    List items and blockquotes cannot hold headings, rules, quotes or tables (Jira rejects the document with 400):
+    flatten those to what they can hold.
+    """
+    t = block["type"]
+    if t == "heading":
+        return [{"type": "paragraph", "content": block["content"]}]
+    if t == "blockquote":
+        return block["content"]
+    if t == "table":
+        return _table_paragraphs(block)
+    if t == "rule":
+        return []
+    return [block]
+
+
+def _add_nested(container: list[dict[str, Any]], block: dict[str, Any]) -> None:
+    """
+    Append block to a list item's or blockquote's content, flattened by _nested. A list that lands right after a
+    list it would continue in Markdown joins it, since rendered they read back as one list.
+    """
+    for b in _nested(block):
+        prev = container[-1] if container else None
+        if prev is not None and b["type"] == prev["type"] and (
+            b["type"] == "bulletList"
+            or b["type"] == "orderedList"
+            and b.get("attrs", {}).get("order", 1) >= prev.get("attrs", {}).get("order", 1) + len(prev["content"]) - 1
+        ):
+            prev["content"].extend(b["content"])
+        else:
+            container.append(b)
+
+
+def _starts_block(s: str) -> bool:
+    """A line that opens a new block instead of continuing the open paragraph."""
+    c = s[0]
+    if c == "#":
+        return _HEADING.match(s) is not None
+    if c == "`" or c == "~":
+        return s.startswith("```") or s.startswith("~~~")
+    if c == ">" or c == "|":
+        return True
+    if c in _MARKER_START or c == "_":
+        return _MARKER.match(s) is not None or _RULE.match(s) is not None
+    return False
+
+
+def _blocks(lines: list[str]) -> list[dict[str, Any]]:
+    blocks: list[dict[str, Any]] = []
+    # Open lists, innermost last: [marker indent, content indent, list node, current item, last number or None]
+    lists: list[list[Any]] = []
+    para: dict[str, Any] | None = None  # open paragraph that a following non-blank line continues
+    i, n = 0, len(lines)
+    while i < n:
+        raw = lines[i]
+        i += 1
+        if "\t" in raw:
+            raw = raw.expandtabs(4)
+        s = raw.strip()
+        if not s:
+            para = None
+            continue
+        c = s[0]
+        marker = _MARKER.match(s) if c in _MARKER_START else None
+        if para is not None and marker is None and not _starts_block(s):
+            para["content"].append(_HARD_BREAK)
+            para["content"].extend(_inline(s))
+            continue
+        indent = raw.find(c)
+        if marker is not None and (c == "-" or c == "*") and not s.strip(c + " \t") and _RULE.match(s):
+            marker = None  # "- - -" is a rule, not a list
+
+        # Close lists this line is not inside of. Nested content needs the item's content indent, capped at
+        # two spaces past the marker since that is how most generated Markdown indents.
+        sibling = None
+        while lists:
+            top = lists[-1]
+            if indent >= top[1] or indent >= top[0] + 2:
+                break
+            if marker is not None and indent >= top[0]:
+                sibling = top
+                break
+            lists.pop()
+        number = int(marker.group(2)) if marker is not None and marker.group(2) is not None else None
+        if sibling is not None and (
+            (number is None) != (sibling[4] is None) or (number is not None and number < sibling[4])
+        ):
+            # Another list type, or numbering starts over: a new list
+            lists.pop()
+            sibling = None
+        container = lists[-1][3]["content"] if lists else blocks
+        nested = container is not blocks
+
+        if marker is not None:
+            if sibling is None:
+                node: dict[str, Any] = {"type": "bulletList" if number is None else "orderedList", "content": []}
+                if number is not None and number != 1:
+                    node["attrs"] = {"order": number}
+                container.append(node)
+                sibling = [indent, 0, node, None, number]
+                lists.append(sibling)
+            body = marker.group(3)
+            para = {"type": "paragraph", "content": _inline(body) if body else []}
+            item = {"type": "listItem", "content": [para]}
+            sibling[2]["content"].append(item)
+            sibling[0] = indent
+            sibling[1] = indent + (marker.start(3) if body is not None else len(marker.group(1)) + 1)
+            sibling[3] = item
+            sibling[4] = number
+            continue
+
+        para = None
+        fence = _FENCE.match(s) if c == "`" or c == "~" else None
+        heading = _HEADING.match(s) if c == "#" else None
+        if fence:
+            ticks = fence.group(1)
+            end = i
+            while end < n and not lines[end].lstrip().startswith(ticks):
+                end += 1
+            code = lines[i:end]
+            if indent:
+                code = [line[min(indent, len(line) - len(line.lstrip())) :] for line in code]
+            i = end + 1  # past the closing fence
+            block = {"type": "codeBlock", "attrs": {"language": fence.group(2) or "plain"}}
+            block["content"] = [{"type": "text", "text": "\n".join(code)}] if any(code) else []
+        elif heading:
+            block = {"type": "heading", "attrs": {"level": len(heading.group(1))}, "content": _inline(heading.group(2))}
+        elif c == ">":
+            quoted = [s]
+            while i < n and lines[i].lstrip().startswith(">"):
+                quoted.append(lines[i].lstrip())
+                i += 1
+            inner = _blocks([q[2:] if q.startswith("> ") else q[1:] for q in quoted])
+            block = {"type": "blockquote", "content": []}
+            for q in inner:
+                _add_nested(block["content"], q)
+            if not block["content"]:
+                continue  # only blank lines or rules: ADF rejects an empty blockquote
+        elif c == "|" and i < n and "|" in lines[i] and _TABLE_SEP.match(lines[i].strip()):
+            i += 1
+            rows = []
+            while i < n and lines[i].lstrip().startswith("|"):
+                rows.append(lines[i])
+                i += 1
+            block = _table(s, rows)
+        elif c in "-*_" and _RULE.match(s):
+            block = {"type": "rule"}
+        else:
+            para = block = {"type": "paragraph", "content": _inline(s)}
+        if nested:
+            _add_nested(container, block)
+        else:
+            container.append(block)
+    return blocks
+
+
+def markdown_to_adf(text: str) -> dict[str, Any]:
+    """Convert Markdown text to an ADF document."""
+    blocks = _blocks((text or "").split("\n"))
+    if not blocks:
+        blocks = [{"type": "paragraph", "content": [{"type": "text", "text": "(No content)"}]}]
+    return {"type": "doc", "version": 1, "content": blocks}
@@ -1,5 +1,6 @@
 """MCP client: connect to a server and call a tool with ticket data for solution."""
 import os
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
@@ -8,13 +9,17 @@ from mcp.client.stdio import stdio_client
 
 from app.config import settings
 from app.models import TicketDetail
-from app.services.jira_service import ticket_to_context_string
+from app.services.prompt_builder import build_prompt_parts
 
 # Project root (parent of app/) so relative paths in MCP args resolve when running the API.
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
+# progress, total, message: the tool's progress notifications while it runs
+ProgressCallback = Callable[[float, float | None, str | None], Awaitable[None]]
 
-def _get_server_config(mcp_server_key: str | None):
+
+def get_server_config(mcp_server_key: str | None):
+    """Config of the given MCP server (default: DEFAULT_MCP_SERVER_KEY); ValueError if there is none."""
     servers = {s.key: s for s in settings.get_mcp_servers()}
     if not servers:
         raise ValueError(
@@ -50,14 +55,15 @@ async def call_mcp_solution(
     tool_name: str | None = None,
     question: str | None = None,
     extra_tool_args: dict[str, Any] | None = None,
+    on_progress: ProgressCallback | None = None,
 ) -> str:
     """
     Connect to the configured MCP server, call the solution tool with ticket data (and optional question),
-    return the tool's text response.
+    return the tool's text response. on_progress receives the tool's progress notifications, if it sends any.
     """
-    cfg = _get_server_config(mcp_server_key)
+    cfg = get_server_config(mcp_server_key)
     name = tool_name or cfg.solution_tool_name
-    ticket_context = ticket_to_context_string(ticket)
+    ticket_context = build_prompt_parts(ticket).context
     args: dict[str, Any] = {
         "ticket_data": ticket_context,
         "question": question or "Provide a solution or recommendations for this ticket.",
@@ -76,5 +82,8 @@ async def call_mcp_solution(
     async with stdio_client(server_params) as (read_stream, write_stream):
         session = ClientSession(read_stream, write_stream)
         await session.initialize()
-        result = await session.call_tool(name, args)
+        if on_progress is None:
+            result = await session.call_tool(name, args)
+        else:
+            result = await session.call_tool(name, args, progress_callback=on_progress)
         return _extract_text_from_result(result)
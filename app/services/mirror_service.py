@@ -0,0 +1,264 @@
+"""
+Optional local SQLite mirror of Jira projects (JIRA_MIRROR_PROJECTS).
+
+Rows hold the TicketDetail that extract_detail produced (description already converted to Markdown), so reads
+from the mirror skip both the Jira round trip and the ADF conversion. A read is served from the mirror only
+when the project's last successful sync is within the caller's staleness bound; otherwise it goes to Jira.
+Writes made through this API mark the affected row stale so single-ticket reads go live until the next sync.
+"""
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from app.config import settings
+from app.models import TicketDetail, TicketSummary
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    key_num INTEGER NOT NULL,
+    created TEXT,
+    updated TEXT,
+    detail TEXT NOT NULL,
+    stale INTEGER NOT NULL DEFAULT 0,
+    synced REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_project_created ON issues (project, created);
+CREATE INDEX IF NOT EXISTS issues_project_updated ON issues (project, updated);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    last_started REAL NOT NULL,
+    last_success REAL NOT NULL,
+    last_backfill REAL NOT NULL,
+    issue_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# JQL the mirror can answer itself: one or more projects, optionally ordered by created/updated/key.
+_MIRROR_JQL_RE = re.compile(
+    r"""^\s*project\s*(?:=\s*(?P<one>"?[A-Za-z][A-Za-z0-9_]*"?)|in\s*\((?P<many>[^)]*)\))\s*
+    (?:order\s+by\s+(?P<field>created|updated|key)(?:\s+(?P<dir>asc|desc))?)?\s*$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_ORDER_BY = {
+    "created": "created {dir}, key_num {dir}",
+    "updated": "updated {dir}, key_num {dir}",
+    "key": "project {dir}, key_num {dir}",
+}
+
+
+def mirror_projects() -> list[str]:
+    """Project keys configured for mirroring (JIRA_MIRROR_PROJECTS, comma-separated)."""
+    return [p.strip().upper() for p in settings.jira_mirror_projects.split(",") if p.strip()]
+
+
+def parse_mirror_jql(jql: str) -> tuple[list[str], str] | None:
+    """(projects, ORDER BY clause) for JQL the mirror can answer, else None."""
+    m = _MIRROR_JQL_RE.match(jql or "")
+    if not m:
+        return None
+    raw = [m.group("one")] if m.group("one") else m.group("many").split(",")
+    projects = [p.strip().strip('"').upper() for p in raw if p.strip().strip('"')]
+    if not projects:
+        return None
+    direction = (m.group("dir") or ("asc" if m.group("field") else "desc")).upper()
+    return projects, _ORDER_BY[(m.group("field") or "created").lower()].format(dir=direction)
+
+
+def _split_key(key: str) -> tuple[str, int]:
+    project, _, num = key.upper().rpartition("-")
+    return project, int(num) if num.isdigit() else 0
+
+
+class JiraMirror:
+    """SQLite store behind the mirror. One connection per thread; WAL so reads never wait on a sync."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards _stats: reads come from many threads
+        self._stats = {"reads": 0, "fallbacks": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def _site() -> str:
+        return settings.jira_url.rstrip("/")
+
+    # --- reads ---
+
+    def age(self, project: str) -> float | None:
+        """Seconds since the project's last successful sync against the current site, None if never synced."""
+        row = self._conn().execute(
+            "SELECT last_success FROM sync_state WHERE project = ? AND site = ?", (project.upper(), self._site())
+        ).fetchone()
+        return None if row is None else max(0.0, time.time() - row[0])
+
+    def covers(self, projects: Iterable[str], max_staleness: float) -> bool:
+        """True if every project is mirrored and was synced within max_staleness seconds."""
+        mirrored = set(mirror_projects())
+        for project in projects:
+            age = self.age(project) if project in mirrored else None
+            if age is None or age > max_staleness:
+                self._count("fallbacks")
+                return False
+        return True
+
+    def get(self, key: str) -> TicketDetail | None:
+        """Mirrored ticket, or None if absent or marked stale by a write."""
+        row = self._conn().execute("SELECT detail FROM issues WHERE key = ? AND stale = 0", (key.upper(),)).fetchone()
+        if row is None:
+            return None
+        self._count("reads")
+        detail = TicketDetail.model_validate_json(row[0])
+        return detail.model_copy(update={"raw": None}) if detail.raw else detail  # rows written before raw was dropped
+
+    def list(self, projects: list[str], order: str, limit: int, offset: int) -> tuple[list[TicketSummary], bool]:
+        """One page of summaries for the projects; the bool says whether more rows follow."""
+        marks = ",".join("?" * len(projects))
+        rows = self._conn().execute(
+            f"SELECT detail FROM issues WHERE project IN ({marks}) ORDER BY {order} LIMIT ? OFFSET ?",
+            (*projects, limit + 1, offset),
+        ).fetchall()
+        self._count("reads")
+        out = []
+        for (raw,) in rows[:limit]:
+            d = TicketDetail.model_validate_json(raw)
+            out.append(TicketSummary(key=d.key, summary=d.summary, status=d.status, issue_type=d.issue_type, assignee=d.assignee))
+        return out, len(rows) > limit
+
+    # --- writes (sync engine and write-through) ---
+
+    def upsert(self, details: Iterable[TicketDetail]) -> int:
+        rows = []
+        for d in details:
+            project, num = _split_key(d.key)
+            rows.append((d.key.upper(), project, num, d.created, d.updated, d.model_dump_json(exclude={"raw"}), time.time()))
+        if rows:
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO issues (key, project, key_num, created, updated, detail, stale, synced) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET project = excluded.project, key_num = excluded.key_num, "
+                    "created = excluded.created, updated = excluded.updated, detail = excluded.detail, stale = 0, "
+                    "synced = excluded.synced",
+                    rows,
+                )
+        return len(rows)
+
+    def delete(self, key: str) -> None:
+        with self._conn() as conn:
+            conn.execute("DELETE FROM issues WHERE key = ?", (key.upper(),))
+
+    def mark_stale(self, key: str) -> None:
+        with self._conn() as conn:
+            conn.execute("UPDATE issues SET stale = 1 WHERE key = ?", (key.upper(),))
+
+    def last_sync(self, project: str) -> tuple[float, float] | None:
+        """(start of last successful sync, start of last backfill) for the current site, None if never synced."""
+        row = self._conn().execute(
+            "SELECT last_started, last_backfill FROM sync_state WHERE project = ? AND site = ?",
+            (project.upper(), self._site()),
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def prune(self, project: str, before: float) -> int:
+        """After a backfill: drop rows it did not see (deleted or moved issues, or rows from another site)."""
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM issues WHERE project = ? AND synced < ?", (project.upper(), before)).rowcount
+
+    def record_sync(self, project: str, started: float, backfill: float) -> None:
+        project = project.upper()
+        with self._conn() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM issues WHERE project = ?", (project,)).fetchone()
+            conn.execute(
+                "INSERT INTO sync_state (project, site, last_started, last_success, last_backfill, issue_count) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(project) DO UPDATE SET site = excluded.site, last_started = excluded.last_started, "
+                "last_success = excluded.last_success, last_backfill = excluded.last_backfill, "
+                "issue_count = excluded.issue_count",
+                (project, self._site(), started, time.time(), backfill, count),
+            )
+
+    def stats(self) -> dict:
+        projects = {}
+        for project in mirror_projects():
+            row = self._conn().execute(
+                "SELECT last_success, issue_count FROM sync_state WHERE project = ? AND site = ?", (project, self._site())
+            ).fetchone()
+            projects[project] = (
+                {"synced": False} if row is None
+                else {"synced": True, "age_seconds": round(time.time() - row[0], 1), "issues": row[1]}
+            )
+        with self._lock:
+            return {**self._stats, "projects": projects}
+
+
+jira_mirror = JiraMirror(settings.jira_mirror_db_path)
+
+
+def mirror_enabled() -> bool:
+    return bool(mirror_projects())
+
+
+def _staleness(max_staleness: float | None) -> float:
+    return settings.jira_mirror_max_staleness_seconds if max_staleness is None else max_staleness
+
+
+def mirrored_ticket(ticket_id: str, max_staleness: float | None = None) -> TicketDetail | None:
+    """Ticket from the mirror if its project is mirrored and synced within the staleness bound, else None."""
+    if not mirror_enabled() or _staleness(max_staleness) <= 0:
+        return None
+    project, _ = _split_key(ticket_id)
+    if not jira_mirror.covers([project], _staleness(max_staleness)):
+        return None
+    return jira_mirror.get(ticket_id)
+
+
+def mirrored_page(
+    jql: str, max_results: int, offset: int, max_staleness: float | None = None
+) -> tuple[list[TicketSummary], bool] | None:
+    """One page of search results from the mirror, or None if the JQL/projects/staleness rule it out."""
+    if not mirror_enabled() or _staleness(max_staleness) <= 0:
+        return None
+    parsed = parse_mirror_jql(jql)
+    if parsed is None:
+        return None
+    projects, order = parsed
+    if not jira_mirror.covers(projects, _staleness(max_staleness)):
+        return None
+    return jira_mirror.list(projects, order, max_results, offset)
+
+
+def mark_mirrored_ticket_stale(ticket_id: str) -> None:
+    """Called after writes through this API so the row is re-read from Jira until the next sync."""
+    if mirror_enabled():
+        jira_mirror.mark_stale(ticket_id)
+
+
+def forget_mirrored_ticket(ticket_id: str) -> None:
+    """The issue was deleted in Jira (webhook)."""
+    if mirror_enabled():
+        jira_mirror.delete(ticket_id)
+
+
+def store_mirrored_ticket(detail: TicketDetail) -> None:
+    """Write-through for tickets fetched live whose project is mirrored."""
+    if mirror_enabled() and _split_key(detail.key)[0] in mirror_projects():
+        jira_mirror.upsert([detail])
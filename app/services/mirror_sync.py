@@ -0,0 +1,98 @@
+"""
+Sync engine for the SQLite mirror: backfill each project once, then pull only what changed.
+
+Incremental pulls use a relative JQL window (updated >= "-Nm") reaching back to the start of the previous
+successful sync plus a minute of overlap, which sidesteps the Jira user's timezone and JQL's minute precision.
+Deleted issues are not seen by incremental pulls; the periodic full backfill (JIRA_MIRROR_RESYNC_HOURS) prunes them.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from app.config import settings
+from app.services.jira_governor import LANE_BULK, jira_lane
+from app.services.jira_search import iter_issues
+from app.services.jira_common import DETAIL_FIELDS, extract_detail
+from app.services.mirror_service import jira_mirror, mirror_projects
+from app.services.search_index import index_tickets
+
+logger = logging.getLogger(__name__)
+
+_SYNC_BATCH = 100  # rows written per SQLite transaction
+_stopping = threading.Event()  # set on shutdown: the sync thread stops after its current batch
+
+
+def _project_jql(project: str, since: float | None) -> str:
+    jql = f'project = "{project}"'
+    if since is not None:
+        minutes = math.ceil((time.time() - since) / 60) + 1
+        jql += f' AND updated >= "-{minutes}m"'
+    return jql + " ORDER BY updated ASC"
+
+
+def sync_project(project: str) -> int:
+    """Backfill (first run, or when a full resync is due) or incrementally update one project. Returns rows written."""
+    if not settings.jira_configured:
+        raise ValueError("Jira is not configured")
+    started = time.time()
+    last = jira_mirror.last_sync(project)
+    full_every = settings.jira_mirror_resync_hours * 3600
+    if last is None or (full_every > 0 and started - last[1] > full_every):
+        since, backfill = None, started
+    else:
+        since, backfill = last
+    written = 0
+    batch = []
+    for issue in iter_issues(_project_jql(project, since), 100, DETAIL_FIELDS):
+        if isinstance(issue, dict):
+            batch.append(extract_detail(issue))
+        if len(batch) >= _SYNC_BATCH:
+            written += jira_mirror.upsert(batch)
+            index_tickets(batch)
+            batch = []
+            if _stopping.is_set():
+                return written  # not recorded as synced: the next run picks up from the last recorded sync
+    written += jira_mirror.upsert(batch)
+    index_tickets(batch)
+    if since is None:
+        jira_mirror.prune(project, before=started)
+    jira_mirror.record_sync(project, started, backfill)
+    logger.info(
+        "Jira mirror: %s %s, %d issues written in %.1fs",
+        "backfilled" if since is None else "synced", project, written, time.time() - started,
+    )
+    return written
+
+
+def sync_all() -> dict[str, int]:
+    """Sync every configured project; a failing project is logged and retried on the next round."""
+    out = {}
+    with jira_lane(LANE_BULK):  # interactive reads go first
+        for project in mirror_projects():
+            if _stopping.is_set():
+                break
+            try:
+                out[project] = sync_project(project)
+            except Exception as e:
+                logger.warning("Jira mirror: sync of %s failed: %s", project, e)
+    return out
+
+
+async def run_mirror_sync() -> None:
+    """
+    Background loop started from the app lifespan when JIRA_MIRROR_PROJECTS is set. When cancelled, it waits for
+    the sync thread to stop (after its current batch) so shutdown does not close the HTTP clients under it.
+    """
+    _stopping.clear()
+    while True:
+        if settings.jira_configured:
+            sync = asyncio.ensure_future(asyncio.to_thread(sync_all))
+            try:
+                await asyncio.shield(sync)
+            except asyncio.CancelledError:
+                _stopping.set()
+                await sync
+                raise
+        await asyncio.sleep(max(5.0, settings.jira_mirror_sync_interval_seconds))
@@ -0,0 +1,266 @@
+"""
+Token-budgeted prompt sections for LLM calls: ticket metadata, description, solution and repo hints.
+
+ticket_to_context_string() pastes the whole description into every prompt, and code generation adds the whole
+solution on top; long specs then cost more input tokens and prefill time than the answer. build_prompt_parts()
+gives each section a budget instead (PROMPT_DESCRIPTION_TOKENS, PROMPT_SOLUTION_TOKENS, PROMPT_REPO_HINTS_TOKENS):
+
+- Metadata (key, summary, type, status, ...) is always kept whole.
+- Markdown is compacted first without losing content: trailing spaces, runs of blank lines and table rule
+  padding go, and images are reduced to their alt text.
+- A section over its budget keeps its head and tail blocks (objective and acceptance criteria usually sit at
+  the ends) with a marker saying how much was left out. Budget a section does not need goes to the others, and
+  when PROMPT_MAX_TOKENS is exceeded the lowest-priority sections shrink first: repo hints, then the solution,
+  then the description. PROMPT_MAX_TOKENS=0 sends every section whole, as before.
+
+Tokens are counted with tiktoken when it is installed (pip install tiktoken; the GROQ_MODEL encoding if tiktoken
+knows it, else cl100k_base), otherwise estimated from word and punctuation pieces. Compaction, counting and
+fitting are memoized by content, so one ticket revision is prepared once however many prompts use it.
+"""
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.config import settings
+from app.models import TicketDetail
+
+try:
+    import tiktoken
+except ImportError:  # optional: pip install tiktoken
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Section priorities: lower is cut last
+_PRIORITY = {"description": 1, "solution": 2, "repo_hints": 3}
+_TAIL_SHARE = 0.25  # of a truncated section's budget, spent on its last blocks
+_MEMO_SIZE = 512
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_TABLE_RULE_RE = re.compile(r"^\|?(?:\s*:?-{3,}:?\s*\|)+\s*:?-*:?\s*\|?$", re.MULTILINE)
+_RULE_CELL_RE = re.compile(r"[ \t:]*-+[ \t:]*")
+_FENCED_BLOCK_RE = re.compile(r"(^(?:```|~~~)[\s\S]*?^(?:```|~~~)[ \t]*$)", re.MULTILINE)
+
+_lock = threading.Lock()
+_stats = {"sections_truncated": 0, "tokens_cut": 0}
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def tokenizer_name() -> str:
+    return f"tiktoken:{_encoding(settings.groq_model).name}" if tiktoken is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text for GROQ_MODEL (tiktoken), or an estimate: one per punctuation mark, ~6 word chars each."""
+    return _count(text, settings.groq_model) if text else 0
+
+
+@lru_cache(maxsize=_MEMO_SIZE * 4)
+def _count(text: str, model: str) -> int:
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return sum((len(piece) + 5) // 6 for piece in _PIECE_RE.findall(text))
+
+
+def _cut(text: str, budget: int, *, from_end: bool = False) -> str:
+    """The first (or last) ~budget tokens of one block."""
+    if budget <= 0:
+        return ""
+    if tiktoken is not None:
+        enc = _encoding(settings.groq_model)
+        tokens = enc.encode(text, disallowed_special=())
+        return enc.decode(tokens[-budget:] if from_end else tokens[:budget])
+    chars = max(1, len(text) * budget // max(1, count_tokens(text)))
+    return text[-chars:] if from_end else text[:chars]
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def compact_markdown(text: str) -> str:
+    """Drop what costs tokens but carries no content; code blocks are left as they are."""
+    if not text:
+        return ""
+    parts = _FENCED_BLOCK_RE.split(text)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:  # odd parts are fenced code blocks
+            part = _IMAGE_RE.sub(lambda m: f"[image: {m.group(1)}]" if m.group(1) else "", part)
+            part = _TABLE_RULE_RE.sub(lambda m: _RULE_CELL_RE.sub("---", m.group(0)), part)
+            part = _TRAILING_SPACE_RE.sub("", part)
+            part = _BLANK_LINES_RE.sub("\n\n", part)
+        out.append(part)
+    return "".join(out).strip()
+
+
+def fit_text(text: str, budget: int, label: str = "text") -> str:
+    """text within ~budget tokens: whole if it fits, else its first and last blocks around an omission marker."""
+    fitted, tokens_cut = _fit(text, budget, label, settings.groq_model)
+    if tokens_cut is not None:
+        _note_cut(tokens_cut)  # here, not in _fit, so memo hits are counted too
+    return fitted
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _fit(text: str, budget: int, label: str, model: str) -> tuple[str, int | None]:
+    """(fitted text, tokens left out, or None when it fits whole)."""
+    total = count_tokens(text)
+    if total <= budget:
+        return text, None
+    marker_budget = 16
+    if budget <= marker_budget:
+        return "", total
+    blocks = text.split("\n\n")
+    head_budget = int((budget - marker_budget) * (1 - _TAIL_SHARE))
+    tail_budget = budget - marker_budget - head_budget
+    head: list[str] = []
+    used = 0
+    for block in blocks:
+        n = count_tokens(block) + 1
+        if used + n > head_budget:
+            if not head:
+                head.append(_cut(block, head_budget))  # one huge first block: keep its beginning
+            break
+        head.append(block)
+        used += n
+    tail: list[str] = []
+    used = 0
+    for block in reversed(blocks[len(head):]):
+        n = count_tokens(block) + 1
+        if used + n > tail_budget:
+            break
+        tail.insert(0, block)
+        used += n
+    kept = count_tokens("\n\n".join(head + tail))
+    marker = f"[... {label} shortened: about {total - kept} of {total} tokens left out ...]"
+    return "\n\n".join([*head, marker, *tail]), total - kept
+
+
+def _note_cut(tokens: int) -> None:
+    with _lock:
+        _stats["sections_truncated"] += 1
+        _stats["tokens_cut"] += max(0, tokens)
+
+
+def fit_items(items: list[str], budget: int) -> str:
+    """Comma-separated items while they fit the budget, then '(+N more)'; '' when not even one fits."""
+    out: list[str] = []
+    used = 0
+    for i, item in enumerate(items):
+        n = count_tokens(item) + 1
+        if used + n > budget:
+            return ", ".join(out) + f" (+{len(items) - i} more)" if out else ""
+        out.append(item)
+        used += n
+    return ", ".join(out)
+
+
+def allocate(needs: dict[str, int], budgets: dict[str, int], total: int) -> dict[str, int]:
+    """
+    Tokens per section: each gets what it needs up to its budget; budget left unused goes to sections that need
+    more (highest priority first); over the total, the lowest-priority sections give back first.
+    """
+    grant = {name: min(needs[name], budgets[name]) for name in needs}
+    order = sorted(needs, key=lambda name: _PRIORITY[name])
+    spare = total - sum(grant.values())
+    for name in order:
+        if spare <= 0:
+            break
+        extra = min(spare, needs[name] - grant[name])
+        grant[name] += extra
+        spare -= extra
+    for name in reversed(order):
+        if spare >= 0:
+            break
+        give_back = min(grant[name], -spare)
+        grant[name] -= give_back
+        spare += give_back
+    return grant
+
+
+@dataclass
+class PromptParts:
+    context: str  # ticket metadata + description, laid out like ticket_to_context_string()
+    solution: str = ""
+    repo_hints: str = ""  # comma-separated paths; '' when none were given
+    tokens: dict[str, int] = field(default_factory=dict)  # per section, as sent
+
+
+def _metadata(ticket: TicketDetail) -> tuple[list[str], list[str]]:
+    before = [
+        f"Key: {ticket.key}",
+        f"Summary: {ticket.summary}",
+        f"Type: {ticket.issue_type or 'N/A'}",
+        f"Status: {ticket.status or 'N/A'}",
+        f"Assignee: {ticket.assignee or 'Unassigned'}",
+        f"Project: {ticket.project or 'N/A'}",
+    ]
+    after = []
+    if ticket.created:
+        after.append(f"Created: {ticket.created}")
+    if ticket.updated:
+        after.append(f"Updated: {ticket.updated}")
+    return before, after
+
+
+def build_prompt_parts(
+    ticket: TicketDetail, *, solution: str | None = None, repo_files: list[str] | None = None
+) -> PromptParts:
+    """Ticket context (and solution / repo hints, when given) fitted to the PROMPT_* token budgets."""
+    before, after = _metadata(ticket)
+    metadata_tokens = count_tokens("\n".join(before + after))
+    texts = {"description": compact_markdown(ticket.description or "")}
+    if solution is not None:
+        texts["solution"] = compact_markdown(solution)
+    needs = {name: count_tokens(text) for name, text in texts.items()}
+    if repo_files:
+        needs["repo_hints"] = count_tokens(", ".join(repo_files))
+    budgets = {
+        "description": settings.prompt_description_tokens,
+        "solution": settings.prompt_solution_tokens,
+        "repo_hints": settings.prompt_repo_hints_tokens,
+    }
+    if settings.prompt_max_tokens > 0:
+        grant = allocate(needs, budgets, max(0, settings.prompt_max_tokens - metadata_tokens))
+    else:
+        grant = dict(needs)
+
+    fitted = {name: fit_text(text, grant[name], name) for name, text in texts.items()}
+    lines = list(before)
+    if fitted["description"]:
+        lines.append(f"Description: {fitted['description']}")
+    lines.extend(after)
+    parts = PromptParts(context="\n".join(lines), solution=fitted.get("solution", ""))
+    if repo_files:
+        parts.repo_hints = fit_items(repo_files, grant["repo_hints"])
+    parts.tokens = {"metadata": metadata_tokens, **{name: count_tokens(text) for name, text in fitted.items()}}
+    if repo_files:
+        parts.tokens["repo_hints"] = count_tokens(parts.repo_hints)
+    cut = {name: needs[name] for name in needs if grant[name] < needs[name]}
+    if cut:
+        logger.info("Prompt for %s fitted to budget: %s (tokens before: %s)", ticket.key, parts.tokens, cut)
+    return parts
+
+
+def prompt_builder_stats() -> dict:
+    memo = _fit.cache_info()
+    counted = _count.cache_info()
+    with _lock:
+        counters = dict(_stats)
+    return {
+        "tokenizer": tokenizer_name(),
+        **counters,
+        "fit_memo_hits": memo.hits,
+        "fit_memo_misses": memo.misses,
+        "count_memo_hits": counted.hits,
+    }
@@ -0,0 +1,199 @@
+"""
+Local full-text index (SQLite FTS5) over ticket summaries, descriptions and comments.
+
+The index is fed as a side effect of normal traffic: every ticket fetched live or by the mirror sync, and every
+comment list fetched, is (re)indexed. Searching it never calls Jira, so results only cover tickets this service
+has seen; with the mirror enabled that is every mirrored project. TICKET_SEARCH_DB_PATH='' turns it off.
+"""
+import logging
+import re
+import sqlite3
+import threading
+from typing import Iterable
+
+from app.config import settings
+from app.models import TicketDetail, TicketSearchHit
+
+logger = logging.getLogger(__name__)
+
+# docs holds one row per ticket; docs_fts is an external-content FTS5 table kept in step by triggers.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    project TEXT,
+    summary TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    comments TEXT NOT NULL DEFAULT '',
+    status TEXT,
+    issue_type TEXT,
+    assignee TEXT,
+    updated TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    key, summary, description, comments,
+    content='docs', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts (rowid, key, summary, description, comments)
+    VALUES (new.id, new.key, new.summary, new.description, new.comments);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, key, summary, description, comments)
+    VALUES ('delete', old.id, old.key, old.summary, old.description, old.comments);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, key, summary, description, comments)
+    VALUES ('delete', old.id, old.key, old.summary, old.description, old.comments);
+    INSERT INTO docs_fts (rowid, key, summary, description, comments)
+    VALUES (new.id, new.key, new.summary, new.description, new.comments);
+END;
+"""
+
+# bm25 column weights: key, summary, description, comments
+_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+_SNIPPET_TOKENS = 16
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(q: str) -> str:
+    """Free text -> FTS5 query: every word must match, the last one as a prefix (search-as-you-type)."""
+    words = _TOKEN_RE.findall(q or "")
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """FTS5 index in its own SQLite file; one connection per thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def index_tickets(self, details: Iterable[TicketDetail]) -> None:
+        """Add or refresh tickets; rows whose 'updated' did not change are left alone."""
+        rows = [
+            (d.key.upper(), d.project, d.summary or "", d.description or "", d.status, d.issue_type, d.assignee, d.updated)
+            for d in details
+        ]
+        if not self.enabled or not rows:
+            return
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO docs (key, project, summary, description, status, issue_type, assignee, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET project = excluded.project, summary = excluded.summary, "
+                "description = excluded.description, status = excluded.status, issue_type = excluded.issue_type, "
+                "assignee = excluded.assignee, updated = excluded.updated "
+                "WHERE excluded.updated IS NOT docs.updated",
+                rows,
+            )
+
+    def index_comments(self, key: str, comments: list[str]) -> None:
+        """Replace the ticket's comment text (the full list, as returned by fetch_ticket_comments)."""
+        if not self.enabled:
+            return
+        text = "\n\n".join(c for c in comments if c)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO docs (key, comments) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET comments = excluded.comments WHERE excluded.comments != docs.comments",
+                (key.upper(), text),
+            )
+
+    def append_comment(self, key: str, comment: str) -> None:
+        """A comment was added through this API: append it without re-fetching the list."""
+        if not self.enabled or not comment:
+            return
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO docs (key, comments) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET comments = "
+                "CASE WHEN docs.comments = '' THEN excluded.comments ELSE docs.comments || char(10, 10) || excluded.comments END",
+                (key.upper(), comment),
+            )
+
+    def contains(self, key: str) -> bool:
+        if not self.enabled:
+            return False
+        return self._conn().execute("SELECT 1 FROM docs WHERE key = ?", (key.upper(),)).fetchone() is not None
+
+    def remove(self, key: str) -> None:
+        if not self.enabled:
+            return
+        with self._conn() as conn:
+            conn.execute("DELETE FROM docs WHERE key = ?", (key.upper(),))
+
+    def search(self, q: str, limit: int = 20, project: str | None = None) -> list[TicketSearchHit]:
+        """Best matches first (bm25), each with a highlighted snippet from the best-matching column."""
+        match = fts_query(q)
+        if not self.enabled or not match:
+            return []
+        sql = (
+            "SELECT d.key, d.summary, d.status, d.issue_type, d.assignee, d.project, d.updated, "
+            f"bm25(docs_fts, {', '.join(map(str, _WEIGHTS))}) AS rank, "
+            f"snippet(docs_fts, -1, '**', '**', '…', {_SNIPPET_TOKENS}) "
+            "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid WHERE docs_fts MATCH ?"
+        )
+        params: list = [match]
+        if project:
+            sql += " AND d.project = ?"
+            params.append(project.upper())
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        rows = self._conn().execute(sql, params).fetchall()
+        return [
+            TicketSearchHit(
+                key=key, summary=summary, status=status, issue_type=issue_type, assignee=assignee,
+                project=project, updated=updated, score=round(-rank, 4), snippet=snippet,
+            )
+            for key, summary, status, issue_type, assignee, project, updated, rank, snippet in rows
+        ]
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM docs").fetchone()
+        return {"enabled": True, "tickets": count}
+
+
+search_index = SearchIndex(settings.ticket_search_db_path)
+
+
+def index_tickets(details: Iterable[TicketDetail]) -> None:
+    """Index tickets as a side effect of a fetch; indexing problems are logged, never raised to the caller."""
+    try:
+        search_index.index_tickets(details)
+    except sqlite3.Error as e:
+        logger.warning("Ticket search index: indexing failed: %s", e)
+
+
+def index_comments(key: str, comments: list[str]) -> None:
+    try:
+        search_index.index_comments(key, comments)
+    except sqlite3.Error as e:
+        logger.warning("Ticket search index: indexing comments of %s failed: %s", key, e)
+
+
+def append_comment(key: str, comment: str) -> None:
+    try:
+        search_index.append_comment(key, comment)
+    except sqlite3.Error as e:
+        logger.warning("Ticket search index: indexing new comment on %s failed: %s", key, e)
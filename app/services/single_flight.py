@@ -0,0 +1,191 @@
+"""
+Request coalescing ("single flight"): concurrent callers asking for the same key share one upstream call.
+
+The first caller for a key runs the call; callers that arrive while it is in flight wait for it and get the same
+result or exception instead of making their own request. Nothing is kept once the call finishes (caching is the
+job of ticket_cache, comment_cache and solution_cache). Results are shared between callers; treat them as
+read-only. Threads (sync routes in the threadpool) and coroutines are coalesced separately.
+
+- do(key, fn): for sync code.
+- do_async(key, fn): for async code. The call runs as its own task, so a caller that is cancelled (client gone)
+  does not cancel it for the others.
+- stream_async(key, fn): for async iterators (streamed LLM answers). Late joiners first get the pieces produced
+  so far, then the rest as they arrive; the upstream stream is closed when the last reader leaves.
+- forget(match): later callers for matching keys start a new call (e.g. the ticket was just written to).
+
+Keys must be hashable; callers include every argument that changes the result.
+"""
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight sync call."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class _Broadcast:
+    """One in-flight stream: the pieces so far, fanned out to every reader."""
+
+    def __init__(self) -> None:
+        self.pieces: list[Any] = []
+        self.finished = False
+        self.error: BaseException | None = None
+        self.readers = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def publish(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        # Async entries are per event loop: a future cannot be awaited from another loop
+        self._tasks: dict[tuple[int, Hashable], asyncio.Task] = {}
+        self._streams: dict[tuple[int, Hashable], _Broadcast] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+        _groups.append(self)
+
+    def _count(self, coalesced: bool) -> None:
+        # Caller holds self._lock
+        self._stats["coalesced" if coalesced else "calls"] += 1
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """fn(), or the result of an identical call already running in another thread."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(not leader)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """await fn(), or the result of an identical call already in flight on this event loop."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[loop_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda t: self._task_done(loop_key, t))
+            self._count(not leader)
+        return await asyncio.shield(task)
+
+    def stream_async(self, key: Hashable, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Iterate fn(), sharing one upstream iteration with identical concurrent streams."""
+        return self._read(key, fn)
+
+    async def _read(self, key: Hashable, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            shared = self._streams.get(loop_key)
+            leader = shared is None
+            if leader:
+                shared = self._streams[loop_key] = _Broadcast()
+                shared.task = asyncio.ensure_future(self._pump(shared, fn()))
+                shared.task.add_done_callback(lambda t: self._locked_drop(self._streams, loop_key, shared))
+            shared.readers += 1
+            self._count(not leader)
+        sent = 0
+        try:
+            while True:
+                while sent < len(shared.pieces):
+                    yield shared.pieces[sent]
+                    sent += 1
+                if shared.finished:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                await shared.wait()
+        finally:
+            with self._lock:
+                shared.readers -= 1
+                abandoned = shared.readers == 0 and not shared.finished
+                if abandoned:
+                    self._drop(self._streams, loop_key, shared)
+            if abandoned:
+                shared.task.cancel()  # nobody is listening any more: stop paying for the upstream stream
+
+    @staticmethod
+    async def _pump(shared: _Broadcast, source: AsyncIterator[Any]) -> None:
+        try:
+            async for piece in source:
+                shared.pieces.append(piece)
+                shared.publish()
+        except Exception as e:
+            shared.error = e
+        finally:
+            shared.finished = True
+            shared.publish()
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    @staticmethod
+    def _drop(entries: dict, loop_key: tuple[int, Hashable], entry: Any) -> None:
+        # Caller holds self._lock; the entry may already have been replaced after forget()
+        if entries.get(loop_key) is entry:
+            del entries[loop_key]
+
+    def _locked_drop(self, entries: dict, loop_key: tuple[int, Hashable], entry: Any) -> None:
+        with self._lock:
+            self._drop(entries, loop_key, entry)
+
+    def _task_done(self, loop_key: tuple[int, Hashable], task: asyncio.Task) -> None:
+        self._locked_drop(self._tasks, loop_key, task)
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled meanwhile
+
+    def forget(self, match: Callable[[Hashable], bool]) -> None:
+        """Calls already in flight for matching keys finish for their callers, but new callers start afresh."""
+        with self._lock:
+            for key in [k for k in self._calls if match(k)]:
+                del self._calls[key]
+            for entries in (self._tasks, self._streams):
+                for loop_key in [k for k in entries if match(k[1])]:
+                    del entries[loop_key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._tasks) + len(self._streams)
+            return {**self._stats, "in_flight": in_flight}
+
+
+_groups: list[SingleFlight] = []
+
+
+def single_flight_stats() -> dict[str, dict[str, int]]:
+    """Per group: calls made upstream, calls saved by joining one in flight ('coalesced'), and in flight now."""
+    return {group.name: group.stats() for group in _groups}
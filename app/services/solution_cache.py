@@ -0,0 +1,156 @@
+"""
+On-disk cache of LLM solutions (SQLite, SOLUTION_CACHE_DB_PATH; '' = off).
+
+Entries are content-addressed: the key is a hash of the LLM endpoint, GROQ_MODEL and the exact system and user
+prompts. The user prompt carries the ticket context (including its 'updated' timestamp) and the question, so an
+edited ticket, another question, model or prompt template is simply a different key and stale answers are never
+served; they age out instead. Entries expire after SOLUTION_CACHE_TTL_HOURS, and the least recently used ones are
+evicted beyond SOLUTION_CACHE_MAX_ENTRIES or SOLUTION_CACHE_MAX_MB. Callers choose per request whether to use the
+cache, refresh it (skip the lookup, store the new answer) or bypass it.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Literal
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CacheMode = Literal["use", "refresh", "bypass"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    ticket_key TEXT,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(model: str, system: str, user: str) -> str:
+    """Content address of one completion: LLM endpoint, model and both prompts."""
+    material = json.dumps([settings.llm_base_url, model, system, user], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SolutionCache:
+    """SQLite store behind the cache. One connection per thread; WAL so readers never wait on a writer."""
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evicted": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_entries > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    def get(self, key: str) -> str | None:
+        """The cached response, or None on a miss (expired entries are dropped)."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] >= self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count("expired")
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(self, key: str, response: str, *, model: str, ticket_key: str | None = None) -> None:
+        """Store a response, then drop expired entries and the least recently used ones over the limits."""
+        if not self.enabled or not response:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, ticket_key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((key, (ticket_key or "").upper() or None, model, response, size, now, now)),
+            )
+            expired = conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl_seconds,)).rowcount
+            # Newest first: everything past the entry limit, or once the running size passes the byte limit
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, ROW_NUMBER() OVER w AS n, SUM(size) OVER w AS total FROM responses "
+                "WINDOW w AS (ORDER BY last_used DESC, created DESC)) WHERE n > ? OR total > ?)",
+                (self.max_entries, self.max_bytes),
+            ).rowcount
+        self._count("writes")
+        if expired:
+            self._count("expired", expired)
+        if evicted:
+            self._count("evicted", evicted)
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with self._conn() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            counters = dict(self._stats)
+        return {"enabled": True, **counters, "entries": entries, "bytes": size, "max_entries": self.max_entries}
+
+
+solution_cache = SolutionCache(
+    settings.solution_cache_db_path,
+    settings.solution_cache_max_entries,
+    int(settings.solution_cache_max_mb * 1024 * 1024),
+    settings.solution_cache_ttl_hours * 3600,
+)
+
+
+def cached_solution(key: str) -> str | None:
+    """solution_cache.get() for the solution paths; cache problems are logged and count as a miss."""
+    try:
+        return solution_cache.get(key)
+    except sqlite3.Error as e:
+        logger.warning("Solution cache: lookup failed: %s", e)
+        return None
+
+
+def store_solution(key: str, response: str, *, model: str, ticket_key: str | None = None) -> None:
+    try:
+        solution_cache.put(key, response, model=model, ticket_key=ticket_key)
+    except sqlite3.Error as e:
+        logger.warning("Solution cache: storing a response failed: %s", e)
@@ -0,0 +1,93 @@
+"""
+A small dependency graph of async stages for multi-step endpoints (post-to-jira, publish).
+
+Each stage starts as soon as the stages it depends on have finished, with at most max_parallel stages running
+at once, so the whole run takes about as long as its longest path instead of the sum of its steps. Stage
+functions get the results so far (stage name -> return value). When a stage fails, stages that depend on it are
+skipped, while stages already running or not depending on it finish; run() then raises StageFailed for the
+first failed stage in the order they were added. Every stage gets a StageTiming.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from app.models import StageTiming
+
+StageFn = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class StageFailed(Exception):
+    """A stage raised; .stage names it and .error is the original exception."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class _Skipped(Exception):
+    pass
+
+
+class StageGraph:
+    def __init__(self, max_parallel: int = 4):
+        self._stages: dict[str, tuple[StageFn, tuple[str, ...]]] = {}
+        self._limit = asyncio.Semaphore(max(1, max_parallel))
+        self._started = 0.0
+        self.results: dict[str, Any] = {}
+        self.timings: list[StageTiming] = []
+        self.total_ms: float | None = None  # wall time of run()
+
+    def add(self, name: str, fn: StageFn, after: Iterable[str] = ()) -> None:
+        """Add a stage; its dependencies must already be added (so the graph cannot have cycles)."""
+        after = tuple(after)
+        unknown = [d for d in after if d not in self._stages]
+        if name in self._stages or unknown:
+            raise ValueError(f"Stage {name!r}: duplicate name or unknown dependencies {unknown}")
+        self._stages[name] = (fn, after)
+
+    def _record(self, name: str, status: str, start: float, end: float) -> None:
+        self.timings.append(
+            StageTiming(
+                stage=name,
+                status=status,
+                start_ms=round((start - self._started) * 1000, 1),
+                duration_ms=round((end - start) * 1000, 1),
+            )
+        )
+
+    async def _run_stage(self, name: str, tasks: dict[str, asyncio.Task]) -> Any:
+        fn, after = self._stages[name]
+        for dep in after:
+            try:
+                await tasks[dep]
+            except Exception:
+                now = time.perf_counter()
+                self._record(name, "skipped", now, now)
+                raise _Skipped(name)
+        async with self._limit:
+            start = time.perf_counter()
+            try:
+                result = await fn(self.results)
+            except Exception:
+                self._record(name, "failed", start, time.perf_counter())
+                raise
+            self._record(name, "ok", start, time.perf_counter())
+        self.results[name] = result
+        return result
+
+    async def run(self) -> dict[str, Any]:
+        """Run every stage; returns the results by stage name, or raises StageFailed."""
+        self._started = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(self._run_stage(name, tasks), name=f"stage-{name}")
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.timings.sort(key=lambda t: t.start_ms)
+        for name, task in tasks.items():
+            error = task.exception()
+            if error is not None and not isinstance(error, _Skipped):
+                raise StageFailed(name, error) from error
+        return self.results
@@ -0,0 +1,188 @@
+"""
+Sub-task extraction from LLM solution text.
+
+One pass over the lines drives three collectors at once, then the first that found anything wins, in the
+same order parse_suggested_subtasks always used:
+
+    "pipe"           'Summary | Description' lines right after a 'Suggested sub-tasks:' style header
+    "multiline"      bullets under that header, each followed by indented description lines
+    "approach_plan"  fallback: the lines of an 'APPROACH PLAN:' section as summaries, without descriptions
+
+The matched format is logged and counted (see subtask_format_stats) so prompts can be tuned toward "pipe".
+"""
+import logging
+import re
+import threading
+from collections import Counter
+
+from app.models import SubtaskItem
+
+logger = logging.getLogger(__name__)
+
+FORMAT_PIPE = "pipe"
+FORMAT_MULTILINE = "multiline"
+FORMAT_APPROACH_PLAN = "approach_plan"
+
+# Header patterns are searched over the whole text (a header's words may be split across lines); their
+# match ends at the first line of the section.
+_SECTION_HEADER = re.compile(
+    r"(?:Suggested\s+sub-tasks|Sub-tasks\s+to\s+create|SUGGESTED\s+SUB-TASKS|Tasks\s+to\s+create|"
+    r"Recommended\s+(?:sub-?)?tasks):\s*\n",
+    re.IGNORECASE,
+)
+_PLAN_HEADER = re.compile(r"(?:APPROACH\s+PLAN|1\)\s*APPROACH)\s*:?\s*\n", re.IGNORECASE)
+_PLAN_END = re.compile(r"\s*(?:2\)|2\.|SOLUTION|Suggested)", re.IGNORECASE)
+_SECTION_END = re.compile(r"(?:Solution|Approach)\s*:?\s*$", re.IGNORECASE)
+_IS_BULLET = re.compile(r"\s*(?:\d+[.)]|[-*])\s+")
+_BULLET = re.compile(r"^\s*[-*]\s+")
+_NUMBER = re.compile(r"^\s*\d+[.)]\s+")
+
+_stats_lock = threading.Lock()
+_format_counts: Counter = Counter()
+
+
+def _strip_number_then_bullet(s: str) -> str:
+    if s[0].isdigit():
+        s = _NUMBER.sub("", s, count=1)
+    if s and (s[0] == "-" or s[0] == "*"):
+        s = _BULLET.sub("", s, count=1)
+    return s
+
+
+def _word_start(text: str, k: int) -> int:
+    """Start of the whitespace-separated word before k, skipping the whitespace in between."""
+    while k > 0 and text[k - 1].isspace():
+        k -= 1
+    while k > 0 and not text[k - 1].isspace():
+        k -= 1
+    return k
+
+
+def _space_end(text: str, j: int) -> int:
+    n = len(text)
+    while j < n and text[j].isspace():
+        j += 1
+    return j
+
+
+def _section_header_end(text: str, low: str) -> int:
+    """
+    Where _SECTION_HEADER.search(text) ends, or -1. Every header contains 'tasks' followed by its colon, so the
+    pattern only runs in small windows around those words instead of at every position of the text.
+    """
+    k = low.find("tasks")
+    while k >= 0:
+        colon = text.find(":", k)
+        if colon < 0:
+            return -1
+        m = _SECTION_HEADER.search(text, _word_start(text, _word_start(text, k + 1)), _space_end(text, colon + 1))
+        if m:
+            return m.end()
+        k = low.find("tasks", k + 1)
+    return -1
+
+
+def _plan_header_end(text: str, low: str) -> int:
+    """Where _PLAN_HEADER.search(text) ends, or -1; windows around 'approach' as in _section_header_end."""
+    k = low.find("approach")
+    while k >= 0:
+        j = _space_end(text, k + 8)
+        if low.startswith("plan", j):
+            j = _space_end(text, j + 4)
+        if text.startswith(":", j):
+            j += 1
+        m = _PLAN_HEADER.search(text, _word_start(text, _word_start(text, k + 1)), _space_end(text, j))
+        if m:
+            return m.end()
+        k = low.find("approach", k + 1)
+    return -1
+
+
+def extract_subtasks(solution_text: str) -> tuple[list[SubtaskItem], str | None]:
+    """(sub-tasks, matched format) from solution text; ([], None) if no format matched."""
+    text = solution_text or ""
+    lines = text.split("\n")
+    low = text.lower()
+    if len(low) == len(text) and "\u017f" not in text:
+        section_end, plan_end = _section_header_end(text, low), _plan_header_end(text, low)
+    else:
+        # lower() would shift offsets or miss a case-insensitive match (long s): search the plain way
+        m, p = _SECTION_HEADER.search(text), _PLAN_HEADER.search(text)
+        section_end, plan_end = (m.end() if m else -1), (p.end() if p else -1)
+    section = text.count("\n", 0, section_end) if section_end >= 0 else len(lines)  # first line of the section
+    plan_start = text.count("\n", 0, plan_end) if plan_end >= 0 else len(lines)
+
+    pipe_open = True  # the pipe format only reads the first paragraph of the section
+    pipe: list[tuple[str, str | None]] = []
+    blocks: list[tuple[str, list[str]]] = []  # multi-line format: (summary, description lines)
+    plan_open = True  # the plan runs until a '2)', '2.', 'Solution...' or 'Suggested...' line
+    plan: list[str] = []
+
+    for i in range(min(section, plan_start), len(lines)):
+        line = lines[i]
+        stripped = line.strip()
+
+        if i >= section:
+            if pipe_open:
+                if not stripped or _SECTION_END.match(stripped):
+                    pipe_open = False
+                elif "|" in stripped:
+                    raw = stripped
+                    if raw[0] == "-" or raw[0] == "*":
+                        raw = _BULLET.sub("", raw, count=1)
+                    if raw and raw[0].isdigit():
+                        raw = _NUMBER.sub("", raw, count=1)
+                    summary, _, description = raw.partition("|")
+                    summary = summary.strip()[:255]
+                    if summary:
+                        pipe.append((summary, description.strip() or None))
+            if stripped:
+                if (stripped[0] in "-*" or stripped[0].isdigit()) and _IS_BULLET.match(line):
+                    summary = _strip_number_then_bullet(stripped)
+                    if summary and len(summary) <= 255:
+                        blocks.append((summary, []))
+                elif blocks:
+                    blocks[-1][1].append(stripped)
+
+        if plan_open and i >= plan_start and stripped:
+            if i > plan_start and _PLAN_END.match(line):
+                plan_open = False
+            else:
+                plan.append(stripped)
+
+    header = section < len(lines)
+    if header:
+        if pipe:
+            return _counted([SubtaskItem(summary=s, description=d) for s, d in pipe], FORMAT_PIPE)
+        if blocks:
+            tasks = [SubtaskItem(summary=s, description="\n".join(d).strip() or None) for s, d in blocks]
+            return _counted(tasks, FORMAT_MULTILINE)
+    tasks = []
+    for line in plan:
+        cleaned = _strip_number_then_bullet(line)
+        if cleaned and len(cleaned) <= 255:
+            tasks.append(SubtaskItem(summary=cleaned, description=None))
+    if tasks:
+        return _counted(tasks, FORMAT_APPROACH_PLAN)
+    return _counted([], None)
+
+
+def _counted(tasks: list[SubtaskItem], fmt: str | None) -> tuple[list[SubtaskItem], str | None]:
+    with _stats_lock:
+        _format_counts[fmt or "none"] += 1
+    logger.info("Sub-task extraction: %d sub-task(s), format %s", len(tasks), fmt or "none")
+    return tasks, fmt
+
+
+def parse_suggested_subtasks(solution_text: str) -> list[SubtaskItem]:
+    """
+    Extract sub-task items (summary + description) from solution text.
+    Supports: (1) "Summary | Description" per line, (2) multi-line blocks (summary then indented description),
+    (3) fallback APPROACH PLAN lines as summaries (no description).
+    """
+    return extract_subtasks(solution_text)[0]
+
+
+def subtask_format_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_format_counts)
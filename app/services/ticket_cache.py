@@ -0,0 +1,37 @@
+"""
+In-process LRU cache of TicketDetail with TTL + revalidation.
+
+Within TICKET_CACHE_TTL_SECONDS a cached ticket is served without calling Jira. After that it is revalidated
+by asking Jira only for the issue's 'updated' field; the full issue (and its ADF -> Markdown conversion) is
+re-fetched only when 'updated' changed. Cached objects are shared between callers; treat them as read-only.
+"""
+from dataclasses import dataclass
+
+from app.config import settings
+from app.models import TicketDetail
+from app.services.ttl_cache import TTLCache
+
+
+@dataclass
+class CachedTicket:
+    detail: TicketDetail
+    fresh: bool  # True = within TTL, serve as-is; False = revalidate before serving
+
+
+class TicketCache(TTLCache[TicketDetail]):
+    def get(self, ticket_id: str) -> CachedTicket | None:
+        """Cached entry (fresh or needing revalidation), or None on a miss."""
+        entry = self._lookup(ticket_id)
+        return None if entry is None else CachedTicket(*entry)
+
+    def put(
+        self, ticket_id: str, detail: TicketDetail, *, changed: bool = False, generation: int | None = None
+    ) -> bool:
+        """
+        Store a freshly fetched ticket; changed=True records a revalidation that found a newer version. Pass the
+        generation() read before the fetch: False means the ticket was invalidated meanwhile and nothing was stored.
+        """
+        return self._store(ticket_id, detail, changed, generation)
+
+
+ticket_cache = TicketCache(settings.ticket_cache_max_entries, settings.ticket_cache_ttl_seconds)
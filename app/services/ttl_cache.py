@@ -0,0 +1,111 @@
+"""
+Thread-safe, size-bounded LRU with a TTL per entry, keyed by upper-cased issue key: the part ticket_cache and
+comment_cache share.
+
+An entry older than the TTL is still returned, flagged not fresh: the owner revalidates it against Jira (cheaply,
+by the issue's 'updated' field) and either calls mark_valid() to restart the TTL or stores a re-fetched value.
+Each key has a generation that invalidate() bumps: a fetch reads it first and passes it to the store, which drops
+the value if the key was invalidated while the fetch was in flight. Subclasses expose typed get()/put() on top of
+_lookup()/_store().
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[V, float]] = OrderedDict()  # key -> (value, validated_at)
+        self._generations: dict[str, int] = {}  # key -> invalidations so far
+        self._cleared = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "misses": 0, "revalidated_unchanged": 0, "revalidated_changed": 0, "invalidations": 0,
+            "stale_puts_dropped": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _key(ticket_id: str) -> str:
+        return (ticket_id or "").strip().upper()
+
+    def _lookup(self, ticket_id: str) -> tuple[V, bool] | None:
+        """(value, fresh) for a cached entry, fresh = within the TTL; None on a miss."""
+        if not self.enabled:
+            return None
+        key = self._key(ticket_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            value, validated_at = entry
+            fresh = time.monotonic() - validated_at < self.ttl_seconds
+            if fresh:
+                self._stats["hits"] += 1
+            return value, fresh
+
+    def generation(self, ticket_id: str) -> int:
+        """Read before fetching a value to store; changes whenever the key is invalidated."""
+        key = self._key(ticket_id)
+        with self._lock:
+            return self._cleared + self._generations.get(key, 0)
+
+    def _store(self, ticket_id: str, value: V, changed: bool, generation: int | None) -> bool:
+        """
+        Store a freshly fetched value; changed=True records a revalidation that found a newer version. Returns
+        False, storing nothing, if the key was invalidated since generation was read (the value may be stale).
+        """
+        key = self._key(ticket_id)
+        with self._lock:
+            if generation is not None and generation != self._cleared + self._generations.get(key, 0):
+                self._stats["stale_puts_dropped"] += 1
+                return False
+            if not self.enabled:
+                return True
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            if changed:
+                self._stats["revalidated_changed"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def contains(self, ticket_id: str) -> bool:
+        """True if an entry (fresh or not) exists; does not touch LRU order or stats."""
+        with self._lock:
+            return self._key(ticket_id) in self._entries
+
+    def mark_valid(self, ticket_id: str) -> None:
+        """Revalidation found the same 'updated' timestamp: restart the TTL."""
+        key = self._key(ticket_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], time.monotonic())
+                self._stats["revalidated_unchanged"] += 1
+
+    def invalidate(self, ticket_id: str) -> None:
+        key = self._key(ticket_id)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._cleared += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
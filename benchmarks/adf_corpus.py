@@ -0,0 +1,162 @@
+"""
+ADF benchmark corpus.
+
+Real documents: export issue descriptions and comments from your site once, then benchmark against them:
+
+    python -m benchmarks.adf_corpus --jql "project = PROJ ORDER BY updated DESC" --limit 500 --out benchmarks/corpus
+
+Without an exported corpus the benchmarks use synthetic documents shaped like long Jira specs: headings,
+marked-up paragraphs, nested bullet/ordered lists, tables, panels, expands, code blocks, mentions, emoji,
+status lozenges and media. Generation is seeded, so runs are comparable.
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+_WORDS = (
+    "the login service returns a timeout when the payment gateway retries the request after token refresh "
+    "users report intermittent errors on the dashboard because cache invalidation races with the webhook "
+    "handler we should add metrics alerting and a circuit breaker around the upstream client configuration"
+).split()
+
+
+def _text(rng: random.Random, n: int) -> dict[str, Any]:
+    # Like the Jira editor: marked runs carry no surrounding spaces, the plain runs between them do
+    words = " ".join(rng.choice(_WORDS) for _ in range(n))
+    r = rng.random()
+    if r < 0.08:
+        return {"type": "text", "text": words, "marks": [{"type": "strong"}]}
+    if r < 0.12:
+        return {"type": "text", "text": words, "marks": [{"type": "em"}]}
+    if r < 0.16:
+        return {"type": "text", "text": words, "marks": [{"type": "code"}]}
+    if r < 0.19:
+        return {"type": "text", "text": words, "marks": [{"type": "link", "attrs": {"href": "https://example.atlassian.net/wiki/x"}}]}
+    return {"type": "text", "text": f" {words} "}
+
+
+def _inline(rng: random.Random) -> list[dict[str, Any]]:
+    out = []
+    for _ in range(rng.randint(2, 8)):
+        r = rng.random()
+        if r < 0.05:
+            out.append({"type": "mention", "attrs": {"id": "5b10ac8d82e05b22cc7d4ef5", "text": "@Alex Doe"}})
+        elif r < 0.08:
+            out.append({"type": "emoji", "attrs": {"shortName": ":warning:", "text": "⚠️"}})
+        elif r < 0.10:
+            out.append({"type": "status", "attrs": {"text": "IN REVIEW", "color": "blue"}})
+        elif r < 0.12:
+            out.append({"type": "hardBreak"})
+        else:
+            out.append(_text(rng, rng.randint(3, 20)))
+    return out
+
+
+def _paragraph(rng: random.Random) -> dict[str, Any]:
+    return {"type": "paragraph", "content": _inline(rng)}
+
+
+def _list(rng: random.Random, depth: int) -> dict[str, Any]:
+    items = []
+    for _ in range(rng.randint(2, 6)):
+        content = [_paragraph(rng)]
+        if depth < 4 and rng.random() < 0.3:
+            content.append(_list(rng, depth + 1))
+        items.append({"type": "listItem", "content": content})
+    return {"type": rng.choice(("bulletList", "orderedList")), "content": items}
+
+
+def _table(rng: random.Random) -> dict[str, Any]:
+    cols = rng.randint(2, 5)
+    rows = []
+    for r in range(rng.randint(3, 12)):
+        cell_type = "tableHeader" if r == 0 else "tableCell"
+        rows.append({
+            "type": "tableRow",
+            "content": [{"type": cell_type, "content": [_paragraph(rng)]} for _ in range(cols)],
+        })
+    return {"type": "table", "content": rows}
+
+
+def _block(rng: random.Random, depth: int = 0) -> dict[str, Any]:
+    r = rng.random()
+    if r < 0.35:
+        return _paragraph(rng)
+    if r < 0.45:
+        return {"type": "heading", "attrs": {"level": rng.randint(1, 4)}, "content": [_text(rng, 4)]}
+    if r < 0.65:
+        return _list(rng, 0)
+    if r < 0.72:
+        return _table(rng)
+    if r < 0.78:
+        code = "\n".join(f"    call_{i}(arg)  # {rng.choice(_WORDS)}" for i in range(rng.randint(3, 25)))
+        return {"type": "codeBlock", "attrs": {"language": "python"}, "content": [{"type": "text", "text": code}]}
+    if r < 0.84 and depth < 3:
+        return {"type": "panel", "attrs": {"panelType": "info"}, "content": [_block(rng, depth + 1) for _ in range(2)]}
+    if r < 0.89 and depth < 3:
+        return {"type": "expand", "attrs": {"title": "Details"}, "content": [_block(rng, depth + 1) for _ in range(3)]}
+    if r < 0.93:
+        return {"type": "mediaSingle", "content": [{"type": "media", "attrs": {"type": "file", "id": "a1b2", "alt": "screenshot.png"}}]}
+    if r < 0.96:
+        return {"type": "rule"}
+    return {"type": "blockquote", "content": [_paragraph(rng)]}
+
+
+def synthetic_document(rng: random.Random, blocks: int) -> dict[str, Any]:
+    return {"type": "doc", "version": 1, "content": [_block(rng) for _ in range(blocks)]}
+
+
+def deeply_nested_document(depth: int) -> dict[str, Any]:
+    """Nested lists inside panels, deeper than the old recursive converter could handle."""
+    node: dict[str, Any] = {"type": "paragraph", "content": [{"type": "text", "text": "innermost"}]}
+    for i in range(depth):
+        if i % 2:
+            node = {"type": "panel", "attrs": {"panelType": "note"}, "content": [node]}
+        else:
+            node = {"type": "bulletList", "content": [{"type": "listItem", "content": [node]}]}
+    return {"type": "doc", "version": 1, "content": [node]}
+
+
+def load_corpus(synthetic_docs: int = 200, seed: int = 7) -> tuple[str, list[dict[str, Any]]]:
+    """(source label, documents): the exported corpus if present, else synthetic documents."""
+    files = sorted(CORPUS_DIR.glob("*.json")) if CORPUS_DIR.is_dir() else []
+    if files:
+        return f"{len(files)} exported documents", [json.loads(f.read_text(encoding="utf-8")) for f in files]
+    rng = random.Random(seed)
+    return (
+        f"{synthetic_docs} synthetic documents (seed {seed})",
+        [synthetic_document(rng, rng.randint(10, 60)) for _ in range(synthetic_docs)],
+    )
+
+
+def export_from_jira(jql: str, limit: int, out: Path) -> int:
+    """Save the raw ADF descriptions and comment bodies of matching issues as one JSON file each."""
+    from app.services.jira_http import get_jira_http_client
+    from app.services.jira_search import iter_issues
+
+    out.mkdir(parents=True, exist_ok=True)
+    saved = 0
+    for issue in iter_issues(jql, 100, "description,comment"):
+        fields = issue.get("fields") or {}
+        bodies = [fields.get("description")]
+        bodies += [c.get("body") for c in ((fields.get("comment") or {}).get("comments") or [])]
+        for i, body in enumerate(b for b in bodies if isinstance(b, dict)):
+            (out / f"{issue.get('key')}-{i}.json").write_text(json.dumps(body), encoding="utf-8")
+            saved += 1
+        if saved >= limit:
+            break
+    get_jira_http_client().close()
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export real ADF documents from Jira for the benchmarks")
+    parser.add_argument("--jql", required=True)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--out", type=Path, default=CORPUS_DIR)
+    args = parser.parse_args()
+    print(f"saved {export_from_jira(args.jql, args.limit, args.out)} documents to {args.out}")
@@ -0,0 +1,59 @@
+"""
+Throughput of ADF -> Markdown conversion (runs on every fetch_ticket), current vs. the old recursive version.
+
+    python -m benchmarks.bench_adf_to_markdown [--repeat 10]
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.services.adf_markdown import adf_to_markdown
+from benchmarks.adf_corpus import deeply_nested_document, load_corpus
+from benchmarks.legacy import _adf_to_markdown as legacy_adf_to_markdown
+
+
+def _throughput(converters: dict, docs, repeat: int) -> dict[str, tuple[float, int]]:
+    """Per converter: (best seconds per pass, output characters per pass). Passes are interleaved, in alternating
+    order, so drift in machine load affects both converters alike."""
+    best = {name: float("inf") for name in converters}
+    chars = dict.fromkeys(converters, 0)
+    names = list(converters)
+    for i in range(repeat):
+        for name in names if i % 2 == 0 else reversed(names):
+            start = time.perf_counter()
+            chars[name] = sum(len(converters[name](d)) for d in docs)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: (best[name], chars[name]) for name in converters}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--docs", type=int, default=200, help="synthetic documents when no exported corpus exists")
+    args = parser.parse_args()
+
+    source, docs = load_corpus(args.docs)
+    adf_mb = sum(len(json.dumps(d)) for d in docs) / 1e6
+    print(f"corpus: {source}, {adf_mb:.1f} MB of ADF JSON")
+    results = _throughput({"iterative": adf_to_markdown, "legacy": legacy_adf_to_markdown}, docs, args.repeat)
+    for name, (seconds, chars) in results.items():
+        print(
+            f"{name:>10}: {seconds * 1000:8.1f} ms/pass  {len(docs) / seconds:9.0f} docs/s  "
+            f"{adf_mb / seconds:6.1f} MB ADF/s  ({chars / 1e6:.2f} M chars out)"
+        )
+
+    depth = sys.getrecursionlimit() * 2
+    nested = deeply_nested_document(depth)
+    start = time.perf_counter()
+    adf_to_markdown(nested)
+    print(f"nesting depth {depth}: iterative ok in {(time.perf_counter() - start) * 1000:.1f} ms", end="; ")
+    try:
+        legacy_adf_to_markdown(nested)
+        print("legacy ok")
+    except RecursionError:
+        print("legacy RecursionError")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Markdown -> ADF compilation (every comment, description and sub-task posted to Jira), current vs. the old
+line-by-line regex version, on ~100 KB inputs. The round-trip checks are in tests/test_markdown_adf.py.
+
+    python -m benchmarks.bench_markdown_to_adf [--repeat 5] [--size-kb 100]
+"""
+import argparse
+import time
+
+from app.services.adf_markdown import adf_to_markdown
+from app.services.markdown_adf import markdown_to_adf
+from benchmarks.adf_corpus import load_corpus
+from benchmarks.legacy import _text_to_adf_body as legacy_text_to_adf_body
+
+
+def _inputs(size_kb: int, count: int) -> list[str]:
+    """Inputs of about size_kb each, made by concatenating the corpus documents rendered to Markdown."""
+    _, docs = load_corpus()
+    rendered = [adf_to_markdown(d) for d in docs]
+    inputs, current, size = [], [], 0
+    for md in rendered * 10:
+        current.append(md)
+        size += len(md)
+        if size >= size_kb * 1000:
+            inputs.append("\n\n".join(current))
+            current, size = [], 0
+            if len(inputs) == count:
+                break
+    return inputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--inputs", type=int, default=20)
+    args = parser.parse_args()
+
+    inputs = _inputs(args.size_kb, args.inputs)
+    mb = sum(len(s) for s in inputs) / 1e6
+    print(f"inputs: {len(inputs)} x ~{args.size_kb} KB Markdown ({mb:.1f} MB)")
+    compilers = {"one-pass": markdown_to_adf, "legacy": legacy_text_to_adf_body}
+    best = dict.fromkeys(compilers, float("inf"))
+    # Interleaved, so both see the same machine state
+    for _ in range(args.repeat):
+        for name, compile_ in compilers.items():
+            start = time.perf_counter()
+            for s in inputs:
+                compile_(s)
+            best[name] = min(best[name], time.perf_counter() - start)
+    for name, seconds in best.items():
+        print(f"{name:>10}: {seconds / len(inputs) * 1000:7.2f} ms/input  {mb / seconds:6.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Response encoding: serialization CPU time and bytes on the wire for GET /tickets?max_results=100 (default fields,
+fields=...,description and include_raw=true) and a typical solution response.
+
+Serializers: the stdlib json.dumps that JSONResponse used, FastAPI's jsonable_encoder + json.dumps path (routes
+without a response_model), and orjson (FastJSONResponse, this app's default). Wire sizes are for identity, gzip
+and, when the 'brotli' package is installed, brotli at the levels CompressionMiddleware uses by default.
+
+    python -m benchmarks.bench_responses [--repeat 20]
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models import SolutionResponse, TicketFields
+from app.responses import brotli, dumps
+from app.services.adf_markdown import adf_to_markdown
+from benchmarks.adf_corpus import synthetic_document
+from benchmarks.subtask_corpus import synthetic_solution
+
+_SUMMARY_WORDS = "fix timeout payment gateway retry path cache webhook token refresh dashboard metrics alert login".split()
+
+
+def _stdlib(data) -> bytes:
+    # starlette.responses.JSONResponse.render
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _tickets(rng: random.Random, n: int) -> list[TicketFields]:
+    out = []
+    for i in range(n):
+        doc = synthetic_document(rng, rng.randint(2, 8))
+        key = f"PROJ-{1000 + i}"
+        raw = {
+            "id": str(20000 + i),
+            "key": key,
+            "self": f"https://example.atlassian.net/rest/api/3/issue/{20000 + i}",
+            "fields": {
+                "summary": " ".join(rng.sample(_SUMMARY_WORDS, 6)).capitalize(),
+                "description": doc,
+                "status": {"name": "In Progress", "statusCategory": {"key": "indeterminate", "colorName": "yellow"}},
+                "issuetype": {"name": "Story", "subtask": False, "iconUrl": "https://example.atlassian.net/icon.png"},
+                "assignee": {"accountId": f"5b10a2844c20165700ede{i:03d}", "displayName": "Alex Doe"},
+                "updated": "2024-05-01T10:00:00.000+0000",
+                "labels": ["backend", "payments"],
+            },
+        }
+        out.append(
+            TicketFields(
+                key=key,
+                summary=raw["fields"]["summary"],
+                description=adf_to_markdown(doc),
+                status="In Progress",
+                issue_type="Story",
+                assignee="Alex Doe",
+                raw=raw,
+            )
+        )
+    return out
+
+
+def _payloads(seed: int) -> list[tuple[str, object]]:
+    rng = random.Random(seed)
+    tickets = _tickets(rng, 100)
+    summary_fields = {"key", "summary", "status", "issue_type", "assignee"}
+    summaries = [t.model_dump(mode="json", include=summary_fields) for t in tickets]
+    described = [t.model_dump(mode="json", include={"key", "summary", "description"}) for t in tickets]
+    with_raw = [t.model_dump(mode="json", exclude={"description"}) for t in tickets]
+    solution = SolutionResponse(
+        ticket_id="PROJ-1000",
+        ticket_summary=tickets[0].summary,
+        question="Propose an approach and sub-tasks",
+        solution="\n\n".join(synthetic_solution(rng) for _ in range(3)),
+    ).model_dump(mode="json")
+    return [
+        ("/tickets?max_results=100", summaries),
+        ("  &fields=...,description", described),
+        ("  &include_raw=true", with_raw),
+        ("solution response", solution),
+    ]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    serializers = (
+        ("json.dumps", _stdlib),
+        ("jsonable+json", lambda d: _stdlib(jsonable_encoder(d))),
+        ("orjson", dumps),
+    )
+    for label, data in _payloads(args.seed):
+        body = dumps(data)
+        assert json.loads(body) == json.loads(_stdlib(data))
+        times = "  ".join(f"{name} {_best(lambda: fn(data), args.repeat) * 1e3:7.2f} ms" for name, fn in serializers)
+        print(f"{label:<28} {times}")
+
+        wire = [f"identity {len(body) / 1e3:8.1f} kB"]
+        gz = zlib.compressobj(6, zlib.DEFLATED, 31)
+        gz_len = len(gz.compress(body) + gz.flush())
+        gz_ms = _best(lambda: zlib.compress(body, 6), max(1, args.repeat // 4)) * 1e3
+        wire.append(f"gzip-6 {gz_len / 1e3:7.1f} kB ({gz_ms:5.2f} ms)")
+        if brotli is not None:
+            br_len = len(brotli.compress(body, quality=4))
+            br_ms = _best(lambda: brotli.compress(body, quality=4), max(1, args.repeat // 4)) * 1e3
+            wire.append(f"br-4 {br_len / 1e3:7.1f} kB ({br_ms:5.2f} ms)")
+        else:
+            wire.append("br: 'brotli' not installed")
+        print(f"{'':<28} {'  '.join(wire)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Sub-task extraction (every post-to-jira / publish on a Story or Epic): single-pass extractor vs. the old
+multi-pass parse_suggested_subtasks. First checks that both return the same sub-tasks on every seed and fuzzed
+variant, then reports which formats matched and the throughput.
+
+    python -m benchmarks.bench_subtask_parser [--repeat 5] [--fuzz-per-seed 20]
+"""
+import argparse
+import logging
+import sys
+import time
+from collections import Counter
+
+from app.services.subtask_parser import extract_subtasks
+from benchmarks.legacy import parse_suggested_subtasks as legacy_parse_suggested_subtasks
+from benchmarks.subtask_corpus import fuzz_corpus, load_solutions
+
+
+def _items(tasks) -> list[tuple[str, str | None]]:
+    return [(t.summary, t.description) for t in tasks]
+
+
+def mismatches(texts: list[str]) -> list[str]:
+    return [t for t in texts if _items(extract_subtasks(t)[0]) != _items(legacy_parse_suggested_subtasks(t))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fuzz-per-seed", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("app.services.subtask_parser").setLevel(logging.WARNING)
+
+    source, seeds = load_solutions()
+    fuzzed = fuzz_corpus(seeds, args.fuzz_per_seed)
+    bad = mismatches(seeds + fuzzed)
+    print(f"corpus: {source} + {len(fuzzed)} fuzzed variants; same sub-tasks as legacy: {len(seeds) + len(fuzzed) - len(bad)}/{len(seeds) + len(fuzzed)}")
+    for text in bad[:3]:
+        print("  MISMATCH", repr(text[:300]))
+
+    formats = Counter(extract_subtasks(t)[1] or "none" for t in seeds)
+    print("formats matched (seeds):", ", ".join(f"{k}={v}" for k, v in formats.most_common()))
+
+    kb = sum(len(t) for t in seeds) / 1e3
+    for name, parse in (("one-pass", lambda t: extract_subtasks(t)[0]), ("legacy", legacy_parse_suggested_subtasks)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for t in seeds:
+                parse(t)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>10}: {best / len(seeds) * 1e6:8.1f} us/solution  {kb / 1e3 / best:6.1f} MB/s")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
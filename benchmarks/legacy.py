@@ -0,0 +1,275 @@
+"""
+Pre-optimization implementations from app/services/jira_service.py, kept verbatim as benchmark baselines.
+Not imported by the app.
+"""
+import re
+from typing import Any
+
+from app.models import SubtaskItem
+
+
+def _adf_to_markdown(node: dict[str, Any], list_index: int = None) -> str:
+    """Recursively convert Jira ADF to Markdown."""
+    if not isinstance(node, dict):
+        return ""
+    
+    node_type = node.get("type")
+    
+    if node_type == "text":
+        text = node.get("text", "")
+        # Handle marks (bold, italic, code, link)
+        marks = node.get("marks", [])
+        for mark in marks:
+            t = mark.get("type")
+            if t == "strong":
+                text = f"**{text}**"
+            elif t == "em":
+                text = f"*{text}*"
+            elif t == "code":
+                text = f"`{text}`"
+            elif t == "link":
+                url = mark.get("attrs", {}).get("href", "")
+                text = f"[{text}]({url})"
+        return text
+
+    content = node.get("content", [])
+    parts = []
+    
+    for i, child in enumerate(content):
+        if node_type == "orderedList":
+            parts.append(_adf_to_markdown(child, list_index=i+1))
+        elif node_type == "bulletList":
+            parts.append(_adf_to_markdown(child, list_index=0))
+        else:
+            parts.append(_adf_to_markdown(child))
+            
+    if node_type == "paragraph":
+        return "".join(parts) + "\n\n"
+    elif node_type == "heading":
+        level = node.get("attrs", {}).get("level", 1)
+        return f"{'#' * level} " + "".join(parts) + "\n\n"
+    elif node_type in ("bulletList", "orderedList"):
+        return "".join(parts) + "\n"
+    elif node_type == "listItem":
+        prefix = f"{list_index}. " if list_index else "* "
+        # list items usually contain paragraphs, so we strip trailing newlines
+        item_text = "".join(parts).strip()
+        # Handle multi-line list items by indenting subsequent lines
+        indented_text = item_text.replace("\n", "\n  ")
+        return f"{prefix}{indented_text}\n"
+    elif node_type == "codeBlock":
+        lang = node.get("attrs", {}).get("language", "")
+        return f"```{lang}\n" + "".join(parts).strip() + "\n```\n\n"
+    elif node_type in ("doc", "blockquote", "panel"):
+        return "".join(parts)
+    elif node_type == "rule":
+        return "---\n\n"
+
+    return "".join(parts)
+
+
+def _text_to_adf_body(text: str) -> dict:
+    """Convert Markdown text to Jira Cloud ADF (Atlassian Document Format)."""
+    import re
+    blocks = []
+    lines = text.split("\n")
+    i = 0
+    
+    while i < len(lines):
+        line = lines[i].strip()
+        raw_line = lines[i]
+        
+        if not line:
+            i += 1
+            continue
+            
+        # Code block
+        if line.startswith("```"):
+            lang = line[3:].strip()
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code_lines.append(lines[i])
+                i += 1
+            blocks.append({
+                "type": "codeBlock",
+                "attrs": {"language": lang or "plain"},
+                "content": [{"type": "text", "text": "\n".join(code_lines) if code_lines else " "}]
+            })
+            i += 1
+            continue
+            
+        # Heading
+        m_heading = re.match(r"^(#{1,6})\s+(.*)", line)
+        if m_heading:
+            level = len(m_heading.group(1))
+            blocks.append({
+                "type": "heading",
+                "attrs": {"level": level},
+                "content": [{"type": "text", "text": m_heading.group(2)}]
+            })
+            i += 1
+            continue
+            
+        # Bullet List
+        if line.startswith("- ") or line.startswith("* "):
+            items = []
+            while i < len(lines) and (lines[i].strip().startswith("- ") or lines[i].strip().startswith("* ")):
+                item_text = re.sub(r"^[-*]\s+", "", lines[i].strip())
+                
+                # bold parsing inside list
+                text_nodes = []
+                parts = re.split(r'(\*\*.*?\*\*)', item_text)
+                for part in parts:
+                    if part.startswith("**") and part.endswith("**") and len(part) > 4:
+                        text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
+                    elif part:
+                        text_nodes.append({"type": "text", "text": part})
+                        
+                items.append({
+                    "type": "listItem",
+                    "content": [{
+                        "type": "paragraph",
+                        "content": text_nodes if text_nodes else [{"type": "text", "text": " "}]
+                    }]
+                })
+                i += 1
+            blocks.append({
+                "type": "bulletList",
+                "content": items
+            })
+            continue
+
+        # Numbered List
+        m_ordered = re.match(r"^(\d+)\.\s+(.*)", line)
+        if m_ordered:
+            items = []
+            while i < len(lines):
+                m_ord = re.match(r"^(\d+)\.\s+(.*)", lines[i].strip())
+                if not m_ord:
+                    break
+                item_text = m_ord.group(2)
+                
+                text_nodes = []
+                parts = re.split(r'(\*\*.*?\*\*)', item_text)
+                for part in parts:
+                    if part.startswith("**") and part.endswith("**") and len(part) > 4:
+                        text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
+                    elif part:
+                        text_nodes.append({"type": "text", "text": part})
+                        
+                items.append({
+                    "type": "listItem",
+                    "content": [{
+                        "type": "paragraph",
+                        "content": text_nodes if text_nodes else [{"type": "text", "text": " "}]
+                    }]
+                })
+                i += 1
+            blocks.append({
+                "type": "orderedList",
+                "content": items
+            })
+            continue
+            
+        # Paragraph with bold parsing
+        text_nodes = []
+        parts = re.split(r'(\*\*.*?\*\*)', line)
+        for part in parts:
+            if part.startswith("**") and part.endswith("**") and len(part) > 4:
+                text_nodes.append({"type": "text", "text": part[2:-2], "marks": [{"type": "strong"}]})
+            elif part:
+                text_nodes.append({"type": "text", "text": part})
+        
+        blocks.append({
+            "type": "paragraph",
+            "content": text_nodes if text_nodes else [{"type": "text", "text": line}]
+        })
+        i += 1
+        
+    if not blocks:
+        blocks = [{"type": "paragraph", "content": [{"type": "text", "text": "(No content)"}]}]
+    return {"type": "doc", "version": 1, "content": blocks}
+
+
+def parse_suggested_subtasks(solution_text: str) -> list[SubtaskItem]:
+    """
+    Extract sub-task items (summary + description) from solution text.
+    Supports: (1) "Summary | Description" per line, (2) multi-line blocks (summary then indented description),
+    (3) fallback APPROACH PLAN lines as summaries (no description).
+    """
+    text = solution_text or ""
+    patterns = [
+        r"(?:Suggested\s+sub-tasks|Sub-tasks\s+to\s+create|SUGGESTED\s+SUB-TASKS|Tasks\s+to\s+create|Recommended\s+(?:sub-?)?tasks):\s*\n",
+        r"\n3\)\s*SUGGESTED\s+SUB-TASKS:\s*\n",
+        r"\n3\.\s*SUGGESTED\s+SUB-TASKS:\s*\n",
+    ]
+    start = -1
+    for pat in patterns:
+        m = re.search(pat, text, re.IGNORECASE)
+        if m:
+            start = m.end()
+            break
+    if start >= 0:
+        section = text[start:]
+        tasks: list[SubtaskItem] = []
+        # Try single-line "Summary | Description" first (only count lines that have a pipe)
+        for line in section.split("\n"):
+            line_stripped = line.strip()
+            if not line_stripped:
+                break
+            if re.match(r"^(?:Solution|Approach|SOLUTION|APPROACH)\s*:?\s*$", line_stripped, re.IGNORECASE):
+                break
+            raw = line_stripped
+            raw = re.sub(r"^\s*[-*]\s+", "", raw)
+            raw = re.sub(r"^\s*\d+[.)]\s+", "", raw)
+            if not raw:
+                continue
+            if "|" in raw:
+                parts = raw.split("|", 1)
+                summary = (parts[0] or "").strip()[:255]
+                description = (parts[1].strip() if len(parts) > 1 and parts[1] else "").strip() or None
+                if summary:
+                    tasks.append(SubtaskItem(summary=summary, description=description))
+        if tasks:
+            return tasks
+
+        # Multi-line block: "1. Summary\n   Description\n2. Next\n   Desc" (no pipe on any line)
+        lines = section.split("\n")
+        current_summary: str | None = None
+        current_desc: list[str] = []
+        for line in lines:
+            stripped = line.strip()
+            is_bullet = bool(re.match(r"^\s*(\d+[.)]|[-*])\s+", line))
+            if is_bullet and stripped:
+                bullet_removed = re.sub(r"^\s*\d+[.)]\s+", "", stripped)
+                bullet_removed = re.sub(r"^\s*[-*]\s+", "", bullet_removed)
+                if bullet_removed and len(bullet_removed) <= 255:
+                    if current_summary:
+                        desc_text = "\n".join(current_desc).strip() or None
+                        tasks.append(SubtaskItem(summary=current_summary, description=desc_text))
+                    current_summary = bullet_removed[:255]
+                    current_desc = []
+            elif current_summary and stripped:
+                current_desc.append(stripped)
+        if current_summary:
+            desc_text = "\n".join(current_desc).strip() or None
+            tasks.append(SubtaskItem(summary=current_summary, description=desc_text))
+        if tasks:
+            return tasks
+    # Fallback: APPROACH PLAN numbered lines as summaries (no description)
+    approach = re.search(r"(?:APPROACH\s+PLAN|1\)\s*APPROACH)\s*:?\s*\n(.*?)(?=\n\s*(?:2\)|2\.|SOLUTION|Suggested)|$)", text, re.IGNORECASE | re.DOTALL)
+    if approach:
+        block = approach.group(1).strip()
+        tasks = []
+        for line in block.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            cleaned = re.sub(r"^\s*\d+[.)]\s+", "", line)
+            cleaned = re.sub(r"^\s*[-*]\s+", "", cleaned)
+            if cleaned and len(cleaned) <= 255:
+                tasks.append(SubtaskItem(summary=cleaned, description=None))
+        if tasks:
+            return tasks
+    return []
@@ -0,0 +1,137 @@
+"""
+Solution-text corpus for the sub-task extractor.
+
+Real model outputs: save solutions (one per file) as benchmarks/corpus/solutions/*.txt, e.g. from the
+'solution' field of POST /tickets/{id}/solution/post-to-jira responses. They are used as-is and as fuzz seeds.
+
+Without them, seeds are synthetic outputs in the shapes the prompts in groq_service produce, plus the usual
+deviations (Markdown headings and bold, CRLF, tables, numbered vs. bulleted, descriptions on the next line).
+fuzz() mutates seeds line by line; generation is seeded, so runs are comparable.
+"""
+import random
+from pathlib import Path
+
+SOLUTIONS_DIR = Path(__file__).resolve().parent / "corpus" / "solutions"
+
+_WORDS = (
+    "add validate refresh token endpoint cache invalidate webhook retry gateway timeout metrics dashboard "
+    "migration schema index rollout feature flag tests coverage logging alert rate limit client config"
+).split()
+
+_SECTION_HEADERS = (
+    "Suggested sub-tasks:", "SUGGESTED SUB-TASKS:", "3) SUGGESTED SUB-TASKS:", "3. Suggested sub-tasks:",
+    "### Suggested sub-tasks:", "**Suggested sub-tasks:**", "Sub-tasks to create:", "Tasks to create:",
+    "Recommended subtasks:", "Recommended tasks:", "Suggested Sub-Tasks",
+)
+_PLAN_HEADERS = ("1) APPROACH PLAN:", "APPROACH PLAN:", "## 1) Approach Plan", "1) APPROACH", "Approach plan")
+_SOLUTION_HEADERS = ("2) SOLUTION:", "SOLUTION:", "## 2) Solution", "Solution", "2. SOLUTION")
+_MARKERS = ("- ", "* ", "1. ", "2) ", "", "   - ", "10. ")
+
+
+def _phrase(rng: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi))).capitalize()
+
+
+def _marker(rng: random.Random, i: int) -> str:
+    m = rng.choice(_MARKERS)
+    return f"{i + 1}. " if m == "1. " else m
+
+
+def synthetic_solution(rng: random.Random) -> str:
+    out = []
+    if rng.random() < 0.85:
+        out.append(rng.choice(_PLAN_HEADERS))
+        out += [f"{i + 1}. {_phrase(rng, 3, 12)}" for i in range(rng.randint(2, 8))]
+        out.append("")
+    out.append(rng.choice(_SOLUTION_HEADERS))
+    for _ in range(rng.randint(2, 12)):
+        r = rng.random()
+        if r < 0.5:
+            out.append(_phrase(rng, 15, 60) + ".")
+        elif r < 0.7:
+            out.append("```python\n" + "\n".join(f"    {rng.choice(_WORDS)}()  # {_phrase(rng, 2, 5)}" for _ in range(rng.randint(2, 10))) + "\n```")
+        elif r < 0.85:
+            out.append("| Step | Owner |\n| --- | --- |\n" + "\n".join(f"| {_phrase(rng, 1, 3)} | {rng.choice(_WORDS)} |" for _ in range(3)))
+        else:
+            out += [f"- {_phrase(rng, 3, 10)}" for _ in range(rng.randint(2, 5))]
+        out.append("")
+    if rng.random() < 0.8:
+        out.append(rng.choice(_SECTION_HEADERS) + rng.choice(("", "", " ", "  \t")))
+        if rng.random() < 0.3:
+            out.append("")
+        style = rng.random()
+        for i in range(rng.randint(1, 8)):
+            summary = _phrase(rng, 2, 8)
+            if style < 0.6:
+                out.append(f"{_marker(rng, i)}{summary} | {_phrase(rng, 5, 30)}.")
+            elif style < 0.8:
+                out.append(f"{_marker(rng, i)}{summary}")
+                out += [f"   {_phrase(rng, 4, 20)}." for _ in range(rng.randint(0, 3))]
+            elif style < 0.9:
+                out.append(f"{_marker(rng, i)}**{summary}**: {_phrase(rng, 5, 20)}.")
+            else:
+                out.append(f"{_marker(rng, i)}{summary} | {_phrase(rng, 5, 20)}.")
+                out.append("")
+        if rng.random() < 0.3:
+            out += ["", "Notes: " + _phrase(rng, 5, 15)]
+    text = "\n".join(out)
+    if rng.random() < 0.1:
+        text = text.replace("\n", "\r\n")
+    return text
+
+
+def _mutate_line(rng: random.Random, line: str) -> list[str]:
+    r = rng.random()
+    if r < 0.1:
+        return []
+    if r < 0.2:
+        return [line, line]
+    if r < 0.3:
+        return [line, ""]
+    if r < 0.4:
+        return ["  " + line]
+    if r < 0.5:
+        return [line + rng.choice((" ", "\t", "  ", "\r"))]
+    if r < 0.55:
+        return [line.upper()]
+    if r < 0.6:
+        return [line.lower()]
+    if r < 0.65:
+        return [rng.choice(_SECTION_HEADERS + _PLAN_HEADERS + _SOLUTION_HEADERS), line]
+    if r < 0.7:
+        return [rng.choice(("2) next", "2. next", "Suggested next", "solution", "  ", "-", "- ", "1.", "1. ", "|")), line]
+    if r < 0.75:
+        return [line + " | " + _phrase(rng, 1, 5)]
+    if r < 0.8:
+        return [rng.choice(_MARKERS) + line]
+    if r < 0.83:
+        return [line * rng.randint(10, 40)]  # over the 255-character summary limit
+    if r < 0.86:
+        cut = rng.randint(0, len(line))
+        return [line[:cut], line[cut:]]
+    if r < 0.89 and line:
+        # Characters where str.lower() and re.IGNORECASE disagree, and non-ASCII whitespace
+        at = rng.randrange(len(line))
+        return [line[:at] + rng.choice(("\u017f", "\u0130", "\u212a", "\u00a0", "\t")) + line[at + 1 :]]
+    return [line]
+
+
+def fuzz(seed_text: str, rng: random.Random) -> str:
+    out: list[str] = []
+    for line in seed_text.split("\n"):
+        out += _mutate_line(rng, line)
+    return "\n".join(out)
+
+
+def load_solutions(synthetic: int = 300, seed: int = 11) -> tuple[str, list[str]]:
+    """(source label, solution texts): saved real outputs if present, else synthetic ones."""
+    files = sorted(SOLUTIONS_DIR.glob("*.txt")) if SOLUTIONS_DIR.is_dir() else []
+    if files:
+        return f"{len(files)} saved model outputs", [f.read_text(encoding="utf-8") for f in files]
+    rng = random.Random(seed)
+    return f"{synthetic} synthetic outputs (seed {seed})", [synthetic_solution(rng) for _ in range(synthetic)]
+
+
+def fuzz_corpus(seeds: list[str], per_seed: int = 20, seed: int = 13) -> list[str]:
+    rng = random.Random(seed)
+    return [fuzz(s, rng) for s in seeds for _ in range(per_seed)]
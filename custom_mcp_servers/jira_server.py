@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Add project root to sys.path so we can import app modules
 project_root = Path(__file__).resolve().parent.parent
@@ -10,11 +10,13 @@ from mcp.server.fastmcp import FastMCP
 from app.services.jira_service import (
     fetch_ticket,
     fetch_tickets,
+    fetch_tickets_by_keys,
     create_ticket,
     update_ticket,
     add_comment_to_ticket,
-    ticket_to_context_string
 )
+from app.services.jira_common import ticket_to_context_string
+from app.services.search_index import search_index
 
 mcp = FastMCP("Custom Jira Server")
 
@@ -28,16 +30,43 @@ def get_issue(issue_key: str) -> str:
         return f"Error fetching issue {issue_key}: {e}"
 
 @mcp.tool()
-def search_issues(jql: str = "project is not empty ORDER BY created DESC", max_results: int = 50) -> str:
-    """List or search tickets using JQL."""
+def get_issues(issue_keys: List[str]) -> str:
+    """Fetch details of many Jira issues at once (batched into a few searches)."""
     try:
-        tickets = fetch_tickets(jql, max_results)
+        tickets, missing = fetch_tickets_by_keys(issue_keys)
+        out = "\n\n---\n\n".join(ticket_to_context_string(t) for t in tickets)
+        if missing:
+            out += f"\n\nNot found: {', '.join(missing)}"
+        return out or "No issues found."
+    except Exception as e:
+        return f"Error fetching issues: {e}"
+
+@mcp.tool()
+def search_issues(
+    jql: str = "project is not empty ORDER BY created DESC",
+    max_results: int = 50,
+    max_staleness: Optional[float] = None,
+) -> str:
+    """List or search tickets using JQL. max_staleness (seconds) bounds how old mirrored results may be; 0 = live."""
+    try:
+        tickets = fetch_tickets(jql, max_results, max_staleness=max_staleness)
         if not tickets:
             return "No issues found matching the JQL."
         return "\n".join([f"{t.key}: {t.summary} ({t.status})" for t in tickets])
     except Exception as e:
         return f"Error searching issues: {e}"
 
+@mcp.tool()
+def search_text(query: str, max_results: int = 20) -> str:
+    """Full-text search over summaries, descriptions and comments of known tickets (local index, no Jira call)."""
+    try:
+        hits = search_index.search(query, limit=max_results)
+        if not hits:
+            return "No indexed issues match the query."
+        return "\n".join(f"{h.key}: {h.summary} ({h.status}) - {h.snippet}" for h in hits)
+    except Exception as e:
+        return f"Error searching issues: {e}"
+
 @mcp.tool()
 def add_comment(issue_key: str, comment: str) -> str:
     """Add a comment to a Jira issue."""
@@ -542,6 +542,7 @@ document.addEventListener('DOMContentLoaded', () => {
                                 <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path><polyline points="15 3 21 3 21 9"></polyline><line x1="10" y1="14" x2="21" y2="3"></line></svg>
                             </a>
                             <p>${ticket.summary}</p>
+                            ${ticket.snippet ? `<p class="ticket-snippet">${escapeHtml(ticket.snippet).replace(/\*\*(.+?)\*\*/g, '<mark>$1</mark>')}</p>` : ''}
                         </div>
                     </div>
                     <div class="ticket-card-meta">
@@ -569,9 +570,50 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    // Jira text (descriptions, comments) may carry raw HTML: only render Markdown when it can be sanitized
+    function renderMarkdown(text) {
+        if (typeof marked !== 'undefined' && typeof DOMPurify !== 'undefined') {
+            return DOMPurify.sanitize(marked.parse(text));
+        }
+        return `<div style="white-space: pre-wrap;">${escapeHtml(text)}</div>`;
+    }
+
+    async function handleTextSearch(text) {
+        ticketListView.classList.remove('hidden');
+        ticketView.classList.add('hidden');
+        ticketsContainer.innerHTML = '';
+        ticketsLoading.classList.remove('hidden');
+        try {
+            const res = await fetch(`${API_BASE}/tickets/search?limit=20&q=${encodeURIComponent(text)}`);
+            if (!res.ok) {
+                const errorData = await res.json().catch(() => ({}));
+                throw new Error(errorData.detail || 'Search failed');
+            }
+            const data = await res.json();
+            ticketsLoading.classList.add('hidden');
+            lastFetchedTickets = data.results;
+            applyTypeFilter();
+        } catch (error) {
+            ticketsLoading.classList.add('hidden');
+            showToast(error.message, 'error');
+        }
+    }
+
     async function handleSearch() {
-        const query = searchInput.value.trim().toUpperCase();
-        if (!query) return;
+        const text = searchInput.value.trim();
+        if (!text) return;
+        // Anything that is not an issue key (e.g. PROJ-123) is a full-text search over known tickets
+        if (!/^[A-Za-z][A-Za-z0-9_]*-\d+$/.test(text)) {
+            handleTextSearch(text);
+            return;
+        }
+        const query = text.toUpperCase();
 
         showLoadingTicket();
 
@@ -617,11 +659,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (ticket.description) {
             // Jira returns Markdown or ADF based on API endpoint config
             // Simple markdown parser rendering
-            if (typeof marked !== 'undefined') {
-                elDesc.innerHTML = marked.parse(ticket.description);
-            } else {
-                elDesc.innerHTML = `<pre style="font-family: inherit; white-space: pre-wrap;">${ticket.description}</pre>`;
-            }
+            elDesc.innerHTML = renderMarkdown(ticket.description);
         } else {
             elDesc.innerHTML = '<em>No description provided.</em>';
         }
@@ -812,7 +850,7 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
             let html = `<div style="font-size:0.75rem;color:var(--text-secondary);margin-bottom:14px;padding-bottom:8px;border-bottom:1px solid var(--border-color);">
-                Total: <strong>${data.comments.length}</strong> comment(s)
+                Total: <strong>${data.total ?? data.comments.length}</strong> comment(s)
             </div>`;
 
             data.comments.forEach((c, idx) => {
@@ -832,7 +870,8 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (c.body && typeof c.body === 'object' && c.body.type === 'doc') {
                     bodyHtml = renderAdfNode(c.body);
                 } else if (typeof c.body === 'string') {
-                    bodyHtml = c.body.replace(/\n/g, '<br>');
+                    // The API converts comment bodies to Markdown
+                    bodyHtml = renderMarkdown(c.body);
                 } else if (c.body) {
                     bodyHtml = `<pre style="font-size:0.8rem;white-space:pre-wrap;">${JSON.stringify(c.body, null, 2)}</pre>`;
                 } else {
@@ -906,15 +945,33 @@ document.addEventListener('DOMContentLoaded', () => {
         setLoading(true, "AI is analyzing ticket and generating solution...");
 
         try {
-            const res = await fetch(`${API_BASE}/tickets/${targetTicket.key}/solution`, {
+            // stream=true: the answer arrives as server-sent events while it is written
+            const res = await fetch(`${API_BASE}/tickets/${targetTicket.key}/solution?stream=true`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ question: "Provide an approach plan (numbered steps), the detailed solution, and if this is a Story/Epic a 'Suggested sub-tasks:' list." })
             });
 
-            const data = await res.json();
+            if (!res.ok) {
+                const err = await res.json().catch(() => ({}));
+                throw new Error(err.detail || 'Failed to generate solution');
+            }
 
-            if (!res.ok) throw new Error(data.detail || 'Failed to generate solution');
+            let data = null;
+            appendTerminal('');
+            await readEventStream(res, (event, payload) => {
+                if (event === 'token') {
+                    terminalOutput.textContent += payload.text;
+                    terminalOutput.scrollTop = terminalOutput.scrollHeight;
+                } else if (event === 'progress' && payload.message) {
+                    appendTerminal(`… ${payload.message}`);
+                } else if (event === 'done') {
+                    data = payload;
+                } else if (event === 'error') {
+                    throw new Error(payload.detail || 'Failed to generate solution');
+                }
+            });
+            if (!data) throw new Error('Solution stream ended early');
 
             appendTerminal(`\n✅ Draft Generated!\n`);
             appendTerminal(`Please review the solution in the editor before publishing.`);
@@ -1069,6 +1126,36 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Terminal & UI Utils
+    async function readEventStream(res, onEvent) {
+        // Minimal text/event-stream reader (EventSource cannot POST): calls onEvent(name, parsed JSON data)
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let event = 'message';
+                const dataLines = [];
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+                }
+                if (!dataLines.length) continue;
+                try {
+                    onEvent(event, JSON.parse(dataLines.join('\n')));
+                } catch (error) {
+                    reader.cancel();
+                    throw error;
+                }
+            }
+        }
+    }
+
     function showTerminal(initialMsg = "") {
         terminalPanel.classList.remove('hidden');
         terminalOutput.textContent = initialMsg ? `> ${initialMsg}\n` : '';
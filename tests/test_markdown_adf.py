@@ -0,0 +1,144 @@
+"""
+Markdown -> ADF (app/services/markdown_adf.py): node coverage, ADF nesting rules, inline tokens, and the
+Markdown -> ADF -> Markdown round trip through adf_to_markdown.
+
+    python -m pytest tests
+"""
+import random
+
+import pytest
+
+from app.services.adf_markdown import adf_to_markdown
+from app.services.markdown_adf import markdown_to_adf
+from benchmarks.adf_corpus import synthetic_document
+
+SAMPLE = """# Fix for **token refresh** race
+
+The `TokenCache` expires *early* when the [gateway](https://example.com/a_b) retries.
+Keep snake_case_names and 2 * 3 intact.
+
+1. Add a lock around `refresh()`
+2. Retry with ***backoff***
+   - cap at 5 attempts
+   - log ~~every~~ the last failure
+     1. include the request id
+3. Deploy
+
+```python
+with lock:
+    token = refresh()
+```
+
+> Rolled out behind a flag
+> - default off
+
+| Step | Owner |
+| --- | --- |
+| code \\| review | Alex<br>Sam |
+
+---
+"""
+
+# Tables under a bullet or in a quote: ADF does not allow them there, so they must be flattened
+NESTED_TABLES = [
+    "- item\n\n  | a | b |\n  |---|---|\n  | 1 | 2 |",
+    "> | a | b |\n> |---|---|\n> | 1 | 2 |",
+]
+_CONTAINERS = {"listItem", "blockquote"}
+_NOT_NESTABLE = {"heading", "blockquote", "table", "rule"}
+
+
+def _walk(node) -> tuple[set, set]:
+    """(node types, mark types) used anywhere in the document."""
+    types, marks = set(), set()
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        types.add(n.get("type"))
+        marks.update(m.get("type") for m in n.get("marks") or ())
+        stack.extend(n.get("content") or ())
+    return types, marks
+
+
+def _invalid_nesting(node) -> set:
+    """Block types found inside list items or blockquotes that ADF does not allow there."""
+    found = set()
+    stack = [(node, False)]
+    while stack:
+        n, inside = stack.pop()
+        if inside and n.get("type") in _NOT_NESTABLE:
+            found.add(n["type"])
+        inside = inside or n.get("type") in _CONTAINERS
+        stack.extend((child, inside) for child in n.get("content") or ())
+    return found
+
+
+def _inline(markdown: str) -> list[tuple[str, list[str]]]:
+    """(text, mark types) of the nodes of a one-paragraph document."""
+    content = markdown_to_adf(markdown)["content"][0]["content"]
+    return [(n.get("text", n["type"]), [m["type"] for m in n.get("marks", ())]) for n in content]
+
+
+def test_sample_covers_every_node_type_and_mark():
+    types, marks = _walk(markdown_to_adf(SAMPLE))
+    assert {
+        "heading", "paragraph", "text", "hardBreak", "orderedList", "bulletList", "listItem", "codeBlock",
+        "blockquote", "table", "tableRow", "tableHeader", "tableCell", "rule",
+    } <= types
+    assert {"strong", "em", "code", "link", "strike"} <= marks
+
+
+def test_empty_input_gets_a_placeholder():
+    assert markdown_to_adf("")["content"][0]["content"][0]["text"] == "(No content)"
+
+
+@pytest.mark.parametrize("markdown", NESTED_TABLES)
+def test_nested_tables_are_flattened(markdown):
+    assert not _invalid_nesting(markdown_to_adf(markdown))
+
+
+@pytest.mark.parametrize(
+    "markdown, expected",
+    [
+        ("a **b** c", [("a ", []), ("b", ["strong"]), (" c", [])]),
+        ("***both***", [("both", ["strong", "em"])]),
+        ("**a***", [("a*", ["strong"])]),
+        ("x *y* z", [("x ", []), ("y", ["em"]), (" z", [])]),
+        ("2 * 3 * 4", [("2 * 3 * 4", [])]),
+        ("** not bold**", [("** not bold**", [])]),
+        ("~~gone~~", [("gone", ["strike"])]),
+        ("`a*b*c`", [("a*b*c", ["code"])]),
+        ("``a`b``", [("a`b", ["code"])]),
+        ("[**x**](https://e.com)", [("x", ["link", "strong"])]),
+        ("<https://e.com>", [("https://e.com", ["link"])]),
+        ("__u__ and _e_", [("u", ["strong"]), (" and ", []), ("e", ["em"])]),
+        ("snake_case_name", [("snake_case_name", [])]),
+        ("a \\*b\\* c", [("a *b* c", [])]),
+        ("line<br>break", [("line", []), ("hardBreak", []), ("break", [])]),
+    ],
+)
+def test_inline_tokens(markdown, expected):
+    assert _inline(markdown) == expected
+
+
+def test_flattened_lists_join_the_list_before_them():
+    quote = markdown_to_adf("> > - a\n> - b")["content"][0]
+    assert [b["type"] for b in quote["content"]] == ["bulletList"]
+    assert len(quote["content"][0]["content"]) == 2
+
+
+def test_quote_of_only_a_rule_is_dropped():
+    assert markdown_to_adf("> ---")["content"][0]["content"][0]["text"] == "(No content)"
+
+
+_ROUND_TRIP = {"sample": SAMPLE, **{f"nested table {i}": md for i, md in enumerate(NESTED_TABLES)}}
+_ROUND_TRIP.update(
+    (f"synthetic {seed}", adf_to_markdown(synthetic_document(random.Random(seed), 30))) for seed in range(100)
+)
+
+
+@pytest.mark.parametrize("markdown", list(_ROUND_TRIP.values()), ids=list(_ROUND_TRIP))
+def test_round_trip_is_stable(markdown):
+    # Markdown -> ADF -> Markdown must be a fixpoint after one normalizing pass
+    once = adf_to_markdown(markdown_to_adf(markdown))
+    assert adf_to_markdown(markdown_to_adf(once)) == once